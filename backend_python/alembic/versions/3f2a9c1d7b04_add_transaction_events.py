@@ -0,0 +1,65 @@
+"""Add transaction_events
+
+Revision ID: 3f2a9c1d7b04
+Revises:
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b04'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'transaction_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('transaction_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('from_status', sa.Text(), nullable=True),
+        sa.Column('to_status', sa.Text(), nullable=False),
+        sa.Column('actor_user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['actor_user_id'], ['profiles.user_id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_transaction_events_transaction_id_created_at',
+        'transaction_events',
+        ['transaction_id', 'created_at'],
+    )
+
+    # History is append-only: block edits other than the actor FK being nulled
+    op.execute("""
+        CREATE FUNCTION transaction_events_append_only() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.transaction_id IS DISTINCT FROM OLD.transaction_id
+                OR NEW.from_status IS DISTINCT FROM OLD.from_status
+                OR NEW.to_status IS DISTINCT FROM OLD.to_status
+                OR NEW.notes IS DISTINCT FROM OLD.notes
+                OR NEW.created_at IS DISTINCT FROM OLD.created_at THEN
+                RAISE EXCEPTION 'transaction_events is append-only';
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER transaction_events_no_update
+        BEFORE UPDATE ON transaction_events
+        FOR EACH ROW EXECUTE FUNCTION transaction_events_append_only()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS transaction_events_no_update ON transaction_events")
+    op.execute("DROP FUNCTION IF EXISTS transaction_events_append_only()")
+    op.drop_index('ix_transaction_events_transaction_id_created_at', table_name='transaction_events')
+    op.drop_table('transaction_events')
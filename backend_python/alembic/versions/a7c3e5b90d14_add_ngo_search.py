@@ -0,0 +1,49 @@
+"""Add NGO full-text and trigram search
+
+Revision ID: a7c3e5b90d14
+Revises: 5d7b2e9f1c60
+Create Date: 2026-10-19 15:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e5b90d14'
+down_revision = '5d7b2e9f1c60'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(city, '') || ' ' || coalesce(state, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(mission, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Stored generated column: Postgres keeps it current on every insert and update
+    op.add_column(
+        'ngos',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True)),
+    )
+    op.create_index('ix_ngos_search_vector', 'ngos', ['search_vector'], postgresql_using='gin')
+    op.create_index(
+        'ix_ngos_name_trgm', 'ngos', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_ngos_city_trgm', 'ngos', ['city'],
+        postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ngos_city_trgm', table_name='ngos')
+    op.drop_index('ix_ngos_name_trgm', table_name='ngos')
+    op.drop_index('ix_ngos_search_vector', table_name='ngos')
+    op.drop_column('ngos', 'search_vector')
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,24 @@
+"""Add donor impact indexes
+
+Revision ID: a8e2c6f4d913
+Revises: f3b7d1e9a462
+Create Date: 2026-10-19 20:45:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a8e2c6f4d913'
+down_revision = 'f3b7d1e9a462'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_donations_user_id_created_at', 'donations', ['user_id', 'created_at'])
+    op.create_index('ix_transactions_donor_user_id', 'transactions', ['donor_user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_donor_user_id', table_name='transactions')
+    op.drop_index('ix_donations_user_id_created_at', table_name='donations')
@@ -0,0 +1,54 @@
+"""Add indexes for hot query predicates
+
+Revision ID: b5d9f2a7c184
+Revises: a8e2c6f4d913
+Create Date: 2026-10-19 21:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b5d9f2a7c184'
+down_revision = 'a8e2c6f4d913'
+branch_labels = None
+depends_on = None
+
+TICKET_OPEN_SQL = "status IN ('open', 'in_progress')"
+INVOICE_PENDING_SQL = "status = 'pending'"
+
+# (name, table, columns); composite indexes end in created_at for the routes' ORDER BY
+INDEXES = [
+    ('ix_profiles_email', 'profiles', ['email']),
+    ('ix_ngos_user_id', 'ngos', ['user_id']),
+    ('ix_vendors_user_id', 'vendors', ['user_id']),
+    ('ix_packages_ngo_id', 'packages', ['ngo_id']),
+    ('ix_transactions_vendor_id_status_created_at', 'transactions', ['vendor_id', 'status', 'created_at']),
+    ('ix_transactions_ngo_id_created_at', 'transactions', ['ngo_id', 'created_at']),
+    ('ix_transactions_status_created_at', 'transactions', ['status', 'created_at']),
+    ('ix_transactions_donation_id', 'transactions', ['donation_id']),
+    ('ix_tickets_status_created_at', 'tickets', ['status', 'created_at']),
+    ('ix_tickets_transaction_id', 'tickets', ['transaction_id']),
+    ('ix_vendor_invoices_vendor_id_created_at', 'vendor_invoices', ['vendor_id', 'created_at']),
+    ('ix_vendor_invoices_transaction_id', 'vendor_invoices', ['transaction_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    op.create_index(
+        'ix_tickets_open_priority_created_at', 'tickets', ['priority', 'created_at'],
+        postgresql_where=sa.text(TICKET_OPEN_SQL),
+    )
+    op.create_index(
+        'ix_vendor_invoices_pending_created_at', 'vendor_invoices', ['created_at'],
+        postgresql_where=sa.text(INVOICE_PENDING_SQL),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vendor_invoices_pending_created_at', table_name='vendor_invoices')
+    op.drop_index('ix_tickets_open_priority_created_at', table_name='tickets')
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,71 @@
+"""Add pin code and city locations
+
+Revision ID: c2f8d4a61e37
+Revises: a7c3e5b90d14
+Create Date: 2026-10-19 16:30:00.000000
+
+"""
+import csv
+import gzip
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c2f8d4a61e37'
+down_revision = 'a7c3e5b90d14'
+branch_labels = None
+depends_on = None
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'app', 'data')
+
+
+def read_rows(filename: str) -> list:
+    with gzip.open(os.path.join(DATA_DIR, filename), 'rt', encoding='utf-8', newline='') as f:
+        return [
+            {**row, 'latitude': float(row['latitude']), 'longitude': float(row['longitude'])}
+            for row in csv.DictReader(f)
+        ]
+
+
+def upgrade() -> None:
+    pin_codes = op.create_table(
+        'pin_codes',
+        sa.Column('pin_code', sa.String(length=6), nullable=False),
+        sa.Column('district', sa.Text(), nullable=True),
+        sa.Column('state', sa.Text(), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('pin_code'),
+    )
+    op.create_index('ix_pin_codes_latitude_longitude', 'pin_codes', ['latitude', 'longitude'])
+
+    city_locations = op.create_table(
+        'city_locations',
+        sa.Column('city', sa.Text(), nullable=False),
+        sa.Column('state', sa.Text(), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('city', 'state'),
+    )
+    op.create_index('ix_city_locations_latitude_longitude', 'city_locations', ['latitude', 'longitude'])
+
+    op.create_index('ix_ngos_pin_code', 'ngos', ['pin_code', 'id'])
+    op.create_index(
+        'ix_vendors_city_state', 'vendors',
+        [sa.text('lower(trim(city))'), sa.text('lower(trim(state))')],
+    )
+
+    # Bundled datasets; reload later with `python -m app.utils.geo`
+    op.bulk_insert(pin_codes, read_rows('pin_codes.csv.gz'))
+    op.bulk_insert(city_locations, read_rows('city_locations.csv.gz'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vendors_city_state', table_name='vendors')
+    op.drop_index('ix_ngos_pin_code', table_name='ngos')
+    op.drop_index('ix_city_locations_latitude_longitude', table_name='city_locations')
+    op.drop_table('city_locations')
+    op.drop_index('ix_pin_codes_latitude_longitude', table_name='pin_codes')
+    op.drop_table('pin_codes')
@@ -0,0 +1,32 @@
+"""Add case-insensitive unique email index
+
+Revision ID: c7a1e3f5b902
+Revises: b5d9f2a7c184
+Create Date: 2026-10-19 21:55:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c7a1e3f5b902'
+down_revision = 'b5d9f2a7c184'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Accounts that differ only in email case have to be merged by hand first
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT lower(email) FROM profiles GROUP BY 1 HAVING count(*) > 1 ORDER BY 1 LIMIT 20
+    """)).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"Profiles share an email ignoring case: {', '.join(duplicates)}")
+
+    op.drop_index('ix_profiles_email', table_name='profiles')
+    op.create_index('ix_profiles_email_lower', 'profiles', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_profiles_email_lower', table_name='profiles')
+    op.create_index('ix_profiles_email', 'profiles', ['email'])
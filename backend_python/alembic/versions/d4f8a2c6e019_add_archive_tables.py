@@ -0,0 +1,87 @@
+"""Add partitioned archive tables for transactions and donations
+
+Revision ID: d4f8a2c6e019
+Revises: c7a1e3f5b902
+Create Date: 2026-10-19 22:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd4f8a2c6e019'
+down_revision = 'c7a1e3f5b902'
+branch_labels = None
+depends_on = None
+
+# Monthly partitions are created by the archiver as rows arrive;
+# its first run moves existing history in batches.
+
+
+def upgrade() -> None:
+    op.create_index('ix_donations_created_at', 'donations', ['created_at', 'id'])
+
+    op.create_table(
+        'donations_archive',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('ngo_id', sa.Text(), nullable=False),
+        sa.Column('package_id', sa.Text(), nullable=False),
+        sa.Column('package_title', sa.Text(), nullable=False),
+        sa.Column('package_amount', sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column('payment_method', sa.Text(), nullable=False),
+        sa.Column('payment_status', sa.Text(), nullable=False),
+        sa.Column('transaction_id', sa.Text(), nullable=True),
+        sa.Column('invoice_number', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index(
+        'ix_donations_archive_user_id_created_at', 'donations_archive', ['user_id', 'created_at']
+    )
+
+    op.create_table(
+        'transactions_archive',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('donation_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('package_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('ngo_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('vendor_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('donor_user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.Text(), nullable=False),
+        sa.Column('tracking_number', sa.Text(), nullable=True),
+        sa.Column('delivery_note_url', sa.Text(), nullable=True),
+        sa.Column('invoice_url', sa.Text(), nullable=True),
+        sa.Column('admin_notes', sa.Text(), nullable=True),
+        sa.Column('vendor_notes', sa.Text(), nullable=True),
+        sa.Column('assigned_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('shipped_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('events', postgresql.JSONB(), nullable=True),
+        sa.Column('tickets', postgresql.JSONB(), nullable=True),
+        sa.Column('invoices', postgresql.JSONB(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index(
+        'ix_transactions_archive_donor_user_id', 'transactions_archive', ['donor_user_id']
+    )
+
+
+def downgrade() -> None:
+    # Dropping the parents drops every partition, and with them archived rows
+    op.drop_index('ix_transactions_archive_donor_user_id', table_name='transactions_archive')
+    op.drop_table('transactions_archive')
+    op.drop_index('ix_donations_archive_user_id_created_at', table_name='donations_archive')
+    op.drop_table('donations_archive')
+    op.drop_index('ix_donations_created_at', table_name='donations')
@@ -0,0 +1,60 @@
+"""Add package funding leaderboards
+
+Revision ID: d91b3f5a0c28
+Revises: c2f8d4a61e37
+Create Date: 2026-10-19 18:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd91b3f5a0c28'
+down_revision = 'c2f8d4a61e37'
+branch_labels = None
+depends_on = None
+
+FUNDED_SHARE_SQL = "(current_quantity * 1.0 / target_quantity)"
+OPEN_GOAL_SQL = "status = 'active' AND target_quantity > 0 AND current_quantity < target_quantity"
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_packages_closest_to_goal', 'packages',
+        [sa.text(f"{FUNDED_SHARE_SQL} DESC"), 'id'],
+        postgresql_where=sa.text(OPEN_GOAL_SQL),
+    )
+
+    op.create_table(
+        'package_weekly_funding',
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('package_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('amount', sa.DECIMAL(precision=12, scale=2), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('donations', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['package_id'], ['packages.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('week_start', 'package_id'),
+    )
+    op.create_index(
+        'ix_package_weekly_funding_week_amount', 'package_weekly_funding',
+        ['week_start', sa.text('amount DESC'), 'package_id'],
+    )
+
+    # Backfill from completed donations, dated by their last update (the closest to a completion time we have)
+    op.execute("""
+        INSERT INTO package_weekly_funding (week_start, package_id, amount, quantity, donations)
+        SELECT date_trunc('week', d.updated_at AT TIME ZONE 'UTC')::date, p.id,
+               sum(d.total_amount), sum(d.quantity), count(*)
+        FROM donations d
+        JOIN packages p ON p.id::text = d.package_id
+        WHERE d.payment_status = 'completed'
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_package_weekly_funding_week_amount', table_name='package_weekly_funding')
+    op.drop_table('package_weekly_funding')
+    op.drop_index('ix_packages_closest_to_goal', table_name='packages')
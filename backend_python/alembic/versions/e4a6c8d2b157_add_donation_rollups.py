@@ -0,0 +1,82 @@
+"""Add hourly and daily donation rollups
+
+Revision ID: e4a6c8d2b157
+Revises: d91b3f5a0c28
+Create Date: 2026-10-19 19:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e4a6c8d2b157'
+down_revision = 'd91b3f5a0c28'
+branch_labels = None
+depends_on = None
+
+# Completed donations fanned out to every (grain, dimension, key, bucket) they count towards,
+# dated by their last update (the closest to a completion time we have)
+COMPLETED_BUCKETS_SQL = """
+    WITH completed AS (
+        SELECT d.user_id, d.total_amount, d.updated_at AT TIME ZONE 'UTC' AS updated_utc,
+               d.ngo_id, d.package_id, p.category
+        FROM donations d
+        LEFT JOIN packages p ON p.id::text = d.package_id
+        WHERE d.payment_status = 'completed'
+    )
+    SELECT g.grain, k.dimension, k.key,
+           date_trunc(g.grain, c.updated_utc) AT TIME ZONE 'UTC' AS bucket_start,
+           c.user_id, c.total_amount
+    FROM completed c
+    CROSS JOIN (VALUES ('hour'), ('day')) AS g(grain)
+    CROSS JOIN LATERAL (
+        VALUES ('all', 'all'), ('ngo', c.ngo_id), ('package', c.package_id), ('category', c.category)
+    ) AS k(dimension, key)
+    WHERE k.key IS NOT NULL AND k.key <> ''
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'donation_rollups',
+        sa.Column('grain', sa.Text(), nullable=False),
+        sa.Column('dimension', sa.Text(), nullable=False),
+        sa.Column('key', sa.Text(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('donations', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.DECIMAL(precision=14, scale=2), nullable=False),
+        sa.Column('unique_donors', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint("grain IN ('hour', 'day')", name='check_donation_rollup_grain'),
+        sa.CheckConstraint("dimension IN ('all', 'ngo', 'package', 'category')", name='check_donation_rollup_dimension'),
+        sa.PrimaryKeyConstraint('grain', 'dimension', 'key', 'bucket_start'),
+    )
+    op.create_table(
+        'donation_rollup_donors',
+        sa.Column('grain', sa.Text(), nullable=False),
+        sa.Column('dimension', sa.Text(), nullable=False),
+        sa.Column('key', sa.Text(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('donations', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('grain', 'dimension', 'key', 'bucket_start', 'user_id'),
+    )
+
+    op.execute(f"""
+        INSERT INTO donation_rollup_donors (grain, dimension, key, bucket_start, user_id, donations)
+        SELECT grain, dimension, key, bucket_start, user_id, count(*)
+        FROM ({COMPLETED_BUCKETS_SQL}) b
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+    op.execute(f"""
+        INSERT INTO donation_rollups (grain, dimension, key, bucket_start, donations, amount, unique_donors)
+        SELECT grain, dimension, key, bucket_start, count(*), sum(total_amount), count(DISTINCT user_id)
+        FROM ({COMPLETED_BUCKETS_SQL}) b
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('donation_rollup_donors')
+    op.drop_table('donation_rollups')
@@ -0,0 +1,76 @@
+"""Add admin overview materialized view
+
+Revision ID: f3b7d1e9a462
+Revises: e4a6c8d2b157
+Create Date: 2026-10-19 20:10:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7d1e9a462'
+down_revision = 'e4a6c8d2b157'
+branch_labels = None
+depends_on = None
+
+# One row; id exists only for the unique index REFRESH ... CONCURRENTLY needs.
+# Donation volume comes from the daily platform rollup rather than the donations table.
+ADMIN_OVERVIEW_SQL = """
+    SELECT 1 AS id,
+           (SELECT count(*) FROM ngos WHERE verified IS NOT TRUE) AS pending_ngo_approvals,
+           (SELECT count(*) FROM vendors WHERE verified IS NOT TRUE) AS pending_vendor_approvals,
+           t.unassigned_transactions,
+           t.oldest_unassigned_at,
+           k.open_tickets_low,
+           k.open_tickets_medium,
+           k.open_tickets_high,
+           k.open_tickets_urgent,
+           i.pending_invoices,
+           i.pending_invoice_amount,
+           d.donations_today,
+           d.donation_amount_today,
+           d.donations_7d,
+           d.donation_amount_7d,
+           d.donations_30d,
+           d.donation_amount_30d,
+           now() AS refreshed_at
+    FROM (
+        SELECT count(*) AS unassigned_transactions, min(created_at) AS oldest_unassigned_at
+        FROM transactions
+        WHERE status = 'pending_admin_assignment' AND vendor_id IS NULL
+    ) t
+    CROSS JOIN (
+        SELECT count(*) FILTER (WHERE priority = 'low') AS open_tickets_low,
+               count(*) FILTER (WHERE priority = 'medium') AS open_tickets_medium,
+               count(*) FILTER (WHERE priority = 'high') AS open_tickets_high,
+               count(*) FILTER (WHERE priority = 'urgent') AS open_tickets_urgent
+        FROM tickets
+        WHERE status IN ('open', 'in_progress')
+    ) k
+    CROSS JOIN (
+        SELECT count(*) AS pending_invoices, coalesce(sum(invoice_amount), 0) AS pending_invoice_amount
+        FROM vendor_invoices
+        WHERE status = 'pending'
+    ) i
+    CROSS JOIN (
+        SELECT coalesce(sum(donations) FILTER (WHERE bucket_start >= today), 0) AS donations_today,
+               coalesce(sum(amount) FILTER (WHERE bucket_start >= today), 0) AS donation_amount_today,
+               coalesce(sum(donations) FILTER (WHERE bucket_start >= today - interval '6 days'), 0) AS donations_7d,
+               coalesce(sum(amount) FILTER (WHERE bucket_start >= today - interval '6 days'), 0) AS donation_amount_7d,
+               coalesce(sum(donations), 0) AS donations_30d,
+               coalesce(sum(amount), 0) AS donation_amount_30d
+        FROM donation_rollups
+        CROSS JOIN (SELECT date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS today) day
+        WHERE grain = 'day' AND dimension = 'all' AND key = 'all'
+          AND bucket_start >= today - interval '29 days'
+    ) d
+"""
+
+
+def upgrade() -> None:
+    op.execute(f"CREATE MATERIALIZED VIEW admin_overview AS {ADMIN_OVERVIEW_SQL}")
+    op.execute("CREATE UNIQUE INDEX ix_admin_overview_id ON admin_overview (id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW admin_overview")
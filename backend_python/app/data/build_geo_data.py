@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Rebuild the bundled pin code and city location datasets.
+
+Source: the post office directory shipped by the `indiapins` package
+(MIT licensed, India Post data). Each pin code's centroid is the median
+position of its post offices; offices without coordinates, or with
+coordinates outside India, are ignored, and when some of a pin code's
+offices lie near their district's median position only those are used
+(a few offices carry degrees-minutes values written as decimals). City
+locations come from district centroids and from head post offices
+("Gurgaon HO", "Ahmedabad GPO"), which carry the names people use for
+cities when districts don't, plus a few well-known former names.
+
+Usage:
+    pip install indiapins
+    python -m app.data.build_geo_data
+"""
+
+import argparse
+import bz2
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import re
+import statistics
+import sys
+from collections import Counter, defaultdict
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+PIN_CODES_PATH = os.path.join(DATA_DIR, "pin_codes.csv.gz")
+CITIES_PATH = os.path.join(DATA_DIR, "city_locations.csv.gz")
+
+# Rough bounding box of India; geocodes outside it are data-entry errors
+LATITUDE_RANGE = (6.0, 37.5)
+LONGITUDE_RANGE = (68.0, 97.5)
+
+# Offices this close to their district's median position outvote the rest of their pin code
+DISTRICT_AGREEMENT_KM = 15.0
+
+# Former names still in everyday use, mapped to the current ones in the dataset
+CITY_ALIASES = {
+    ("bangalore", "karnataka"): ("bengaluru", "karnataka"),
+    ("bombay", "maharashtra"): ("mumbai", "maharashtra"),
+    ("madras", "tamil nadu"): ("chennai", "tamil nadu"),
+    ("calcutta", "west bengal"): ("kolkata", "west bengal"),
+    ("poona", "maharashtra"): ("pune", "maharashtra"),
+    ("baroda", "gujarat"): ("vadodara", "gujarat"),
+    ("cochin", "kerala"): ("kochi", "kerala"),
+    ("trivandrum", "kerala"): ("thiruvananthapuram", "kerala"),
+    ("mysore", "karnataka"): ("mysuru", "karnataka"),
+    ("gurugram", "haryana"): ("gurgaon", "haryana"),
+}
+
+HEAD_OFFICE_SUFFIX = re.compile(r"\s+(H\.?O\.?|G\.?P\.?O\.?|Colls H\.?O)$", re.IGNORECASE)
+
+
+def default_source() -> str:
+    import indiapins
+    return os.path.join(os.path.dirname(indiapins.__file__), "pins.json.bz2")
+
+
+def read_offices(path: str):
+    with bz2.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def valid_position(office: dict) -> bool:
+    lat, lon = office.get("Latitude"), office.get("Longitude")
+    return (
+        isinstance(lat, (int, float)) and isinstance(lon, (int, float))
+        and LATITUDE_RANGE[0] <= lat <= LATITUDE_RANGE[1]
+        and LONGITUDE_RANGE[0] <= lon <= LONGITUDE_RANGE[1]
+    )
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0088 * math.asin(math.sqrt(a))
+
+
+def most_common(values: list) -> str:
+    return Counter(values).most_common(1)[0][0]
+
+
+def build(source: str):
+    offices_by_pin = defaultdict(list)
+    for office in read_offices(source):
+        if office.get("Pincode") and office.get("State"):
+            offices_by_pin[str(office["Pincode"])].append(office)
+
+    district_positions = defaultdict(list)
+    for offices in offices_by_pin.values():
+        for office in offices:
+            if valid_position(office):
+                district_positions[office.get("District")].append((office["Latitude"], office["Longitude"]))
+    district_medians = {
+        district: (statistics.median(lat for lat, _ in positions), statistics.median(lon for _, lon in positions))
+        for district, positions in district_positions.items()
+    }
+
+    pin_rows = []
+    for pin_code, offices in sorted(offices_by_pin.items()):
+        located = [office for office in offices if valid_position(office)]
+        if not located:
+            continue
+        near_district = [
+            office for office in located
+            if distance_km(office["Latitude"], office["Longitude"],
+                           *district_medians[office.get("District")]) <= DISTRICT_AGREEMENT_KM
+        ]
+        located = near_district or located
+        pin_rows.append((
+            pin_code,
+            most_common([(office.get("District") or "").title() for office in offices]),
+            most_common([office["State"].title() for office in offices]),
+            round(statistics.median(office["Latitude"] for office in located), 5),
+            round(statistics.median(office["Longitude"] for office in located), 5),
+        ))
+
+    # District centroids first; head offices then override, being closer to the city centre
+    positions_by_district = defaultdict(list)
+    for _, district, state, lat, lon in pin_rows:
+        if district:
+            positions_by_district[(district.lower(), state.lower())].append((lat, lon))
+    cities = {
+        key: (
+            round(statistics.fmean(lat for lat, _ in positions), 5),
+            round(statistics.fmean(lon for _, lon in positions), 5),
+        )
+        for key, positions in positions_by_district.items()
+    }
+    pin_positions = {row[0]: (row[3], row[4]) for row in pin_rows}
+    for offices in offices_by_pin.values():
+        for office in offices:
+            if office.get("BranchType") != "HO" or str(office["Pincode"]) not in pin_positions:
+                continue
+            city = HEAD_OFFICE_SUFFIX.sub("", office["Name"]).strip().lower()
+            # The office's own position, unless it disagrees with its pin code's centroid
+            position = pin_positions[str(office["Pincode"])]
+            if valid_position(office) and distance_km(office["Latitude"], office["Longitude"], *position) <= DISTRICT_AGREEMENT_KM:
+                position = (round(office["Latitude"], 5), round(office["Longitude"], 5))
+            cities[(city, office["State"].lower())] = position
+
+    for alias, city in CITY_ALIASES.items():
+        if city in cities and alias not in cities:
+            cities[alias] = cities[city]
+
+    return pin_rows, sorted((city, state, lat, lon) for (city, state), (lat, lon) in cities.items())
+
+
+def write_csv(path: str, header: tuple, rows: list):
+    # mtime=0 keeps rebuilds byte-identical when the data hasn't changed
+    with gzip.GzipFile(path, "wb", mtime=0) as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the bundled pin code datasets")
+    parser.add_argument("--source", help="Path to indiapins' pins.json.bz2 (default: installed package)")
+    args = parser.parse_args(argv)
+
+    pin_rows, city_rows = build(args.source or default_source())
+    write_csv(PIN_CODES_PATH, ("pin_code", "district", "state", "latitude", "longitude"), pin_rows)
+    write_csv(CITIES_PATH, ("city", "state", "latitude", "longitude"), city_rows)
+    print(f"Wrote {len(pin_rows)} pin codes and {len(city_rows)} city locations")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
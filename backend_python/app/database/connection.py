@@ -1,6 +1,5 @@
 import os
-import asyncpg
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -19,16 +18,44 @@ DATABASE_URL = os.getenv(
 # Convert to async URL for SQLAlchemy
 ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
-# Create async engine
-engine = create_async_engine(
-    ASYNC_DATABASE_URL,
-    echo=True,  # Set to False in production
-    future=True
-)
+# Connection pool sizing per process; app.serve derives these from the Postgres connection budget
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_ECHO = os.getenv("DB_ECHO", "true").lower() == "true"
+
+# Async engine, created on first use so importing models and routes does not load the driver
+_engine = None
+
+def get_engine():
+    """Get the async engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            echo=DB_ECHO,  # Set to False in production
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            future=True
+        )
+        AsyncSessionLocal.configure(bind=_engine)
+    return _engine
+
+def __getattr__(name):
+    # Keeps `from app.database.connection import engine` working
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class LazySessionMaker(sessionmaker):
+    """Session factory that binds to the engine the first time a session is opened."""
+    
+    def __call__(self, **local_kw):
+        get_engine()
+        return super().__call__(**local_kw)
 
 # Create async session factory
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
+AsyncSessionLocal = LazySessionMaker(
+    class_=AsyncSession, expire_on_commit=False
 )
 
 # Create base class for models
@@ -138,6 +165,7 @@ async def get_connection():
     else:
         # Return actual database connection
         try:
+            import asyncpg
             conn = await asyncpg.connect(DATABASE_URL)
             return conn
         except Exception as e:
@@ -164,10 +192,34 @@ async def init_db():
     
     try:
         # Test connection
-        async with engine.begin() as conn:
+        async with get_engine().begin() as conn:
             # Create tables if they don't exist
             await conn.run_sync(Base.metadata.create_all)
         logging.info("Database initialized successfully")
     except Exception as e:
         logging.error(f"Database initialization failed: {e}")
-        logging.info("Will use mock database as fallback")
\ No newline at end of file
+        logging.info("Will use mock database as fallback")
+
+async def warm_up_pool(connections: int) -> int:
+    """Open up to `connections` pooled connections so early requests skip connect/auth."""
+    if USE_MOCK_DATA or connections <= 0:
+        return 0
+    
+    engine = get_engine()
+    # Connections must be held at the same time, otherwise the pool hands back the same one
+    connections = min(connections, engine.pool.size())
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = await engine.connect()
+            opened.append(conn)
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+async def dispose_engine():
+    """Close all pooled connections."""
+    if _engine is not None:
+        await _engine.dispose()
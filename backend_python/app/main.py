@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import os
+from contextlib import asynccontextmanager
+from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,7 +17,64 @@ from app.middleware.error_handler import (
     general_exception_handler,
     not_found_handler
 )
-from app.database.connection import get_db_session
+from app.middleware.rate_limit import limiter, write_rate_limit, rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from app.database.connection import AsyncSessionLocal, USE_MOCK_DATA, warm_up_pool, dispose_engine
+from app.utils.health import health_registry
+from app.utils.metrics import metrics_registry
+from app.utils.vendor_assignment import vendor_assignment_scheduler
+from app.utils.jobs import job_runner
+from app.utils.revocation import revocation_list
+from app.utils.admin_overview import admin_overview_refresher
+from app.utils.archive import archiver
+from app.utils.email_service import email_service  # also registers the email job handlers
+
+# Pooled connections opened at startup
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "5"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"Starting {os.getenv('APP_NAME', 'DoGoodHub API')} v{os.getenv('APP_VERSION', '1.0.0')}")
+    print(f"Mock database mode: {os.getenv('USE_MOCK_DATA', 'false')}")
+    
+    # Warm the connection pool and caches before taking traffic
+    if not USE_MOCK_DATA:
+        try:
+            warmed = await warm_up_pool(DB_POOL_WARMUP)
+            print(f"Database connection established ({warmed} pooled connections warmed)")
+            async with AsyncSessionLocal() as db:
+                await email_service.load_settings(db)
+                await packages.prime_catalog_cache(db)
+                # Revoked tokens must be known before the first request is authenticated
+                await revocation_list.sync(db)
+        except Exception as e:
+            print(f"Database warmup failed: {e}")
+    
+    # Start background vendor assignment (no-op unless enabled)
+    vendor_assignment_scheduler.start()
+    
+    # Start background job runner
+    job_runner.start()
+    
+    # Keep revoked tokens in sync with other workers
+    revocation_list.start()
+    
+    # Refresh the admin overview view on schedule
+    admin_overview_refresher.start()
+    
+    # Start background archival (no-op unless enabled)
+    archiver.start()
+    
+    yield
+    
+    print("Shutting down DoGoodHub API")
+    # Stop background workers first so in-flight jobs can still reach the database
+    await vendor_assignment_scheduler.stop()
+    await job_runner.stop()
+    await revocation_list.stop()
+    await admin_overview_refresher.stop()
+    await archiver.stop()
+    await dispose_engine()
 
 # Create FastAPI app
 app = FastAPI(
@@ -23,9 +82,15 @@ app = FastAPI(
     version=os.getenv("APP_VERSION", "1.0.0"),
     description="A platform connecting NGOs, vendors, and donors for social good",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    # Per-user write limit, checked before any route dependency touches the database
+    dependencies=[write_rate_limit]
 )
 
+# Rate limiting
+app.state.limiter = limiter
+
 # CORS middleware
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:8080").split(",")
 app.add_middleware(
@@ -41,6 +106,7 @@ from fastapi import HTTPException
 from fastapi.exceptions import RequestValidationError
 
 app.add_exception_handler(HTTPException, http_exception_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 app.add_exception_handler(404, not_found_handler)
@@ -68,42 +134,32 @@ async def root():
         "redoc": "/redoc"
     }
 
-# Health check endpoint
+# Liveness probe: the process is up and serving, no dependencies touched
 @app.get("/health")
 async def health_check():
-    try:
-        # Test database connection
-        async with get_db_session() as db:
-            return {
-                "status": "healthy",
-                "database": "connected"
-            }
-    except Exception as e:
-        return {
-            "status": "healthy",
-            "database": "disconnected",
-            "error": str(e)
-        }
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "environment": os.getenv("ENVIRONMENT", "development")
+    }
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    print(f"Starting {os.getenv('APP_NAME', 'DoGoodHub API')} v{os.getenv('APP_VERSION', '1.0.0')}")
-    print(f"Mock database mode: {os.getenv('USE_MOCK_DATA', 'false')}")
-    
-    # Initialize database connection
-    try:
-        db_gen = get_db_session()
-        db = await db_gen.__anext__()
-        print("Database connection established")
-        await db_gen.aclose()
-    except Exception as e:
-        print(f"Database connection failed: {e}")
+# Readiness probe: dependency checks, cached briefly so frequent probes stay cheap
+@app.get("/ready")
+async def readiness_check():
+    result = await health_registry.run_all()
+    return JSONResponse(
+        status_code=200 if result["ready"] else 503,
+        content={
+            "status": "ready" if result["ready"] else "unavailable",
+            "timestamp": datetime.utcnow().isoformat(),
+            "checks": result["checks"]
+        }
+    )
 
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    print("Shutting down DoGoodHub API")
+# Prometheus scrape endpoint; counters are per worker process
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
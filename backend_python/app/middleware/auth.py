@@ -1,35 +1,79 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jose import JWTError
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
+import hashlib
+import importlib.util
 import os
+import time
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from ..database.connection import get_db_session
 from ..models.models import Profile
 from ..schemas.schemas import TokenData, UserRole
+from ..utils.cache import claims_cache
+from ..utils.revocation import revocation_list
 
 # Security configuration
 SECRET_KEY = os.getenv("JWT_SECRET", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; hashes that don't match the settings below are upgraded on the next login
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+# Pick the highest cost that keeps login inside its latency budget (see benchmarks/bench_password.py)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Memory cost is in KiB; the defaults follow the OWASP minimum for argon2id
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "19456"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Build the password hashing context on first use; passlib is slow to import."""
+    from passlib.context import CryptContext
+
+    argon2_available = importlib.util.find_spec("argon2") is not None
+    if PASSWORD_HASH_SCHEME not in ("bcrypt", "argon2"):
+        raise RuntimeError(f"Unsupported PASSWORD_HASH_SCHEME: {PASSWORD_HASH_SCHEME}")
+    if PASSWORD_HASH_SCHEME == "argon2" and not argon2_available:
+        raise RuntimeError("PASSWORD_HASH_SCHEME=argon2 requires argon2-cffi (pip install argon2-cffi)")
+
+    # The first scheme hashes new passwords; the others are still verified, then rehashed
+    schemes = [PASSWORD_HASH_SCHEME] + [
+        scheme for scheme in ("bcrypt", "argon2")
+        if scheme != PASSWORD_HASH_SCHEME and (scheme != "argon2" or argon2_available)
+    ]
+    settings = {"bcrypt__rounds": BCRYPT_ROUNDS}
+    if argon2_available:
+        settings.update({
+            "argon2__type": "ID",
+            "argon2__memory_cost": ARGON2_MEMORY_COST,
+            "argon2__rounds": ARGON2_TIME_COST,
+            "argon2__parallelism": ARGON2_PARALLELISM,
+        })
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
 
 # OAuth2 scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if the stored one is outdated."""
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
@@ -39,36 +83,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti makes each token individually revocable
+    to_encode.update({"exp": expire, "jti": str(uuid.uuid4()), "type": "access"})
+    # jose.jwt pulls in the cryptography backends, so it is imported on first use
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create a long-lived, single-use JWT refresh token."""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+    to_encode.update({"exp": expire, "jti": str(uuid.uuid4()), "type": "refresh"})
+    from jose import jwt
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_token(token: str, token_type: str = "access") -> dict:
+    """Verify a JWT's signature, expiry and type and return its payload."""
+    from jose import jwt
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        payload = None
+    
+    # Tokens issued before refresh tokens existed carry no type and are access tokens
+    if payload is None or payload.get("type", "access") != token_type or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
 def verify_token(token: str) -> TokenData:
-    """Verify and decode a JWT token."""
+    """Verify and decode an access token, reusing claims of recently verified tokens."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
+    # Keyed by digest so raw bearer tokens are not kept in memory
+    digest = hashlib.sha256(token.encode()).digest()
+    token_data = claims_cache.get(digest)
+    if token_data is None:
+        payload = decode_token(token, "access")
         email: str = payload.get("email")
         role: str = payload.get("role")
         
-        if user_id is None or email is None:
+        if email is None:
             raise credentials_exception
             
         token_data = TokenData(
-            user_id=user_id,
+            user_id=payload["sub"],
             email=email,
-            role=UserRole(role) if role else None
+            role=UserRole(role) if role else None,
+            jti=payload.get("jti")
         )
-        return token_data
         
-    except JWTError:
+        # decode_token has already rejected expired tokens; stop caching at exp
+        claims_cache.set(digest, token_data, ttl_seconds=payload["exp"] - time.time())
+    
+    # Checked on cache hits too, so a logout takes effect immediately
+    if token_data.jti and revocation_list.is_revoked(token_data.jti):
         raise credentials_exception
+    return token_data
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -104,11 +183,17 @@ async def get_current_active_user(
     """Get the current active user (placeholder for future user status checks)."""
     return current_user
 
+async def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenData:
+    """Get the verified token claims without loading the Profile."""
+    return verify_token(credentials.credentials)
+
 def require_role(required_role: UserRole):
-    """Dependency to require a specific user role."""
+    """Dependency to require a specific user role, answered from token claims."""
     async def role_checker(
-        current_user: Profile = Depends(get_current_active_user)
-    ) -> Profile:
+        current_user: TokenData = Depends(get_current_claims)
+    ) -> TokenData:
         if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -118,10 +203,10 @@ def require_role(required_role: UserRole):
     return role_checker
 
 def require_roles(required_roles: list[UserRole]):
-    """Dependency to require one of multiple user roles."""
+    """Dependency to require one of multiple user roles, answered from token claims."""
     async def roles_checker(
-        current_user: Profile = Depends(get_current_active_user)
-    ) -> Profile:
+        current_user: TokenData = Depends(get_current_claims)
+    ) -> TokenData:
         if current_user.role not in required_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
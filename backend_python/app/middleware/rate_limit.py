@@ -0,0 +1,110 @@
+import logging
+import os
+import time
+from typing import Callable, Optional, Sequence
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+from slowapi.wrappers import LimitGroup
+
+from .auth import verify_token
+from ..utils.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# memory:// is per process; use redis://host:6379 to share limits across workers and hosts
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+# Each rule pairs a short burst window with a sustained rate
+RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "5/10 seconds;20/minute")
+RATE_LIMIT_REGISTER = os.getenv("RATE_LIMIT_REGISTER", "3/minute;20/hour")
+RATE_LIMIT_WRITE = os.getenv("RATE_LIMIT_WRITE", "20/5 seconds;120/minute")
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+rate_limit_decisions = metrics_registry.counter(
+    "rate_limit_decisions_total",
+    "Rate limiter decisions by scope",
+    ("scope", "decision"),
+)
+
+
+def client_ip(request: Request) -> str:
+    """Rate-limit key for the client address (uvicorn resolves X-Forwarded-For from trusted proxies)."""
+    return f"ip:{get_remote_address(request)}"
+
+
+def user_or_ip(request: Request) -> str:
+    """Rate-limit key for the authenticated user, falling back to the client address."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{verify_token(token).user_id}"
+        except HTTPException:
+            pass
+    return client_ip(request)
+
+
+# Moving windows have no fixed-window boundary bursts; a burst limit plus a sustained
+# limit on the same key gives token-bucket-like behaviour
+limiter = Limiter(
+    key_func=client_ip,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy="moving-window",
+    enabled=RATE_LIMIT_ENABLED,
+)
+
+
+def rate_limit(
+    scope: str,
+    limit_value: str,
+    key_func: Callable[[Request], str] = client_ip,
+    methods: Optional[Sequence[str]] = None
+):
+    """Dependency that rejects over-limit requests before the route's other dependencies run.
+
+    Add it to a route's `dependencies` (or the app's) so the check happens
+    before any database lookup or password hashing.
+    """
+    limits = list(LimitGroup(limit_value, key_func, scope, False, None, None, None, 1, True))
+
+    async def check_rate_limit(request: Request):
+        if not limiter.enabled or (methods and request.method not in methods):
+            return
+
+        key = key_func(request)
+        for limit in limits:
+            if not limiter.limiter.hit(limit.limit, key, scope):
+                rate_limit_decisions.inc(scope, "rejected")
+                reset_at, _ = limiter.limiter.get_window_stats(limit.limit, key, scope)
+                request.state.rate_limit_reset_at = reset_at
+                logger.warning(f"Rate limit {limit.limit} exceeded for {key} on {scope}")
+                raise RateLimitExceeded(limit)
+        rate_limit_decisions.inc(scope, "allowed")
+
+    return Depends(check_rate_limit)
+
+
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    """Return 429 with a Retry-After hint."""
+    reset_at = getattr(request.state, "rate_limit_reset_at", None)
+    retry_after = max(1, int(reset_at - time.time()) + 1) if reset_at else 1
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "success": False,
+            "message": "Too many requests, please try again later",
+            "error": f"Rate limit exceeded: {exc.detail}"
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+# Shared route dependencies
+login_rate_limit = rate_limit("auth.login", RATE_LIMIT_LOGIN)
+register_rate_limit = rate_limit("auth.register", RATE_LIMIT_REGISTER)
+write_rate_limit = rate_limit("write", RATE_LIMIT_WRITE, key_func=user_or_ip, methods=WRITE_METHODS)
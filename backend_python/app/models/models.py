@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, CheckConstraint, DECIMAL
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, Text, Integer, Float, Boolean, Date, DateTime, ForeignKey, CheckConstraint, PrimaryKeyConstraint, DECIMAL, Index, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.sql import func, text
 import uuid
 from app.database.connection import Base
 
@@ -21,6 +21,8 @@ class Profile(Base):
     
     __table_args__ = (
         CheckConstraint("role IN ('user', 'admin', 'ngo', 'vendor')", name='check_role'),
+        # Emails are unique ignoring case; login and registration look profiles up by lower(email)
+        Index('ix_profiles_email_lower', func.lower(email), unique=True),
     )
     
     # Relationships
@@ -31,6 +33,13 @@ class Profile(Base):
     created_tickets = relationship("Ticket", foreign_keys="[Ticket.created_by_user_id]", back_populates="creator", cascade="all, delete-orphan")
     assigned_tickets = relationship("Ticket", foreign_keys="[Ticket.assigned_to_user_id]", back_populates="assignee")
 
+NGO_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(city, '') || ' ' || coalesce(state, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(mission, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+)
+
 class NGO(Base):
     __tablename__ = "ngos"
     
@@ -56,12 +65,29 @@ class NGO(Base):
     verified = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Maintained by Postgres; weights rank name matches above location, mission and description.
+    # Deferred so loading an NGO doesn't ship the vector over the wire
+    search_vector = deferred(Column(TSVECTOR, Computed(NGO_SEARCH_VECTOR_SQL, persisted=True)))
+    
+    __table_args__ = (
+        Index('ix_ngos_search_vector', 'search_vector', postgresql_using='gin'),
+        # Trigram indexes serve the fuzzy (typo-tolerant) half of NGO search
+        Index('ix_ngos_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_ngos_city_trgm', 'city', postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'}),
+        # Proximity search finds pin codes first, then the first NGOs by id in each
+        Index('ix_ngos_pin_code', 'pin_code', 'id'),
+        # Every NGO dashboard request resolves the current user's NGO
+        Index('ix_ngos_user_id', 'user_id'),
+    )
     
     # Relationships
     profile = relationship("Profile", back_populates="ngos")
     packages = relationship("Package", back_populates="ngo", cascade="all, delete-orphan")
     transactions = relationship("Transaction", back_populates="ngo")
 
+# gin_trgm_ops needs pg_trgm before create_all builds the NGO indexes
+event.listen(NGO.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 class Vendor(Base):
     __tablename__ = "vendors"
     
@@ -82,10 +108,22 @@ class Vendor(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    __table_args__ = (
+        # Vendors are located by city; matches CityLocation's normalised keys
+        Index('ix_vendors_city_state', func.lower(func.trim(city)), func.lower(func.trim(state))),
+        # Every vendor dashboard request resolves the current user's vendor
+        Index('ix_vendors_user_id', user_id),
+    )
+    
     # Relationships
     profile = relationship("Profile", back_populates="vendors")
     transactions = relationship("Transaction", back_populates="vendor")
 
+# Share of a package's target already donated; the leaderboard orders by it
+PACKAGE_FUNDED_SHARE_SQL = "(current_quantity * 1.0 / target_quantity)"
+# Packages still collecting towards a target
+PACKAGE_OPEN_GOAL_SQL = "status = 'active' AND target_quantity > 0 AND current_quantity < target_quantity"
+
 class Package(Base):
     __tablename__ = "packages"
     
@@ -104,6 +142,12 @@ class Package(Base):
     
     __table_args__ = (
         CheckConstraint("status IN ('active', 'inactive', 'completed')", name='check_package_status'),
+        # "Closest to goal" top-N is a scan of the head of this index
+        Index(
+            'ix_packages_closest_to_goal', text(f"{PACKAGE_FUNDED_SHARE_SQL} DESC"), 'id',
+            postgresql_where=text(PACKAGE_OPEN_GOAL_SQL)
+        ),
+        Index('ix_packages_ngo_id', ngo_id),
     )
     
     # Relationships
@@ -127,10 +171,62 @@ class Donation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    __table_args__ = (
+        Index('ix_donations_user_id_created_at', user_id, created_at),
+        # The archiver walks donations oldest first
+        Index('ix_donations_created_at', created_at, id),
+    )
+    
     # Relationships
     profile = relationship("Profile", back_populates="donations")
     transactions = relationship("Transaction", back_populates="donation", cascade="all, delete-orphan")
 
+class PackageWeeklyFunding(Base):
+    __tablename__ = "package_weekly_funding"
+    
+    # Completed donations per package per week (weeks start on Monday, UTC),
+    # updated in the same transaction that completes or reverses a donation
+    week_start = Column(Date, primary_key=True)
+    package_id = Column(UUID(as_uuid=True), ForeignKey('packages.id', ondelete='CASCADE'), primary_key=True)
+    amount = Column(DECIMAL(12, 2), nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    donations = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('ix_package_weekly_funding_week_amount', week_start, amount.desc(), package_id),
+    )
+
+class DonationRollup(Base):
+    __tablename__ = "donation_rollups"
+    
+    # Completed donations per hour/day (UTC) for the platform ('all'), one NGO, package or category;
+    # updated in the same transaction that completes or reverses a donation
+    grain = Column(Text, primary_key=True)
+    dimension = Column(Text, primary_key=True)
+    key = Column(Text, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    donations = Column(Integer, nullable=False, default=0)
+    amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    unique_donors = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint("grain IN ('hour', 'day')", name='check_donation_rollup_grain'),
+        CheckConstraint("dimension IN ('all', 'ngo', 'package', 'category')", name='check_donation_rollup_dimension'),
+    )
+
+class DonationRollupDonor(Base):
+    __tablename__ = "donation_rollup_donors"
+    
+    # Completed donations per donor in each rollup bucket, so unique_donors stays exact as donations come and go
+    grain = Column(Text, primary_key=True)
+    dimension = Column(Text, primary_key=True)
+    key = Column(Text, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    donations = Column(Integer, nullable=False, default=0)
+
 class Transaction(Base):
     __tablename__ = "transactions"
     
@@ -158,6 +254,13 @@ class Transaction(Base):
             "status IN ('pending_admin_assignment', 'assigned_to_vendor', 'vendor_processing', 'shipped', 'delivered', 'completed', 'cancelled', 'issue_reported')",
             name='check_transaction_status'
         ),
+        Index('ix_transactions_donor_user_id', donor_user_id),
+        # Dashboards list a vendor's or NGO's orders newest first, optionally by status
+        Index('ix_transactions_vendor_id_status_created_at', vendor_id, status, created_at),
+        Index('ix_transactions_ngo_id_created_at', ngo_id, created_at),
+        # Admin lists and the assignment queue filter on status and order by age
+        Index('ix_transactions_status_created_at', status, created_at),
+        Index('ix_transactions_donation_id', donation_id),
     )
     
     # Relationships
@@ -166,6 +269,97 @@ class Transaction(Base):
     vendor = relationship("Vendor", back_populates="transactions")
     donor_profile = relationship("Profile", back_populates="transactions")
     tickets = relationship("Ticket", back_populates="transaction", cascade="all, delete-orphan")
+    # package_id has no FK constraint, so the join is declared explicitly
+    package = relationship("Package", primaryjoin="foreign(Transaction.package_id) == Package.id", viewonly=True)
+    events = relationship("TransactionEvent", back_populates="transaction", order_by="TransactionEvent.created_at", passive_deletes=True)
+
+class TransactionEvent(Base):
+    __tablename__ = "transaction_events"
+    
+    # Append-only history of status changes; rows are never updated
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    transaction_id = Column(UUID(as_uuid=True), ForeignKey('transactions.id', ondelete='CASCADE'), nullable=False)
+    from_status = Column(Text)
+    to_status = Column(Text, nullable=False)
+    actor_user_id = Column(UUID(as_uuid=True), ForeignKey('profiles.user_id', ondelete='SET NULL'))
+    notes = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('ix_transaction_events_transaction_id_created_at', 'transaction_id', 'created_at'),
+    )
+    
+    # Relationships
+    transaction = relationship("Transaction", back_populates="events")
+    actor = relationship("Profile")
+
+class DonationArchive(Base):
+    __tablename__ = "donations_archive"
+    
+    # Settled donations past ARCHIVE_HORIZON_DAYS with no live transactions,
+    # moved here by the archiver. Partitioned by month of created_at; the
+    # partitions are created as rows arrive. No foreign keys, since archived
+    # rows outlive what they referenced.
+    id = Column(UUID(as_uuid=True), nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    ngo_id = Column(Text, nullable=False)
+    package_id = Column(Text, nullable=False)
+    package_title = Column(Text, nullable=False)
+    package_amount = Column(DECIMAL(10, 2), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    total_amount = Column(DECIMAL(10, 2), nullable=False)
+    payment_method = Column(Text, nullable=False)
+    payment_status = Column(Text, nullable=False)
+    transaction_id = Column(Text)
+    invoice_number = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        # Partitioned tables need the partition key in every unique constraint
+        PrimaryKeyConstraint('id', 'created_at'),
+        Index('ix_donations_archive_user_id_created_at', 'user_id', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+class TransactionArchive(Base):
+    __tablename__ = "transactions_archive"
+    
+    # Completed transactions past ARCHIVE_HORIZON_DAYS, moved here by the
+    # archiver with their events, tickets and invoices as JSON. Partitioned
+    # like donations_archive.
+    id = Column(UUID(as_uuid=True), nullable=False)
+    donation_id = Column(UUID(as_uuid=True), nullable=False)
+    package_id = Column(UUID(as_uuid=True), nullable=False)
+    ngo_id = Column(UUID(as_uuid=True), nullable=False)
+    vendor_id = Column(UUID(as_uuid=True))
+    donor_user_id = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(Text, nullable=False)
+    tracking_number = Column(Text)
+    delivery_note_url = Column(Text)
+    invoice_url = Column(Text)
+    admin_notes = Column(Text)
+    vendor_notes = Column(Text)
+    assigned_at = Column(DateTime(timezone=True))
+    shipped_at = Column(DateTime(timezone=True))
+    delivered_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    events = Column(JSONB)
+    tickets = Column(JSONB)
+    invoices = Column(JSONB)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        PrimaryKeyConstraint('id', 'created_at'),
+        Index('ix_transactions_archive_donor_user_id', 'donor_user_id'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+# Tickets still waiting on an admin
+TICKET_OPEN_SQL = "status IN ('open', 'in_progress')"
 
 class Ticket(Base):
     __tablename__ = "tickets"
@@ -191,6 +385,13 @@ class Ticket(Base):
             "category IN ('delivery_delay', 'quality_issue', 'missing_items', 'wrong_delivery', 'invoice_issue', 'tracking_issue', 'other')",
             name='check_ticket_category'
         ),
+        Index('ix_tickets_status_created_at', status, created_at),
+        # Open queue by priority; resolved and closed tickets are most of the table
+        Index(
+            'ix_tickets_open_priority_created_at', priority, created_at,
+            postgresql_where=text(TICKET_OPEN_SQL)
+        ),
+        Index('ix_tickets_transaction_id', transaction_id),
     )
     
     # Relationships
@@ -213,6 +414,9 @@ class ApplicationSettings(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+# Invoices waiting for admin review
+INVOICE_PENDING_SQL = "status = 'pending'"
+
 class VendorInvoice(Base):
     __tablename__ = "vendor_invoices"
     
@@ -232,6 +436,10 @@ class VendorInvoice(Base):
     
     __table_args__ = (
         CheckConstraint("status IN ('pending', 'approved', 'rejected')", name='check_invoice_status'),
+        Index('ix_vendor_invoices_vendor_id_created_at', vendor_id, created_at),
+        # Review queue; approved and rejected invoices are never scanned by status
+        Index('ix_vendor_invoices_pending_created_at', created_at, postgresql_where=text(INVOICE_PENDING_SQL)),
+        Index('ix_vendor_invoices_transaction_id', transaction_id),
     )
     
     # Relationships
@@ -262,4 +470,68 @@ class DonationPackage(Base):
     
     # Relationships
     assigned_vendor = relationship("Vendor")
-    creator = relationship("Profile")
\ No newline at end of file
+    creator = relationship("Profile")
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+    
+    # Deferred work queue; finished jobs are deleted, failed ones end up 'dead'
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    task = Column(Text, nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(Text, nullable=False, default='queued')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'dead')", name='check_background_job_status'),
+        Index('ix_background_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    # Rows only need to outlive the token itself; user_id has no FK so history survives user deletion
+    jti = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True))
+    token_type = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint("token_type IN ('access', 'refresh')", name='check_revoked_token_type'),
+        Index('ix_revoked_tokens_revoked_at', 'revoked_at'),
+        Index('ix_revoked_tokens_expires_at', 'expires_at'),
+    )
+
+class PinCode(Base):
+    __tablename__ = "pin_codes"
+    
+    # Centroid of the pin code's post offices, loaded from app/data/pin_codes.csv.gz
+    pin_code = Column(String(6), primary_key=True)
+    district = Column(Text)
+    state = Column(Text, nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_pin_codes_latitude_longitude', 'latitude', 'longitude'),
+    )
+
+class CityLocation(Base):
+    __tablename__ = "city_locations"
+    
+    # Keys are lower-cased and trimmed so lookups match however the city was typed
+    city = Column(Text, primary_key=True)
+    state = Column(Text, primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_city_locations_latitude_longitude', 'latitude', 'longitude'),
+    )
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 import uuid
 
@@ -14,10 +15,16 @@ from ..schemas.schemas import (
     NGOResponse, NGOUpdate, VendorResponse, VendorUpdate,
     ApplicationSettingsResponse, ApplicationSettingsUpdate, ApplicationSettingsCreate,
     DonationPackageResponse, DonationPackageCreate, DonationPackageUpdate,
-    VendorInvoiceResponse, SuccessResponse, UserRole, ApprovalStatus
+    VendorInvoiceResponse, DonationSeriesResponse, AdminOverviewResponse,
+    SuccessResponse, UserRole, ApprovalStatus
 )
 from ..middleware.auth import get_current_active_user
-from ..utils.email_service import email_service
+from ..utils.jobs import enqueue_job
+from ..utils.cache import settings_cache
+from ..utils.vendor_assignment import assign_pending_transactions, VENDOR_AUTO_ASSIGN_BATCH_SIZE
+from ..utils.analytics import load_donation_series, SeriesRangeError, ALL_KEY
+from ..utils.admin_overview import load_admin_overview, refresh_admin_overview
+from ..utils.archive import archiver, export_csv, check_export_range, ExportRangeError, ARCHIVE_HORIZON_DAYS
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -29,6 +36,59 @@ def check_admin_role(current_user: Profile):
             detail="Only admins can access this endpoint"
         )
 
+def admin_overview_response(overview: dict) -> AdminOverviewResponse:
+    return AdminOverviewResponse(
+        pending_ngo_approvals=overview["pending_ngo_approvals"],
+        pending_vendor_approvals=overview["pending_vendor_approvals"],
+        unassigned_transactions=overview["unassigned_transactions"],
+        oldest_unassigned_at=overview["oldest_unassigned_at"],
+        open_tickets={
+            priority: overview[f"open_tickets_{priority}"]
+            for priority in ("low", "medium", "high", "urgent")
+        },
+        pending_invoices=overview["pending_invoices"],
+        pending_invoice_amount=overview["pending_invoice_amount"],
+        donations_today=overview["donations_today"],
+        donation_amount_today=overview["donation_amount_today"],
+        donations_7d=overview["donations_7d"],
+        donation_amount_7d=overview["donation_amount_7d"],
+        donations_30d=overview["donations_30d"],
+        donation_amount_30d=overview["donation_amount_30d"],
+        refreshed_at=overview["refreshed_at"]
+    )
+
+# Overview
+@router.get("/overview", response_model=AdminOverviewResponse)
+async def get_admin_overview(
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get pending approvals, unassigned work, open tickets and donation volume (Admin only)."""
+    check_admin_role(current_user)
+    
+    overview = await load_admin_overview(db)
+    if not overview:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Admin overview not available yet"
+        )
+    return admin_overview_response(overview)
+
+@router.post("/overview/refresh", response_model=AdminOverviewResponse)
+async def refresh_overview(
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Recompute the overview now instead of waiting for the next scheduled refresh (Admin only)."""
+    check_admin_role(current_user)
+    
+    # If another worker is mid-refresh, its result is about to land; return what is there
+    await refresh_admin_overview(db)
+    await db.commit()
+    
+    overview = await load_admin_overview(db)
+    return admin_overview_response(overview)
+
 # NGO Management
 @router.get("/ngos", response_model=List[NGOResponse])
 async def get_all_ngos(
@@ -327,6 +387,7 @@ async def get_application_settings(
         db.add(settings)
         await db.commit()
         await db.refresh(settings)
+        settings_cache.invalidate()
     
     return ApplicationSettingsResponse(
         id=settings.id,
@@ -371,6 +432,7 @@ async def update_application_settings(
             await db.execute(stmt)
     
     await db.commit()
+    settings_cache.invalidate()
     
     return SuccessResponse(
         success=True,
@@ -566,21 +628,21 @@ async def approve_vendor_invoice(
     
     stmt = update(VendorInvoice).where(VendorInvoice.id == invoice_id).values(**update_data)
     await db.execute(stmt)
-    await db.commit()
     
-    # Send email notification to vendor
+    # Queue email notification to vendor
     vendor_stmt = select(Vendor).where(Vendor.id == invoice.vendor_id)
     vendor_result = await db.execute(vendor_stmt)
     vendor = vendor_result.scalar_one_or_none()
     
     if vendor and vendor.email:
-        await email_service.send_invoice_approval_notification(
-            vendor_email=vendor.email,
-            vendor_name=vendor.shop_name,
-            invoice_number=invoice.invoice_number,
-            invoice_amount=invoice.invoice_amount,
-            admin_notes=admin_notes
-        )
+        await enqueue_job(db, "email.invoice_approved", {
+            "vendor_email": vendor.email,
+            "vendor_name": vendor.company_name,
+            "invoice_number": invoice.invoice_number,
+            "invoice_amount": float(invoice.invoice_amount),
+            "admin_notes": admin_notes
+        })
+    await db.commit()
     
     return SuccessResponse(
         success=True,
@@ -619,23 +681,125 @@ async def reject_vendor_invoice(
     
     stmt = update(VendorInvoice).where(VendorInvoice.id == invoice_id).values(**update_data)
     await db.execute(stmt)
-    await db.commit()
     
-    # Send email notification to vendor
+    # Queue email notification to vendor
     vendor_stmt = select(Vendor).where(Vendor.id == invoice.vendor_id)
     vendor_result = await db.execute(vendor_stmt)
     vendor = vendor_result.scalar_one_or_none()
     
     if vendor and vendor.email:
-        await email_service.send_invoice_rejection_notification(
-            vendor_email=vendor.email,
-            vendor_name=vendor.shop_name,
-            invoice_number=invoice.invoice_number,
-            invoice_amount=invoice.invoice_amount,
-            admin_notes=admin_notes
-        )
+        await enqueue_job(db, "email.invoice_rejected", {
+            "vendor_email": vendor.email,
+            "vendor_name": vendor.company_name,
+            "invoice_number": invoice.invoice_number,
+            "invoice_amount": float(invoice.invoice_amount),
+            "admin_notes": admin_notes
+        })
+    await db.commit()
     
     return SuccessResponse(
         success=True,
         message="Invoice rejected successfully"
-    )
\ No newline at end of file
+    )
+
+# Transaction Assignment
+@router.post("/transactions/auto-assign", response_model=SuccessResponse)
+async def auto_assign_transactions(
+    dry_run: bool = Query(False),
+    limit: int = Query(VENDOR_AUTO_ASSIGN_BATCH_SIZE, ge=1, le=5000),
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Assign a batch of pending transactions to vendors, or preview it with dry_run."""
+    check_admin_role(current_user)
+    
+    result = await assign_pending_transactions(db, limit=limit, dry_run=dry_run)
+    if not dry_run:
+        await db.commit()
+    
+    action = "Would assign" if dry_run else "Assigned"
+    return SuccessResponse(
+        success=True,
+        message=f"{action} {result['assigned']} of {result['pending']} pending transactions",
+        data=result,
+        count=result["assigned"]
+    )
+
+# Donation Analytics
+@router.get("/analytics/donations", response_model=DonationSeriesResponse)
+async def get_donation_analytics(
+    grain: str = Query("day", pattern="^(hour|day)$"),
+    dimension: str = Query("all", pattern="^(all|ngo|package|category)$"),
+    key: Optional[str] = Query(None, description="NGO id, package id or category name"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get hourly or daily donation trends from the rollups (Admin only)."""
+    check_admin_role(current_user)
+    
+    if dimension != "all" and not key:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="key is required unless dimension is 'all'"
+        )
+    
+    try:
+        return await load_donation_series(
+            db, grain, dimension, ALL_KEY if dimension == "all" else key, start, end
+        )
+    except SeriesRangeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+# Export and Archival
+@router.get("/export/{dataset}")
+async def export_dataset(
+    dataset: str = Path(..., pattern="^(transactions|donations)$"),
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    include_archived: bool = Query(True),
+    compress: bool = Query(False),
+    current_user: Profile = Depends(get_current_active_user)
+):
+    """Download transactions or donations created in [start, end) as CSV, archived rows included (Admin only)."""
+    check_admin_role(current_user)
+    
+    # Naive datetimes are taken as UTC
+    start, end = (value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in (start, end))
+    try:
+        check_export_range(start, end)
+    except ExportRangeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    filename = f"{dataset}_{start:%Y%m%d}_{end:%Y%m%d}.csv" + (".gz" if compress else "")
+    return StreamingResponse(
+        export_csv(dataset, start, end, include_archived=include_archived, compress=compress),
+        media_type="application/gzip" if compress else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/archive/run", response_model=SuccessResponse)
+async def run_archive(
+    current_user: Profile = Depends(get_current_active_user)
+):
+    """Archive settled transactions and donations past the horizon now (Admin only)."""
+    check_admin_role(current_user)
+    
+    result = await archiver.run_once()
+    archived = result["archived"]
+    return SuccessResponse(
+        success=True,
+        message=(
+            f"Archived {archived['transactions']} transactions and {archived['donations']} donations "
+            f"older than {ARCHIVE_HORIZON_DAYS} days"
+        ),
+        data={**result, "cutoff": result["cutoff"].isoformat()},
+        count=archived["transactions"] + archived["donations"]
+    )
@@ -1,28 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from datetime import timedelta, datetime
+from sqlalchemy import select, update, exists, func
+from sqlalchemy.dialects.postgresql import insert
+from datetime import timedelta, datetime, timezone
+import asyncio
 import uuid
 import logging
 import traceback
+from typing import Optional
 
 from ..database.connection import get_db_session
-from ..models.models import Profile, NGO, Vendor, ApplicationSettings
+from ..models.models import Profile, NGO, Vendor, ApplicationSettings, RevokedToken
 from ..schemas.schemas import (
     ProfileCreate, ProfileLogin, ProfileResponse, 
     Token, AuthResponse, SuccessResponse, NGORegistration, VendorRegistration,
-    ApprovalRequest, ApprovalStatus, UserRole
+    ApprovalRequest, ApprovalStatus, UserRole, RefreshTokenRequest, LogoutRequest
 )
 from ..middleware.auth import (
-    verify_password, get_password_hash, create_access_token,
-    get_current_active_user, ACCESS_TOKEN_EXPIRE_MINUTES
+    verify_and_update_password, get_password_hash, create_access_token, create_refresh_token,
+    decode_token, get_current_active_user, optional_security, ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from ..utils.email_service import email_service
+from ..middleware.rate_limit import login_rate_limit, register_rate_limit
+from ..utils.jobs import enqueue_job
+from ..utils.revocation import revoke_token
 
 router = APIRouter(tags=["authentication"])
+logger = logging.getLogger(__name__)
 
-@router.post("/register", response_model=AuthResponse)
+def email_matches(email: str):
+    """Case-insensitive email match; served by the unique index on lower(email)."""
+    return func.lower(Profile.email) == func.lower(email)
+
+@router.post("/register", response_model=AuthResponse, dependencies=[register_rate_limit])
 async def register_user(
     user_data: ProfileCreate,
     db: AsyncSession = Depends(get_db_session)
@@ -40,38 +50,37 @@ async def register_user(
                 detail="Email and password are required"
             )
         
-        # Check if user already exists
-        stmt = select(Profile).where(Profile.email == user_data.email)
+        hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
+        
+        # Create the user unless the email is taken, in one statement; the unique
+        # index on lower(email) also settles concurrent registrations
+        stmt = (
+            insert(Profile)
+            .values(
+                id=uuid.uuid4(),
+                user_id=uuid.uuid4(),
+                first_name=user_data.first_name,
+                last_name=user_data.last_name,
+                email=user_data.email,
+                phone=user_data.phone,
+                role=user_data.role or 'user',
+                password_hash=hashed_password
+            )
+            .on_conflict_do_nothing(index_elements=[func.lower(Profile.email)])
+            .returning(Profile)
+        )
         result = await db.execute(stmt)
-        existing_user = result.scalar_one_or_none()
+        new_user = result.scalar_one_or_none()
         
-        if existing_user:
+        if new_user is None:
             logger.warning(f"Registration failed: User already exists with email {user_data.email}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this email already exists"
             )
         
-        # Create new user
-        user_id = uuid.uuid4()
-        hashed_password = get_password_hash(user_data.password)
-        
-        new_user = Profile(
-            id=uuid.uuid4(),
-            user_id=user_id,
-            first_name=user_data.first_name,
-            last_name=user_data.last_name,
-            email=user_data.email,
-            phone=user_data.phone,
-            role=user_data.role or 'user',
-            password_hash=hashed_password
-        )
-        
-        logger.info(f"Creating new user with role: {new_user.role} for email: {user_data.email}")
-        
-        db.add(new_user)
+        logger.info(f"Created new user with role: {new_user.role} for email: {user_data.email}")
         await db.commit()
-        await db.refresh(new_user)
         
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -83,6 +92,13 @@ async def register_user(
             },
             expires_delta=access_token_expires
         )
+        refresh_token = create_refresh_token(
+            data={
+                "sub": str(new_user.user_id),
+                "email": new_user.email,
+                "role": new_user.role
+            }
+        )
         
         logger.info(f"User registration successful for email: {user_data.email}")
         
@@ -91,6 +107,7 @@ async def register_user(
             message="User registered successfully",
             data={
                 "access_token": access_token,
+                "refresh_token": refresh_token,
                 "token_type": "bearer",
                 "user": {
                     "id": str(new_user.id),
@@ -115,7 +132,7 @@ async def register_user(
             detail=f"Failed to register user: {str(e)}"
         )
 
-@router.post("/login", response_model=AuthResponse)
+@router.post("/login", response_model=AuthResponse, dependencies=[login_rate_limit])
 async def login_user(
     login_data: ProfileLogin,
     db: AsyncSession = Depends(get_db_session)
@@ -126,7 +143,7 @@ async def login_user(
     
     try:
         # Find user by email
-        stmt = select(Profile).where(Profile.email == login_data.email)
+        stmt = select(Profile).where(email_matches(login_data.email))
         result = await db.execute(stmt)
         user = result.scalar_one_or_none()
         
@@ -140,8 +157,10 @@ async def login_user(
         
         logger.info(f"User found: {user.email}, role: {user.role}")
         
-        # Verify password
-        password_valid = verify_password(login_data.password, user.password_hash)
+        # Verify password off the event loop; a bcrypt check takes hundreds of milliseconds
+        password_valid, new_hash = await asyncio.to_thread(
+            verify_and_update_password, login_data.password, user.password_hash
+        )
         logger.info(f"Password verification result: {password_valid}")
         
         if not password_valid:
@@ -152,6 +171,11 @@ async def login_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        # Transparently upgrade hashes made with an older scheme or cost; committed with the login
+        if new_hash:
+            user.password_hash = new_hash
+            logger.info(f"Rehashed password for user: {user.email}")
+        
         # Note: Approval system has been simplified - all users can login after registration
         
         # Create access token
@@ -164,25 +188,29 @@ async def login_user(
             },
             expires_delta=access_token_expires
         )
+        refresh_token = create_refresh_token(
+            data={
+                "sub": str(user.user_id),
+                "email": user.email,
+                "role": user.role
+            }
+        )
         
-        # Send welcome email after successful login
-        try:
-            user_full_name = f"{user.first_name} {user.last_name}".strip() or user.email
-            await email_service.send_login_welcome_email(
-                db=db,
-                user_name=user_full_name,
-                user_email=user.email,
-                user_role=user.role
-            )
-        except Exception as email_error:
-            # Log email error but don't fail the login
-            logging.error(f"Failed to send welcome email to {user.email}: {email_error}")
+        # Queue welcome email; it is sent in the background after the response
+        user_full_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.email
+        await enqueue_job(db, "email.login_welcome", {
+            "user_name": user_full_name,
+            "user_email": user.email,
+            "user_role": user.role
+        })
+        await db.commit()
         
         return AuthResponse(
             success=True,
             message="Login successful",
             data={
                 "access_token": access_token,
+                "refresh_token": refresh_token,
                 "token_type": "bearer",
                 "user": {
                     "id": str(user.id),
@@ -220,15 +248,95 @@ async def get_current_user_info(
         updated_at=current_user.updated_at
     )
 
+@router.post("/refresh", response_model=AuthResponse)
+async def refresh_access_token(
+    refresh_data: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Exchange a refresh token for a new access/refresh token pair."""
+    payload = decode_token(refresh_data.refresh_token, "refresh")
+    invalid_token_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if payload.get("jti") is None:
+        raise invalid_token_exception
+    
+    # Consume the token and load the user in one round trip; the user row only
+    # comes back if this request is the one that revoked the token
+    consumed = (
+        insert(RevokedToken)
+        .values(
+            jti=uuid.UUID(payload["jti"]),
+            user_id=uuid.UUID(payload["sub"]),
+            token_type="refresh",
+            expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        )
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        .returning(RevokedToken.jti)
+        .cte("consumed")
+    )
+    stmt = select(Profile.user_id, Profile.email, Profile.role).where(
+        Profile.user_id == uuid.UUID(payload["sub"]),
+        exists(select(consumed.c.jti))
+    )
+    result = await db.execute(stmt)
+    user = result.one_or_none()
+    await db.commit()
+    
+    if user is None:
+        # Already used (possibly replayed after theft) or the user no longer exists
+        logger.warning(f"Rejected refresh token {payload['jti']} for user {payload['sub']}")
+        raise invalid_token_exception
+    
+    claims = {
+        "sub": str(user.user_id),
+        "email": user.email,
+        "role": user.role
+    }
+    return AuthResponse(
+        success=True,
+        message="Token refreshed",
+        data={
+            "access_token": create_access_token(
+                data=claims,
+                expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            ),
+            "refresh_token": create_refresh_token(data=claims),
+            "token_type": "bearer"
+        }
+    )
+
 @router.post("/logout", response_model=SuccessResponse)
-async def logout_user():
-    """Logout user (client-side token removal)."""
+async def logout_user(
+    logout_data: Optional[LogoutRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Logout user by revoking the presented access token and refresh token."""
+    tokens = [
+        (credentials.credentials if credentials else None, "access"),
+        (logout_data.refresh_token if logout_data else None, "refresh")
+    ]
+    for token, token_type in tokens:
+        if not token:
+            continue
+        try:
+            payload = decode_token(token, token_type)
+        except HTTPException:
+            # Invalid or expired tokens are unusable already
+            continue
+        if payload.get("jti"):
+            await revoke_token(db, payload["jti"], token_type, payload["exp"], payload["sub"])
+    await db.commit()
+    
     return SuccessResponse(
         success=True,
         message="Logged out successfully. Please remove the token from client storage."
     )
 
-@router.post("/register/ngo", response_model=SuccessResponse)
+@router.post("/register/ngo", response_model=SuccessResponse, dependencies=[register_rate_limit])
 async def register_ngo(
     ngo_data: NGORegistration,
     db: AsyncSession = Depends(get_db_session)
@@ -236,7 +344,7 @@ async def register_ngo(
     """Register a new NGO (requires admin approval)."""
     try:
         # Check if user already exists
-        stmt = select(Profile).where(Profile.email == ngo_data.email)
+        stmt = select(Profile).where(email_matches(ngo_data.email))
         result = await db.execute(stmt)
         existing_user = result.scalar_one_or_none()
         
@@ -248,7 +356,7 @@ async def register_ngo(
         
         # Create new profile
         user_id = uuid.uuid4()
-        hashed_password = get_password_hash(ngo_data.password)
+        hashed_password = await asyncio.to_thread(get_password_hash, ngo_data.password)
         
         new_profile = Profile(
             id=uuid.uuid4(),
@@ -285,9 +393,8 @@ async def register_ngo(
         
         db.add(new_profile)
         db.add(new_ngo)
-        await db.commit()
         
-        # Send email notification to admin
+        # Notify the admin in the same commit as the registration
         registration_details = {
             "ngo_name": ngo_data.name,
             "description": ngo_data.description,
@@ -305,17 +412,13 @@ async def register_ngo(
             "mission": ngo_data.mission
         }
         
-        try:
-            await email_service.send_registration_approval_request(
-                db=db,
-                user_name=ngo_data.name,
-                user_email=ngo_data.email,
-                user_role=UserRole.NGO,
-                registration_details=registration_details
-            )
-        except Exception as e:
-            # Log error but don't fail registration
-            print(f"Failed to send email notification: {e}")
+        await enqueue_job(db, "email.registration_approval_request", {
+            "user_name": ngo_data.name,
+            "user_email": ngo_data.email,
+            "user_role": UserRole.NGO.value,
+            "registration_details": registration_details
+        })
+        await db.commit()
         
         return SuccessResponse(
             success=True,
@@ -331,7 +434,7 @@ async def register_ngo(
             detail="Failed to register NGO"
         )
 
-@router.post("/register/vendor", response_model=SuccessResponse)
+@router.post("/register/vendor", response_model=SuccessResponse, dependencies=[register_rate_limit])
 async def register_vendor(
     vendor_data: VendorRegistration,
     db: AsyncSession = Depends(get_db_session)
@@ -339,7 +442,7 @@ async def register_vendor(
     """Register a new Vendor (requires admin approval)."""
     try:
         # Check if user already exists
-        stmt = select(Profile).where(Profile.email == vendor_data.email)
+        stmt = select(Profile).where(email_matches(vendor_data.email))
         result = await db.execute(stmt)
         existing_user = result.scalar_one_or_none()
         
@@ -351,7 +454,7 @@ async def register_vendor(
         
         # Create new profile
         user_id = uuid.uuid4()
-        hashed_password = get_password_hash(vendor_data.password)
+        hashed_password = await asyncio.to_thread(get_password_hash, vendor_data.password)
         
         new_profile = Profile(
             id=uuid.uuid4(),
@@ -388,9 +491,8 @@ async def register_vendor(
         
         db.add(new_profile)
         db.add(new_vendor)
-        await db.commit()
         
-        # Send email notification to admin
+        # Notify the admin in the same commit as the registration
         registration_details = {
             "shop_name": vendor_data.shop_name,
             "owner_name": vendor_data.owner_name,
@@ -409,17 +511,13 @@ async def register_vendor(
             "email": vendor_data.email
         }
         
-        try:
-            await email_service.send_registration_approval_request(
-                db=db,
-                user_name=vendor_data.shop_name,
-                user_email=vendor_data.email,
-                user_role=UserRole.VENDOR,
-                registration_details=registration_details
-            )
-        except Exception as e:
-            # Log error but don't fail registration
-            print(f"Failed to send email notification: {e}")
+        await enqueue_job(db, "email.registration_approval_request", {
+            "user_name": vendor_data.shop_name,
+            "user_email": vendor_data.email,
+            "user_role": UserRole.VENDOR.value,
+            "registration_details": registration_details
+        })
+        await db.commit()
         
         return SuccessResponse(
             success=True,
@@ -467,39 +565,32 @@ async def approve_user(
         user_to_approve.approved_by = current_user.user_id
         user_to_approve.approved_at = datetime.utcnow()
         
+        # Queue email notification to user, committed together with the approval
+        user_name = ""
+        
+        # Get user name based on role
+        if user_to_approve.role == UserRole.NGO:
+            ngo_stmt = select(NGO).where(NGO.user_id == user_to_approve.user_id)
+            ngo_result = await db.execute(ngo_stmt)
+            ngo = ngo_result.scalar_one_or_none()
+            if ngo:
+                user_name = ngo.name
+        elif user_to_approve.role == UserRole.VENDOR:
+            vendor_stmt = select(Vendor).where(Vendor.user_id == user_to_approve.user_id)
+            vendor_result = await db.execute(vendor_stmt)
+            vendor = vendor_result.scalar_one_or_none()
+            if vendor:
+                user_name = vendor.company_name
+        
+        await enqueue_job(db, "email.approval_notification", {
+            "user_name": user_name or f"{user_to_approve.first_name} {user_to_approve.last_name}",
+            "user_email": user_to_approve.email,
+            "user_role": user_to_approve.role,
+            "approved": approval_data.approval_status == ApprovalStatus.APPROVED,
+            "admin_notes": getattr(approval_data, 'admin_notes', None)
+        })
         await db.commit()
         
-        # Send email notification to user
-        try:
-            user_name = ""
-            user_email = user_to_approve.email
-            
-            # Get user name based on role
-            if user_to_approve.role == UserRole.NGO:
-                ngo_stmt = select(NGO).where(NGO.user_id == user_to_approve.user_id)
-                ngo_result = await db.execute(ngo_stmt)
-                ngo = ngo_result.scalar_one_or_none()
-                if ngo:
-                    user_name = ngo.name
-            elif user_to_approve.role == UserRole.VENDOR:
-                vendor_stmt = select(Vendor).where(Vendor.user_id == user_to_approve.user_id)
-                vendor_result = await db.execute(vendor_stmt)
-                vendor = vendor_result.scalar_one_or_none()
-                if vendor:
-                    user_name = vendor.shop_name
-            
-            await email_service.send_approval_notification(
-                db=db,
-                user_name=user_name or f"{user_to_approve.first_name} {user_to_approve.last_name}",
-                user_email=user_email,
-                user_role=user_to_approve.role,
-                approved=(approval_data.approval_status == ApprovalStatus.APPROVED),
-                admin_notes=getattr(approval_data, 'notes', None)
-            )
-        except Exception as e:
-            # Log error but don't fail approval process
-            print(f"Failed to send approval notification email: {e}")
-        
         status_message = "approved" if approval_data.approval_status == ApprovalStatus.APPROVED else "rejected"
         
         return SuccessResponse(
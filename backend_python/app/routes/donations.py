@@ -7,14 +7,27 @@ import uuid
 from ..database.connection import get_db_session
 from ..models.models import Donation, Package, NGO
 from ..schemas.schemas import (
-    DonationCreate, DonationUpdate, DonationResponse, SuccessResponse
+    DonationCreate, DonationUpdate, DonationResponse, DonorImpactResponse, SuccessResponse
 )
 from ..middleware.auth import (
     get_current_active_user, require_admin
 )
+from ..utils.cache import catalog_cache
+from ..utils.leaderboard import record_funding
+from ..utils.analytics import record_donation
+from ..utils.impact import load_donor_impact
 
 router = APIRouter(tags=["donations"])
 
+async def get_package(db: AsyncSession, package_id: str) -> Optional[Package]:
+    """Load a donation's package; donations store its id as text."""
+    try:
+        package_uuid = uuid.UUID(package_id)
+    except ValueError:
+        return None
+    result = await db.execute(select(Package).where(Package.id == package_uuid))
+    return result.scalar_one_or_none()
+
 @router.get("/", response_model=List[DonationResponse])
 async def get_all_donations(
     skip: int = Query(0, ge=0),
@@ -31,15 +44,15 @@ async def get_all_donations(
         
         # Apply user-based filtering
         if current_user.role != "admin":
-            stmt = stmt.where(Donation.donor_id == current_user.user_id)
+            stmt = stmt.where(Donation.user_id == current_user.user_id)
         
         # Apply additional filters
         if donor_id and current_user.role == "admin":
-            stmt = stmt.where(Donation.donor_id == donor_id)
+            stmt = stmt.where(Donation.user_id == donor_id)
         if package_id:
-            stmt = stmt.where(Donation.package_id == package_id)
+            stmt = stmt.where(Donation.package_id == str(package_id))
         if status:
-            stmt = stmt.where(Donation.status == status)
+            stmt = stmt.where(Donation.payment_status == status)
         
         stmt = (
             stmt.offset(skip)
@@ -53,14 +66,17 @@ async def get_all_donations(
         return [
             DonationResponse(
                 id=donation.id,
-                donor_id=donation.donor_id,
+                user_id=donation.user_id,
+                ngo_id=donation.ngo_id,
                 package_id=donation.package_id,
-                amount=donation.amount,
+                package_title=donation.package_title,
+                package_amount=donation.package_amount,
                 quantity=donation.quantity,
-                status=donation.status,
+                total_amount=donation.total_amount,
                 payment_method=donation.payment_method,
+                payment_status=donation.payment_status,
                 transaction_id=donation.transaction_id,
-                notes=donation.notes,
+                invoice_number=donation.invoice_number,
                 created_at=donation.created_at,
                 updated_at=donation.updated_at
             )
@@ -73,6 +89,22 @@ async def get_all_donations(
             detail="Failed to fetch donations"
         )
 
+@router.get("/me/impact", response_model=DonorImpactResponse)
+async def get_my_impact(
+    recent: int = Query(10, ge=0, le=50),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get the current user's donation totals, delivery progress and recent activity."""
+    try:
+        return await load_donor_impact(db, current_user.user_id, recent_limit=recent)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch donation impact"
+        )
+
 @router.get("/{donation_id}", response_model=DonationResponse)
 async def get_donation_by_id(
     donation_id: uuid.UUID,
@@ -85,7 +117,7 @@ async def get_donation_by_id(
         
         # Non-admin users can only see their own donations
         if current_user.role != "admin":
-            stmt = stmt.where(Donation.donor_id == current_user.user_id)
+            stmt = stmt.where(Donation.user_id == current_user.user_id)
         
         result = await db.execute(stmt)
         donation = result.scalar_one_or_none()
@@ -98,14 +130,17 @@ async def get_donation_by_id(
         
         return DonationResponse(
             id=donation.id,
-            donor_id=donation.donor_id,
+            user_id=donation.user_id,
+            ngo_id=donation.ngo_id,
             package_id=donation.package_id,
-            amount=donation.amount,
+            package_title=donation.package_title,
+            package_amount=donation.package_amount,
             quantity=donation.quantity,
-            status=donation.status,
+            total_amount=donation.total_amount,
             payment_method=donation.payment_method,
+            payment_status=donation.payment_status,
             transaction_id=donation.transaction_id,
-            notes=donation.notes,
+            invoice_number=donation.invoice_number,
             created_at=donation.created_at,
             updated_at=donation.updated_at
         )
@@ -127,9 +162,7 @@ async def create_donation(
     """Create a new donation."""
     try:
         # Verify that the package exists
-        package_stmt = select(Package).where(Package.id == donation_data.package_id)
-        package_result = await db.execute(package_stmt)
-        package = package_result.scalar_one_or_none()
+        package = await get_package(db, donation_data.package_id)
         
         if not package:
             raise HTTPException(
@@ -147,35 +180,46 @@ async def create_donation(
         # Create new donation
         new_donation = Donation(
             id=uuid.uuid4(),
-            donor_id=current_user.user_id,
+            user_id=current_user.user_id,
+            ngo_id=donation_data.ngo_id,
             package_id=donation_data.package_id,
-            amount=donation_data.amount,
+            package_title=donation_data.package_title,
+            package_amount=donation_data.package_amount,
             quantity=donation_data.quantity,
-            status=donation_data.status or "pending",
+            total_amount=donation_data.total_amount,
             payment_method=donation_data.payment_method,
+            payment_status=donation_data.payment_status or "pending",
             transaction_id=donation_data.transaction_id,
-            notes=donation_data.notes
+            invoice_number=donation_data.invoice_number
         )
         
         db.add(new_donation)
         
-        # Update package current quantity if donation is completed
-        if new_donation.status == "completed":
-            package.current_quantity += donation_data.quantity
+        # Update package current quantity, weekly funding and rollups if donation is completed
+        if new_donation.payment_status == "completed":
+            package.current_quantity = (package.current_quantity or 0) + new_donation.quantity
+            await record_funding(db, package.id, new_donation.total_amount, new_donation.quantity)
+            await record_donation(db, new_donation, package.category)
         
         await db.commit()
+        if new_donation.payment_status == "completed":
+            # Cached package listings carry current_quantity
+            catalog_cache.invalidate()
         await db.refresh(new_donation)
         
         return DonationResponse(
             id=new_donation.id,
-            donor_id=new_donation.donor_id,
+            user_id=new_donation.user_id,
+            ngo_id=new_donation.ngo_id,
             package_id=new_donation.package_id,
-            amount=new_donation.amount,
+            package_title=new_donation.package_title,
+            package_amount=new_donation.package_amount,
             quantity=new_donation.quantity,
-            status=new_donation.status,
+            total_amount=new_donation.total_amount,
             payment_method=new_donation.payment_method,
+            payment_status=new_donation.payment_status,
             transaction_id=new_donation.transaction_id,
-            notes=new_donation.notes,
+            invoice_number=new_donation.invoice_number,
             created_at=new_donation.created_at,
             updated_at=new_donation.updated_at
         )
@@ -203,7 +247,7 @@ async def update_donation(
         
         # Non-admin users can only update their own donations
         if current_user.role != "admin":
-            stmt = stmt.where(Donation.donor_id == current_user.user_id)
+            stmt = stmt.where(Donation.user_id == current_user.user_id)
         
         result = await db.execute(stmt)
         donation = result.scalar_one_or_none()
@@ -215,42 +259,49 @@ async def update_donation(
             )
         
         # Get the associated package for quantity updates
-        package_stmt = select(Package).where(Package.id == donation.package_id)
-        package_result = await db.execute(package_stmt)
-        package = package_result.scalar_one_or_none()
+        package = await get_package(db, donation.package_id)
         
         # Handle status changes that affect package quantity
-        old_status = donation.status
-        old_quantity = donation.quantity
+        was_completed = donation.payment_status == "completed"
+        # Last change before this one; for a completed donation, roughly when it completed
+        last_updated_at = donation.updated_at
         
         # Update donation fields
         update_data = donation_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(donation, field, value)
         
-        # Update package quantity based on status changes
-        if package:
-            # Remove old quantity if it was counted
-            if old_status == "completed":
-                package.current_quantity -= old_quantity
-            
-            # Add new quantity if donation is now completed
-            if donation.status == "completed":
-                package.current_quantity += donation.quantity
+        # Update package quantity, weekly funding and rollups when completion changes
+        is_completed = donation.payment_status == "completed"
+        if is_completed != was_completed:
+            sign = 1 if is_completed else -1
+            # Reversals come off the buckets the donation was counted in
+            at = None if is_completed else last_updated_at
+            if package:
+                package.current_quantity = (package.current_quantity or 0) + sign * donation.quantity
+                await record_funding(
+                    db, package.id, sign * donation.total_amount, sign * donation.quantity, sign, at=at
+                )
+            await record_donation(db, donation, package.category if package else None, sign, at=at)
         
         await db.commit()
+        if is_completed != was_completed:
+            catalog_cache.invalidate()
         await db.refresh(donation)
         
         return DonationResponse(
             id=donation.id,
-            donor_id=donation.donor_id,
+            user_id=donation.user_id,
+            ngo_id=donation.ngo_id,
             package_id=donation.package_id,
-            amount=donation.amount,
+            package_title=donation.package_title,
+            package_amount=donation.package_amount,
             quantity=donation.quantity,
-            status=donation.status,
+            total_amount=donation.total_amount,
             payment_method=donation.payment_method,
+            payment_status=donation.payment_status,
             transaction_id=donation.transaction_id,
-            notes=donation.notes,
+            invoice_number=donation.invoice_number,
             created_at=donation.created_at,
             updated_at=donation.updated_at
         )
@@ -283,17 +334,24 @@ async def delete_donation(
                 detail="Donation not found"
             )
         
-        # Update package quantity if donation was completed
-        if donation.status == "completed":
-            package_stmt = select(Package).where(Package.id == donation.package_id)
-            package_result = await db.execute(package_stmt)
-            package = package_result.scalar_one_or_none()
+        # Update package quantity, weekly funding and rollups if donation was completed
+        was_completed = donation.payment_status == "completed"
+        if was_completed:
+            package = await get_package(db, donation.package_id)
             
             if package:
-                package.current_quantity -= donation.quantity
+                package.current_quantity = (package.current_quantity or 0) - donation.quantity
+                await record_funding(
+                    db, package.id, -donation.total_amount, -donation.quantity, -1, at=donation.updated_at
+                )
+            await record_donation(
+                db, donation, package.category if package else None, -1, at=donation.updated_at
+            )
         
         await db.delete(donation)
         await db.commit()
+        if was_completed:
+            catalog_cache.invalidate()
         
         return SuccessResponse(
             success=True,
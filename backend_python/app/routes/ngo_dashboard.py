@@ -8,13 +8,14 @@ import json
 
 from ..database.connection import get_db_session
 from ..models.models import (
-    Profile, NGO, Transaction, Donation, DonationPackage
+    Profile, NGO, Transaction, Donation, DonationPackage, Package
 )
 from ..schemas.schemas import (
     NGOResponse, NGOUpdate, TransactionResponse, DonationResponse,
-    SuccessResponse, UserRole
+    DonationSeriesResponse, SuccessResponse, UserRole
 )
 from ..middleware.auth import get_current_active_user
+from ..utils.analytics import load_donation_series, SeriesRangeError
 
 router = APIRouter(prefix="/ngo", tags=["ngo-dashboard"])
 
@@ -243,23 +244,28 @@ async def get_ngo_transactions(
     ngo = await get_current_ngo(current_user, db)
     
     stmt = select(Transaction).where(
-        Transaction.ngo_id == ngo.user_id
-    ).offset(skip).limit(limit)
+        Transaction.ngo_id == ngo.id
+    ).order_by(Transaction.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(stmt)
     transactions = result.scalars().all()
     
     return [TransactionResponse(
         id=transaction.id,
         donation_id=transaction.donation_id,
+        package_id=transaction.package_id,
         ngo_id=transaction.ngo_id,
         vendor_id=transaction.vendor_id,
-        user_id=transaction.user_id,
-        amount=transaction.amount,
+        donor_user_id=transaction.donor_user_id,
         status=transaction.status,
-        tracking_id=transaction.tracking_id,
-        delivery_address=transaction.delivery_address,
-        delivery_date=transaction.delivery_date,
-        notes=transaction.notes,
+        tracking_number=transaction.tracking_number,
+        delivery_note_url=transaction.delivery_note_url,
+        invoice_url=transaction.invoice_url,
+        admin_notes=transaction.admin_notes,
+        vendor_notes=transaction.vendor_notes,
+        assigned_at=transaction.assigned_at,
+        shipped_at=transaction.shipped_at,
+        delivered_at=transaction.delivered_at,
+        completed_at=transaction.completed_at,
         created_at=transaction.created_at,
         updated_at=transaction.updated_at
     ) for transaction in transactions]
@@ -351,6 +357,38 @@ async def get_ngo_dashboard_stats(
         }
     }
 
+# Donation Analytics
+@router.get("/analytics/donations", response_model=DonationSeriesResponse)
+async def get_ngo_donation_analytics(
+    grain: str = Query("day", pattern="^(hour|day)$"),
+    package_id: Optional[uuid.UUID] = Query(None),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get hourly or daily donation trends for the NGO, or one of its packages."""
+    ngo = await get_current_ngo(current_user, db)
+    
+    dimension, key = "ngo", str(ngo.id)
+    if package_id:
+        package_stmt = select(Package.id).where(Package.id == package_id, Package.ngo_id == ngo.id)
+        package_result = await db.execute(package_stmt)
+        if package_result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Package not found"
+            )
+        dimension, key = "package", str(package_id)
+    
+    try:
+        return await load_donation_series(db, grain, dimension, key, start, end)
+    except SeriesRangeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 # NGO Information for Public View
 @router.get("/public-info")
 async def get_public_ngo_info(
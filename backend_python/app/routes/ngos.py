@@ -1,18 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, join
+from sqlalchemy import select, join, func, or_, literal, tuple_, cast, Float, Text, true
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import base64
+import json
 import uuid
 
 from ..database.connection import get_db_session
-from ..models.models import NGO, Profile
+from ..models.models import NGO, Profile, PinCode
 from ..schemas.schemas import (
-    NGOCreate, NGOUpdate, NGOResponse, SuccessResponse
+    NGOCreate, NGOUpdate, NGOResponse, NGOSearchResult, NGOSearchResponse, NGONearbyResult,
+    SuccessResponse, TokenData
 )
 from ..middleware.auth import (
     get_current_active_user, require_ngo, require_admin_or_ngo
 )
+from ..utils.geo import distance_km, within_box, locate_pin_code
 
 router = APIRouter(tags=["ngos"])
 
@@ -99,6 +103,204 @@ async def get_all_ngos(
             detail="Failed to fetch NGOs"
         )
 
+def encode_search_cursor(rank: float, ngo_id: uuid.UUID) -> str:
+    """Encode the last result's sort key as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps([rank, str(ngo_id)]).encode()).decode()
+
+def decode_search_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    try:
+        rank, ngo_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), uuid.UUID(ngo_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+# Must be registered before /{ngo_id}, which would otherwise capture "search"
+@router.get("/search", response_model=NGOSearchResponse)
+async def search_ngos(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Search NGOs by name, description, mission and location, best matches first."""
+    after = decode_search_cursor(cursor) if cursor else None
+    try:
+        term = literal(q, Text)
+        ts_query = func.websearch_to_tsquery('english', term)
+        # Full-text rank (normalised to 0..1) plus the closest trigram match, so typos still rank
+        rank = cast(
+            func.ts_rank(NGO.search_vector, ts_query, 32)
+            + func.greatest(func.word_similarity(term, NGO.name), func.word_similarity(term, NGO.city)),
+            Float
+        )
+        # Each predicate is served by its own GIN index and combined with a BitmapOr
+        matches = (
+            select(NGO.id.label('id'), rank.label('rank'))
+            .where(or_(
+                NGO.search_vector.op('@@')(ts_query),
+                term.op('<%')(NGO.name),
+                term.op('<%')(NGO.city)
+            ))
+            .subquery()
+        )
+        
+        stmt = (
+            select(
+                NGO.id,
+                NGO.user_id,
+                NGO.name,
+                NGO.description,
+                NGO.mission,
+                NGO.website,
+                NGO.logo_url,
+                NGO.gallery_images,
+                NGO.started_date,
+                NGO.license_number,
+                NGO.total_members,
+                NGO.full_address,
+                NGO.pin_code,
+                NGO.city,
+                NGO.state,
+                NGO.country,
+                NGO.phone,
+                NGO.email,
+                NGO.registration_number,
+                NGO.verified,
+                NGO.created_at,
+                NGO.updated_at,
+                Profile.first_name,
+                Profile.last_name,
+                Profile.email.label('user_email'),
+                matches.c.rank
+            )
+            .select_from(
+                matches
+                .join(NGO, NGO.id == matches.c.id)
+                .join(Profile, NGO.user_id == Profile.user_id)
+            )
+            .order_by(matches.c.rank.desc(), matches.c.id.desc())
+            # One extra row tells us whether there is a next page
+            .limit(limit + 1)
+        )
+        if after:
+            # Keyset pagination: resume strictly after the previous page's last (rank, id)
+            stmt = stmt.where(tuple_(matches.c.rank, matches.c.id) < tuple_(*after))
+        
+        result = await db.execute(stmt)
+        rows = result.fetchall()
+        
+        items = [NGOSearchResult(**row._mapping) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_search_cursor(items[-1].rank, items[-1].id)
+        
+        return NGOSearchResponse(items=items, next_cursor=next_cursor)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search NGOs"
+        )
+
+@router.get("/nearby", response_model=List[NGONearbyResult])
+async def get_nearby_ngos(
+    pin_code: Optional[str] = Query(None, pattern=r"^\d{6}$"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=500),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get the NGOs nearest to a pin code or coordinates, within radius_km."""
+    if latitude is not None and longitude is not None:
+        origin = (latitude, longitude)
+    elif pin_code:
+        origin = await locate_pin_code(db, pin_code)
+        if not origin:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Unknown pin code"
+            )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a pin_code or latitude and longitude"
+        )
+    
+    try:
+        # Pin codes inside the bounding box come off the lat/lon index. Every NGO in a pin code
+        # is equally far, so at most `limit` per pin code are read from the (pin_code, id) index
+        distance = distance_km(PinCode.latitude, PinCode.longitude, origin)
+        nearby_pins = (
+            select(PinCode.pin_code, distance.label('distance_km'))
+            .where(*within_box(PinCode.latitude, PinCode.longitude, origin, radius_km))
+            .where(distance <= radius_km)
+            .subquery()
+        )
+        ngos_in_pin = (
+            select(NGO.id)
+            .where(NGO.pin_code == nearby_pins.c.pin_code)
+            .order_by(NGO.id)
+            .limit(limit)
+            .lateral()
+        )
+        nearest = (
+            select(ngos_in_pin.c.id, nearby_pins.c.distance_km)
+            .select_from(nearby_pins.join(ngos_in_pin, true()))
+            .order_by(nearby_pins.c.distance_km, ngos_in_pin.c.id)
+            .limit(limit)
+            .subquery()
+        )
+        
+        stmt = (
+            select(
+                NGO.id,
+                NGO.user_id,
+                NGO.name,
+                NGO.description,
+                NGO.mission,
+                NGO.website,
+                NGO.logo_url,
+                NGO.gallery_images,
+                NGO.started_date,
+                NGO.license_number,
+                NGO.total_members,
+                NGO.full_address,
+                NGO.pin_code,
+                NGO.city,
+                NGO.state,
+                NGO.country,
+                NGO.phone,
+                NGO.email,
+                NGO.registration_number,
+                NGO.verified,
+                NGO.created_at,
+                NGO.updated_at,
+                Profile.first_name,
+                Profile.last_name,
+                Profile.email.label('user_email'),
+                nearest.c.distance_km
+            )
+            .select_from(
+                nearest
+                .join(NGO, NGO.id == nearest.c.id)
+                .join(Profile, NGO.user_id == Profile.user_id)
+            )
+            .order_by(nearest.c.distance_km, NGO.id)
+        )
+        
+        result = await db.execute(stmt)
+        return [NGONearbyResult(**row._mapping) for row in result.fetchall()]
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch nearby NGOs"
+        )
+
 @router.get("/{ngo_id}", response_model=NGOResponse)
 async def get_ngo_by_id(
     ngo_id: uuid.UUID,
@@ -272,7 +474,7 @@ async def create_ngo(
 async def update_ngo(
     ngo_id: uuid.UUID,
     ngo_data: NGOUpdate,
-    current_user: Profile = Depends(require_admin_or_ngo),
+    current_user: TokenData = Depends(require_admin_or_ngo),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Update an NGO (NGO owner or admin only)."""
@@ -343,7 +545,7 @@ async def update_ngo(
 @router.delete("/{ngo_id}", response_model=SuccessResponse)
 async def delete_ngo(
     ngo_id: uuid.UUID,
-    current_user: Profile = Depends(require_admin_or_ngo),
+    current_user: TokenData = Depends(require_admin_or_ngo),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Delete an NGO (NGO owner or admin only)."""
@@ -1,49 +1,290 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, case, and_, tuple_
 from typing import List, Optional
 import uuid
 
 from ..database.connection import get_db_session
 from ..models.models import Package, NGO
 from ..schemas.schemas import (
-    PackageCreate, PackageUpdate, PackageResponse, SuccessResponse
+    PackageCreate, PackageUpdate, PackageResponse, PackageCatalogResponse,
+    PackageLeaderboardEntry, FacetCount, SuccessResponse
 )
 from ..middleware.auth import (
     get_current_active_user, require_ngo, require_admin_or_ngo
 )
+from ..utils.cache import catalog_cache
+from ..utils.leaderboard import closest_to_goal, most_funded_this_week
 
 router = APIRouter(tags=["packages"])
 
+# Facet ranges in ascending order: (value, exclusive upper bound); the last is open-ended
+AMOUNT_RANGES = [
+    ("0-500", 500),
+    ("500-1000", 1000),
+    ("1000-5000", 5000),
+    ("5000+", None),
+]
+# Percent of target_quantity already donated
+COMPLETION_RANGES = [
+    ("0-25", 25),
+    ("25-50", 50),
+    ("50-75", 75),
+    ("75-100", 100),
+    ("100+", None),
+]
+NO_TARGET = "no_target"
+FACET_VALUE_LIMIT = 50
+
+def range_bucket(ranges, below, *whens):
+    """CASE labelling each row with the first range whose upper bound it is below."""
+    return case(
+        *whens,
+        *[(below(upper), value) for value, upper in ranges[:-1]],
+        else_=ranges[-1][0]
+    )
+
+# Facet name -> expression over packages joined to their NGO
+CATALOG_FACETS = {
+    "category": Package.category,
+    "amount": range_bucket(AMOUNT_RANGES, lambda upper: Package.amount < upper),
+    "state": NGO.state,
+    "city": NGO.city,
+    # Integer comparison instead of dividing: current/target < upper% per row
+    "completion": range_bucket(
+        COMPLETION_RANGES,
+        lambda upper: func.coalesce(Package.current_quantity, 0) * 100 < Package.target_quantity * upper,
+        (func.coalesce(Package.target_quantity, 0) <= 0, NO_TARGET)
+    ),
+}
+
+# Range facets keep their natural order; the others list the largest counts first
+FACET_ORDER = {
+    "amount": {value: i for i, (value, _) in enumerate(AMOUNT_RANGES)},
+    "completion": {value: i for i, (value, _) in enumerate(COMPLETION_RANGES + [(NO_TARGET, None)])},
+}
+
+def selected_facets(**selections: Optional[List[str]]) -> tuple:
+    """Hashable (facet, values) pairs for the non-empty selections."""
+    return tuple(
+        (name, tuple(sorted(set(values))))
+        for name, values in selections.items() if values
+    )
+
+def facet_conditions(columns: dict, facets: tuple) -> dict:
+    """Facet name -> condition; values within a facet are OR-ed, facets AND-ed."""
+    return {name: columns[name].in_(values) for name, values in facets}
+
+def package_conditions(ngo_id: Optional[uuid.UUID], status: Optional[str]) -> list:
+    conditions = []
+    if ngo_id:
+        conditions.append(Package.ngo_id == ngo_id)
+    if status:
+        conditions.append(Package.status == status)
+    return conditions
+
+async def load_packages(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    ngo_id: Optional[uuid.UUID] = None,
+    status: Optional[str] = None,
+    facets: tuple = ()
+) -> List[PackageResponse]:
+    """Query one page of the package catalog."""
+    stmt = select(Package).where(*package_conditions(ngo_id, status))
+    
+    # Apply facet filters
+    if facets:
+        stmt = stmt.join(NGO, NGO.id == Package.ngo_id).where(
+            *facet_conditions(CATALOG_FACETS, facets).values()
+        )
+    
+    stmt = (
+        stmt.offset(skip)
+        .limit(limit)
+        .order_by(Package.created_at.desc())
+    )
+    
+    result = await db.execute(stmt)
+    packages = result.scalars().all()
+    
+    return [
+        PackageResponse(
+            id=package.id,
+            ngo_id=package.ngo_id,
+            title=package.title,
+            description=package.description,
+            amount=package.amount,
+            image_url=package.image_url,
+            category=package.category,
+            target_quantity=package.target_quantity,
+            current_quantity=package.current_quantity,
+            status=package.status,
+            created_at=package.created_at,
+            updated_at=package.updated_at
+        )
+        for package in packages
+    ]
+
+async def load_facet_counts(
+    db: AsyncSession,
+    ngo_id: Optional[uuid.UUID] = None,
+    status: Optional[str] = None,
+    facets: tuple = ()
+) -> tuple:
+    """Count every facet value and the total matches in one grouped query.
+
+    Each facet is counted under all selected filters except its own, so the
+    sidebar shows what selecting another value of the same facet would add.
+    Returns (total, {facet: [FacetCount, ...]}).
+    """
+    labelled = (
+        select(*[expression.label(name) for name, expression in CATALOG_FACETS.items()])
+        .select_from(Package)
+        .join(NGO, NGO.id == Package.ngo_id)
+        .where(*package_conditions(ngo_id, status))
+        .subquery()
+    )
+    columns = {name: labelled.c[name] for name in CATALOG_FACETS}
+    conditions = facet_conditions(columns, facets)
+    
+    def count_matching(excluded: Optional[str] = None):
+        selected = [condition for name, condition in conditions.items() if name != excluded]
+        return func.count().filter(and_(*selected)) if selected else func.count()
+    
+    # One grouping set per facet plus () for the total; GROUPING() tells the rows apart
+    stmt = (
+        select(
+            case(*[(func.grouping(column) == 0, name) for name, column in columns.items()]).label("facet"),
+            func.coalesce(*columns.values()).label("value"),
+            case(
+                *[(func.grouping(column) == 0, count_matching(name)) for name, column in columns.items()],
+                else_=count_matching()
+            ).label("count")
+        )
+        .group_by(func.grouping_sets(*columns.values(), tuple_()))
+    )
+    
+    total = 0
+    counts = {name: [] for name in CATALOG_FACETS}
+    for row in (await db.execute(stmt)).all():
+        if row.facet is None:
+            total = row.count
+        elif row.value is not None and row.count:
+            counts[row.facet].append(FacetCount(value=row.value, count=row.count))
+    
+    for name, values in counts.items():
+        order = FACET_ORDER.get(name)
+        if order:
+            values.sort(key=lambda facet: order.get(facet.value, len(order)))
+        else:
+            values.sort(key=lambda facet: (-facet.count, facet.value))
+            del values[FACET_VALUE_LIMIT:]
+    return total, counts
+
+async def load_catalog(
+    db: AsyncSession,
+    skip: int,
+    limit: int,
+    ngo_id: Optional[uuid.UUID],
+    status: Optional[str],
+    facets: tuple
+) -> PackageCatalogResponse:
+    items = await load_packages(db, skip, limit, ngo_id, status, facets)
+    total, counts = await load_facet_counts(db, ngo_id, status, facets)
+    return PackageCatalogResponse(items=items, total=total, facets=counts)
+
+async def prime_catalog_cache(db: AsyncSession):
+    """Load the default catalog page so the first visitors hit a warm cache."""
+    await catalog_cache.get_or_load(("packages", 0, 100, None, None, ()), lambda: load_packages(db))
+
 @router.get("/", response_model=List[PackageResponse])
 async def get_all_packages(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     ngo_id: Optional[uuid.UUID] = Query(None),
     status: Optional[str] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    amount: Optional[List[str]] = Query(None),
+    state: Optional[List[str]] = Query(None),
+    city: Optional[List[str]] = Query(None),
+    completion: Optional[List[str]] = Query(None),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get all packages with optional filtering."""
     try:
-        stmt = select(Package)
-        
-        # Apply filters
-        if ngo_id:
-            stmt = stmt.where(Package.ngo_id == ngo_id)
-        if status:
-            stmt = stmt.where(Package.status == status)
+        facets = selected_facets(
+            category=category, amount=amount, state=state, city=city, completion=completion
+        )
+        # Catalog pages are cached briefly; package writes invalidate them
+        return await catalog_cache.get_or_load(
+            ("packages", skip, limit, ngo_id, status, facets),
+            lambda: load_packages(db, skip, limit, ngo_id, status, facets)
+        )
         
-        stmt = (
-            stmt.offset(skip)
-            .limit(limit)
-            .order_by(Package.created_at.desc())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch packages"
+        )
+
+@router.get("/catalog", response_model=PackageCatalogResponse)
+async def get_package_catalog(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    ngo_id: Optional[uuid.UUID] = Query(None),
+    package_status: Optional[str] = Query(None, alias="status"),
+    category: Optional[List[str]] = Query(None),
+    amount: Optional[List[str]] = Query(None, description="Amount ranges, e.g. 500-1000"),
+    state: Optional[List[str]] = Query(None),
+    city: Optional[List[str]] = Query(None),
+    completion: Optional[List[str]] = Query(None, description="Completion ranges in percent, e.g. 75-100"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get a page of packages with facet counts for the catalog sidebar."""
+    try:
+        facets = selected_facets(
+            category=category, amount=amount, state=state, city=city, completion=completion
+        )
+        return await catalog_cache.get_or_load(
+            ("catalog", skip, limit, ngo_id, package_status, facets),
+            lambda: load_catalog(db, skip, limit, ngo_id, package_status, facets)
         )
         
-        result = await db.execute(stmt)
-        packages = result.scalars().all()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch package catalog"
+        )
+
+@router.get("/leaderboard", response_model=List[PackageLeaderboardEntry])
+async def get_package_leaderboard(
+    view: str = Query("closest_to_goal", pattern="^(closest_to_goal|most_funded_week)$"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get the packages closest to their goal or most funded this week."""
+    try:
+        if view == "closest_to_goal":
+            rows = [
+                (package, {"funded_percent": round(share * 100, 1)})
+                for package, share in await closest_to_goal(db, limit)
+            ]
+        else:
+            rows = [
+                (package, {
+                    "funded_percent": round(package.current_quantity * 100 / package.target_quantity, 1)
+                    if package.target_quantity and package.current_quantity is not None else None,
+                    "week_amount": funding.amount,
+                    "week_donations": funding.donations
+                })
+                for package, funding in await most_funded_this_week(db, limit)
+            ]
         
         return [
-            PackageResponse(
+            PackageLeaderboardEntry(
+                rank=rank,
                 id=package.id,
                 ngo_id=package.ngo_id,
                 title=package.title,
@@ -55,15 +296,16 @@ async def get_all_packages(
                 current_quantity=package.current_quantity,
                 status=package.status,
                 created_at=package.created_at,
-                updated_at=package.updated_at
+                updated_at=package.updated_at,
+                **extra
             )
-            for package in packages
+            for rank, (package, extra) in enumerate(rows, start=1)
         ]
         
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch packages"
+            detail="Failed to fetch package leaderboard"
         )
 
 @router.get("/{package_id}", response_model=PackageResponse)
@@ -144,6 +386,7 @@ async def create_package(
         
         db.add(new_package)
         await db.commit()
+        catalog_cache.invalidate()
         await db.refresh(new_package)
         
         return PackageResponse(
@@ -211,6 +454,7 @@ async def update_package(
             setattr(package, field, value)
         
         await db.commit()
+        catalog_cache.invalidate()
         await db.refresh(package)
         
         return PackageResponse(
@@ -273,6 +517,7 @@ async def delete_package(
         
         await db.delete(package)
         await db.commit()
+        catalog_cache.invalidate()
         
         return SuccessResponse(
             success=True,
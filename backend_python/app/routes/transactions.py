@@ -12,6 +12,7 @@ from ..schemas.schemas import (
 from ..middleware.auth import (
     get_current_active_user, require_admin
 )
+from ..utils.transaction_lifecycle import transition, InvalidTransitionError
 
 router = APIRouter(tags=["transactions"])
 
@@ -178,7 +179,7 @@ async def update_transaction(
         
         # Non-admin users can only update their own transactions
         if current_user.role != "admin":
-            stmt = stmt.where(Transaction.user_id == current_user.user_id)
+            stmt = stmt.where(Transaction.donor_user_id == current_user.user_id)
         
         result = await db.execute(stmt)
         transaction = result.scalar_one_or_none()
@@ -189,28 +190,45 @@ async def update_transaction(
                 detail="Transaction not found or not authorized"
             )
         
-        # Update transaction fields
+        # Update transaction fields; status changes go through the lifecycle engine
         update_data = transaction_data.dict(exclude_unset=True)
+        new_status = update_data.pop('status', None)
         for field, value in update_data.items():
             setattr(transaction, field, value)
         
+        if new_status:
+            await transition(db, transaction, new_status, actor_user_id=current_user.user_id)
+        
         await db.commit()
         await db.refresh(transaction)
         
         return TransactionResponse(
             id=transaction.id,
-            user_id=transaction.user_id,
-            amount=transaction.amount,
-            transaction_type=transaction.transaction_type,
+            donation_id=transaction.donation_id,
+            package_id=transaction.package_id,
+            ngo_id=transaction.ngo_id,
+            vendor_id=transaction.vendor_id,
+            donor_user_id=transaction.donor_user_id,
             status=transaction.status,
-            payment_method=transaction.payment_method,
-            reference_id=transaction.reference_id,
-            description=transaction.description,
-            metadata=transaction.metadata,
+            tracking_number=transaction.tracking_number,
+            delivery_note_url=transaction.delivery_note_url,
+            invoice_url=transaction.invoice_url,
+            admin_notes=transaction.admin_notes,
+            vendor_notes=transaction.vendor_notes,
+            assigned_at=transaction.assigned_at,
+            shipped_at=transaction.shipped_at,
+            delivered_at=transaction.delivered_at,
+            completed_at=transaction.completed_at,
             created_at=transaction.created_at,
             updated_at=transaction.updated_at
         )
         
+    except InvalidTransitionError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
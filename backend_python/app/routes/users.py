@@ -7,7 +7,7 @@ import uuid
 from ..database.connection import get_db_session
 from ..models.models import Profile
 from ..schemas.schemas import (
-    ProfileUpdate, ProfileResponse, SuccessResponse
+    ProfileUpdate, ProfileResponse, SuccessResponse, TokenData
 )
 from ..middleware.auth import (
     get_current_active_user, require_admin
@@ -19,7 +19,7 @@ router = APIRouter(tags=["users"])
 async def get_all_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: Profile = Depends(require_admin),
+    current_user: TokenData = Depends(require_admin),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get all users (admin only)."""
@@ -58,7 +58,7 @@ async def get_all_users(
 @router.get("/{user_id}", response_model=ProfileResponse)
 async def get_user_by_id(
     user_id: uuid.UUID,
-    current_user: Profile = Depends(require_admin),
+    current_user: TokenData = Depends(require_admin),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get a specific user by ID (admin only)."""
@@ -131,7 +131,7 @@ async def update_user_profile(
 @router.delete("/{user_id}", response_model=SuccessResponse)
 async def delete_user(
     user_id: uuid.UUID,
-    current_user: Profile = Depends(require_admin),
+    current_user: TokenData = Depends(require_admin),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Delete a user (admin only)."""
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, case, func
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 from typing import List, Optional
 import uuid
@@ -10,12 +11,15 @@ from ..models.models import (
     Profile, Vendor, Transaction, VendorInvoice, DonationPackage
 )
 from ..schemas.schemas import (
-    VendorResponse, VendorUpdate, TransactionResponse,
+    VendorResponse, VendorUpdate, TransactionResponse, VendorOrderResponse,
+    BulkOrderStatusUpdate, BulkOrderStatusResponse, BulkOrderStatusResult,
     VendorInvoiceResponse, VendorInvoiceCreate, VendorInvoiceUpdate,
-    SuccessResponse, UserRole, InvoiceStatus
+    SuccessResponse, UserRole, InvoiceStatus, TransactionStatus
 )
 from ..middleware.auth import get_current_active_user
-from ..utils.email_service import email_service
+from ..utils.jobs import enqueue_job
+from ..utils.vendor_assignment import OPEN_STATUSES
+from ..utils.transaction_lifecycle import transition, bulk_transition, can_transition, InvalidTransitionError
 
 router = APIRouter(prefix="/vendor", tags=["vendor-dashboard"])
 
@@ -95,37 +99,103 @@ async def update_vendor_profile(
     )
 
 # Order Management
-@router.get("/orders", response_model=List[TransactionResponse])
+async def load_vendor_orders(
+    db: AsyncSession,
+    vendor: Vendor,
+    status_filter: Optional[TransactionStatus],
+    skip: int,
+    limit: int
+) -> List[VendorOrderResponse]:
+    """Load a page of the vendor's orders, newest first, with donation, NGO, package and donor details."""
+    # All joined relationships are many-to-one, so joinedload adds LEFT JOINs
+    # to the same SELECT without multiplying rows or breaking LIMIT
+    stmt = (
+        select(Transaction)
+        .options(
+            joinedload(Transaction.donation),
+            joinedload(Transaction.ngo),
+            joinedload(Transaction.package),
+            joinedload(Transaction.donor_profile)
+        )
+        .where(Transaction.vendor_id == vendor.id)
+    )
+    if status_filter:
+        stmt = stmt.where(Transaction.status == status_filter.value)
+    
+    stmt = (
+        stmt.order_by(Transaction.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    transactions = result.scalars().all()
+    
+    orders = []
+    for transaction in transactions:
+        donation = transaction.donation
+        ngo = transaction.ngo
+        package = transaction.package
+        donor = transaction.donor_profile
+        orders.append(VendorOrderResponse(
+            id=transaction.id,
+            donation_id=transaction.donation_id,
+            package_id=transaction.package_id,
+            ngo_id=transaction.ngo_id,
+            vendor_id=transaction.vendor_id,
+            donor_user_id=transaction.donor_user_id,
+            status=transaction.status,
+            tracking_number=transaction.tracking_number,
+            delivery_note_url=transaction.delivery_note_url,
+            invoice_url=transaction.invoice_url,
+            admin_notes=transaction.admin_notes,
+            vendor_notes=transaction.vendor_notes,
+            assigned_at=transaction.assigned_at,
+            shipped_at=transaction.shipped_at,
+            delivered_at=transaction.delivered_at,
+            completed_at=transaction.completed_at,
+            created_at=transaction.created_at,
+            updated_at=transaction.updated_at,
+            quantity=donation.quantity if donation else None,
+            total_amount=donation.total_amount if donation else None,
+            invoice_number=donation.invoice_number if donation else None,
+            ngo_name=ngo.name if ngo else None,
+            ngo_full_address=ngo.full_address if ngo else None,
+            ngo_city=ngo.city if ngo else None,
+            ngo_state=ngo.state if ngo else None,
+            ngo_pin_code=ngo.pin_code if ngo else None,
+            ngo_phone=ngo.phone if ngo else None,
+            package_title=package.title if package else (donation.package_title if donation else None),
+            package_category=package.category if package else None,
+            package_amount=package.amount if package else (donation.package_amount if donation else None),
+            donor_first_name=donor.first_name if donor else None,
+            donor_last_name=donor.last_name if donor else None
+        ))
+    
+    return orders
+
+@router.get("/orders", response_model=List[VendorOrderResponse])
 async def get_vendor_orders(
     current_user: Profile = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db_session),
+    status_filter: Optional[TransactionStatus] = Query(None, alias="status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100)
 ):
-    """Get all orders assigned to the current vendor."""
+    """Get orders assigned to the current vendor, with donation, NGO, package and donor details."""
     vendor = await get_current_vendor(current_user, db)
-    
-    stmt = select(Transaction).where(
-        Transaction.vendor_id == vendor.user_id
-    ).offset(skip).limit(limit)
-    result = await db.execute(stmt)
-    transactions = result.scalars().all()
-    
-    return [TransactionResponse(
-        id=transaction.id,
-        donation_id=transaction.donation_id,
-        ngo_id=transaction.ngo_id,
-        vendor_id=transaction.vendor_id,
-        user_id=transaction.user_id,
-        amount=transaction.amount,
-        status=transaction.status,
-        tracking_id=transaction.tracking_id,
-        delivery_address=transaction.delivery_address,
-        delivery_date=transaction.delivery_date,
-        notes=transaction.notes,
-        created_at=transaction.created_at,
-        updated_at=transaction.updated_at
-    ) for transaction in transactions]
+    return await load_vendor_orders(db, vendor, status_filter, skip, limit)
+
+@router.get("/orders/detailed", response_model=List[VendorOrderResponse], deprecated=True)
+async def get_vendor_orders_detailed(
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session),
+    status_filter: Optional[TransactionStatus] = Query(None, alias="status"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100)
+):
+    """Deprecated alias of GET /vendor/orders."""
+    vendor = await get_current_vendor(current_user, db)
+    return await load_vendor_orders(db, vendor, status_filter, skip, limit)
 
 @router.get("/orders/{transaction_id}", response_model=TransactionResponse)
 async def get_order_details(
@@ -138,7 +208,7 @@ async def get_order_details(
     
     stmt = select(Transaction).where(
         Transaction.id == transaction_id,
-        Transaction.vendor_id == vendor.user_id
+        Transaction.vendor_id == vendor.id
     )
     result = await db.execute(stmt)
     transaction = result.scalar_one_or_none()
@@ -152,15 +222,20 @@ async def get_order_details(
     return TransactionResponse(
         id=transaction.id,
         donation_id=transaction.donation_id,
+        package_id=transaction.package_id,
         ngo_id=transaction.ngo_id,
         vendor_id=transaction.vendor_id,
-        user_id=transaction.user_id,
-        amount=transaction.amount,
+        donor_user_id=transaction.donor_user_id,
         status=transaction.status,
-        tracking_id=transaction.tracking_id,
-        delivery_address=transaction.delivery_address,
-        delivery_date=transaction.delivery_date,
-        notes=transaction.notes,
+        tracking_number=transaction.tracking_number,
+        delivery_note_url=transaction.delivery_note_url,
+        invoice_url=transaction.invoice_url,
+        admin_notes=transaction.admin_notes,
+        vendor_notes=transaction.vendor_notes,
+        assigned_at=transaction.assigned_at,
+        shipped_at=transaction.shipped_at,
+        delivered_at=transaction.delivered_at,
+        completed_at=transaction.completed_at,
         created_at=transaction.created_at,
         updated_at=transaction.updated_at
     )
@@ -168,10 +243,9 @@ async def get_order_details(
 @router.put("/orders/{transaction_id}/update-status", response_model=SuccessResponse)
 async def update_order_status(
     transaction_id: uuid.UUID,
-    status_update: str,
-    tracking_id: Optional[str] = None,
-    delivery_date: Optional[datetime] = None,
-    notes: Optional[str] = None,
+    status_update: TransactionStatus,
+    tracking_number: Optional[str] = None,
+    vendor_notes: Optional[str] = None,
     current_user: Profile = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db_session)
 ):
@@ -181,7 +255,7 @@ async def update_order_status(
     # Check if transaction exists and belongs to vendor
     stmt = select(Transaction).where(
         Transaction.id == transaction_id,
-        Transaction.vendor_id == vendor.user_id
+        Transaction.vendor_id == vendor.id
     )
     result = await db.execute(stmt)
     transaction = result.scalar_one_or_none()
@@ -192,21 +266,25 @@ async def update_order_status(
             detail="Order not found or not assigned to you"
         )
     
-    # Update transaction
-    update_data = {
-        'status': status_update,
-        'updated_at': datetime.utcnow()
-    }
-    
-    if tracking_id:
-        update_data['tracking_id'] = tracking_id
-    if delivery_date:
-        update_data['delivery_date'] = delivery_date
-    if notes:
-        update_data['notes'] = notes
+    update_data = {}
+    if tracking_number:
+        update_data['tracking_number'] = tracking_number
+    if vendor_notes:
+        update_data['vendor_notes'] = vendor_notes
     
-    stmt = update(Transaction).where(Transaction.id == transaction_id).values(**update_data)
-    await db.execute(stmt)
+    try:
+        await transition(
+            db,
+            transaction,
+            status_update,
+            actor_user_id=current_user.user_id,
+            values=update_data
+        )
+    except InvalidTransitionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     await db.commit()
     
     return SuccessResponse(
@@ -214,6 +292,116 @@ async def update_order_status(
         message="Order status updated successfully"
     )
 
+@router.post("/orders/bulk-update-status", response_model=BulkOrderStatusResponse)
+async def bulk_update_order_status(
+    bulk_update: BulkOrderStatusUpdate,
+    current_user: Profile = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Update status and tracking numbers for many orders at once."""
+    vendor = await get_current_vendor(current_user, db)
+    
+    # First entry wins when an order is listed more than once
+    results = {}
+    items = {}
+    for item in bulk_update.items:
+        items.setdefault(item.transaction_id, item)
+    
+    # Verify ownership of every order with a single query
+    stmt = select(Transaction.id, Transaction.status).where(
+        Transaction.id.in_(list(items)),
+        Transaction.vendor_id == vendor.id
+    )
+    result = await db.execute(stmt)
+    current_statuses = dict(result.all())
+    
+    # Group valid moves by target status so each status is one statement
+    by_status = {}
+    for transaction_id, item in items.items():
+        if transaction_id not in current_statuses:
+            results[transaction_id] = BulkOrderStatusResult(
+                transaction_id=transaction_id,
+                success=False,
+                message="Order not found or not assigned to you"
+            )
+            continue
+        if not can_transition(current_statuses[transaction_id], item.status):
+            results[transaction_id] = BulkOrderStatusResult(
+                transaction_id=transaction_id,
+                success=False,
+                message=str(InvalidTransitionError(current_statuses[transaction_id], item.status))
+            )
+            continue
+        by_status.setdefault(item.status, []).append(item)
+    
+    for new_status, group in by_status.items():
+        update_data = {}
+        
+        # Per-row tracking numbers go through a CASE on the primary key;
+        # rows without one keep their current value
+        tracking_numbers = {
+            item.transaction_id: item.tracking_number
+            for item in group
+            if item.tracking_number
+        }
+        if tracking_numbers:
+            update_data['tracking_number'] = case(
+                tracking_numbers,
+                value=Transaction.id,
+                else_=Transaction.tracking_number
+            )
+        
+        transitioned = await bulk_transition(
+            db,
+            [item.transaction_id for item in group],
+            new_status,
+            actor_user_id=current_user.user_id,
+            vendor_id=vendor.id,
+            values=update_data
+        )
+        
+        for item in group:
+            if item.transaction_id in transitioned:
+                results[item.transaction_id] = BulkOrderStatusResult(
+                    transaction_id=item.transaction_id,
+                    success=True,
+                    message=f"Status updated to {new_status}"
+                )
+            else:
+                # Status changed concurrently between the check and the update
+                results[item.transaction_id] = BulkOrderStatusResult(
+                    transaction_id=item.transaction_id,
+                    success=False,
+                    message="Order status changed, please retry"
+                )
+    
+    await db.commit()
+    
+    # Report results in request order
+    ordered_results = []
+    seen = set()
+    for item in bulk_update.items:
+        if item.transaction_id in seen:
+            ordered_results.append(BulkOrderStatusResult(
+                transaction_id=item.transaction_id,
+                success=False,
+                message="Duplicate entry for this order"
+            ))
+            continue
+        seen.add(item.transaction_id)
+        ordered_results.append(results[item.transaction_id])
+    
+    updated = sum(1 for result in ordered_results if result.success)
+    failed = len(ordered_results) - updated
+    
+    return BulkOrderStatusResponse(
+        success=failed == 0,
+        message=f"Updated {updated} of {len(ordered_results)} orders",
+        updated=updated,
+        failed=failed,
+        results=ordered_results
+    )
+
 # Invoice Management
 @router.post("/invoices", response_model=SuccessResponse)
 async def upload_invoice(
@@ -227,7 +415,7 @@ async def upload_invoice(
     # Verify the transaction belongs to this vendor
     stmt = select(Transaction).where(
         Transaction.id == invoice_data.transaction_id,
-        Transaction.vendor_id == vendor.user_id
+        Transaction.vendor_id == vendor.id
     )
     result = await db.execute(stmt)
     transaction = result.scalar_one_or_none()
@@ -255,7 +443,7 @@ async def upload_invoice(
     new_invoice = VendorInvoice(
         id=uuid.uuid4(),
         transaction_id=invoice_data.transaction_id,
-        vendor_id=vendor.user_id,
+        vendor_id=vendor.id,
         invoice_number=invoice_data.invoice_number,
         invoice_url=invoice_data.invoice_url,
         invoice_amount=invoice_data.invoice_amount,
@@ -264,20 +452,15 @@ async def upload_invoice(
     )
     
     db.add(new_invoice)
-    await db.commit()
     
-    # Send email notification to admin
-    try:
-        await email_service.send_invoice_notification(
-            db=db,
-            vendor_name=vendor.shop_name or vendor.owner_name,
-            invoice_number=invoice_data.invoice_number,
-            invoice_amount=float(invoice_data.invoice_amount),
-            transaction_id=str(invoice_data.transaction_id)
-        )
-    except Exception as e:
-        # Log error but don't fail invoice upload
-        print(f"Failed to send invoice notification email: {e}")
+    # Queue email notification to admin with the invoice
+    await enqueue_job(db, "email.invoice_notification", {
+        "vendor_name": vendor.company_name,
+        "invoice_number": invoice_data.invoice_number,
+        "invoice_amount": float(invoice_data.invoice_amount),
+        "transaction_id": str(invoice_data.transaction_id)
+    })
+    await db.commit()
     
     return SuccessResponse(
         success=True,
@@ -295,8 +478,8 @@ async def get_vendor_invoices(
     vendor = await get_current_vendor(current_user, db)
     
     stmt = select(VendorInvoice).where(
-        VendorInvoice.vendor_id == vendor.user_id
-    ).offset(skip).limit(limit)
+        VendorInvoice.vendor_id == vendor.id
+    ).order_by(VendorInvoice.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(stmt)
     invoices = result.scalars().all()
     
@@ -327,7 +510,7 @@ async def get_invoice_details(
     
     stmt = select(VendorInvoice).where(
         VendorInvoice.id == invoice_id,
-        VendorInvoice.vendor_id == vendor.user_id
+        VendorInvoice.vendor_id == vendor.id
     )
     result = await db.execute(stmt)
     invoice = result.scalar_one_or_none()
@@ -367,7 +550,7 @@ async def update_invoice(
     # Check if invoice exists and belongs to vendor
     stmt = select(VendorInvoice).where(
         VendorInvoice.id == invoice_id,
-        VendorInvoice.vendor_id == vendor.user_id
+        VendorInvoice.vendor_id == vendor.id
     )
     result = await db.execute(stmt)
     invoice = result.scalar_one_or_none()
@@ -407,35 +590,26 @@ async def get_vendor_dashboard_stats(
     """Get vendor dashboard statistics."""
     vendor = await get_current_vendor(current_user, db)
     
-    # Get total orders
-    total_orders_stmt = select(Transaction).where(Transaction.vendor_id == vendor.user_id)
-    total_orders_result = await db.execute(total_orders_stmt)
-    total_orders = len(total_orders_result.scalars().all())
-    
-    # Get pending orders
-    pending_orders_stmt = select(Transaction).where(
-        Transaction.vendor_id == vendor.user_id,
-        Transaction.status == 'pending'
-    )
-    pending_orders_result = await db.execute(pending_orders_stmt)
-    pending_orders = len(pending_orders_result.scalars().all())
-    
-    # Get completed orders
-    completed_orders_stmt = select(Transaction).where(
-        Transaction.vendor_id == vendor.user_id,
-        Transaction.status == 'completed'
-    )
-    completed_orders_result = await db.execute(completed_orders_stmt)
-    completed_orders = len(completed_orders_result.scalars().all())
+    # Order counts in one pass over the vendor's slice of the vendor/status index
+    orders_stmt = select(
+        func.count().label("total"),
+        func.count().filter(Transaction.status.in_(OPEN_STATUSES)).label("pending"),
+        func.count().filter(Transaction.status == TransactionStatus.COMPLETED.value).label("completed")
+    ).where(Transaction.vendor_id == vendor.id)
+    orders_result = await db.execute(orders_stmt)
+    order_counts = orders_result.one()
+    total_orders = order_counts.total
+    pending_orders = order_counts.pending
+    completed_orders = order_counts.completed
     
     # Get total invoices
-    total_invoices_stmt = select(VendorInvoice).where(VendorInvoice.vendor_id == vendor.user_id)
+    total_invoices_stmt = select(VendorInvoice).where(VendorInvoice.vendor_id == vendor.id)
     total_invoices_result = await db.execute(total_invoices_stmt)
     total_invoices = len(total_invoices_result.scalars().all())
     
     # Get pending invoices
     pending_invoices_stmt = select(VendorInvoice).where(
-        VendorInvoice.vendor_id == vendor.user_id,
+        VendorInvoice.vendor_id == vendor.id,
         VendorInvoice.status == InvoiceStatus.PENDING
     )
     pending_invoices_result = await db.execute(pending_invoices_stmt)
@@ -463,7 +637,7 @@ async def get_assigned_packages(
     vendor = await get_current_vendor(current_user, db)
     
     stmt = select(DonationPackage).where(
-        DonationPackage.assigned_vendor_id == vendor.user_id
+        DonationPackage.assigned_vendor_id == vendor.id
     )
     result = await db.execute(stmt)
     packages = result.scalars().all()
@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, join
+from sqlalchemy import select, join, and_
 from typing import List, Optional
 import uuid
 
 from ..database.connection import get_db_session
-from ..models.models import Vendor, Profile
+from ..models.models import Vendor, Profile, NGO, CityLocation
 from ..schemas.schemas import (
-    VendorCreate, VendorUpdate, VendorResponse, SuccessResponse
+    VendorCreate, VendorUpdate, VendorResponse, VendorNearbyResult, SuccessResponse, TokenData
 )
 from ..middleware.auth import (
     get_current_active_user, require_vendor, require_admin_or_vendor
 )
+from ..utils.geo import distance_km, within_box, place_key, locate_pin_code, locate_city
 
 router = APIRouter(tags=["vendors"])
 
@@ -66,6 +67,101 @@ async def get_all_vendors(
             detail="Failed to fetch vendors"
         )
 
+@router.get("/nearby", response_model=List[VendorNearbyResult])
+async def get_nearby_vendors(
+    ngo_id: Optional[uuid.UUID] = None,
+    pin_code: Optional[str] = Query(None, pattern=r"^\d{6}$"),
+    radius_km: float = Query(50, gt=0, le=500),
+    verified_only: bool = True,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get vendors serving an NGO's region (or a pin code's), nearest first."""
+    if ngo_id:
+        result = await db.execute(select(NGO.pin_code, NGO.city, NGO.state).where(NGO.id == ngo_id))
+        ngo = result.first()
+        if not ngo:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="NGO not found"
+            )
+        origin = await locate_pin_code(db, ngo.pin_code) or await locate_city(db, ngo.city, ngo.state)
+        if not origin:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="NGO location unknown"
+            )
+    elif pin_code:
+        origin = await locate_pin_code(db, pin_code)
+        if not origin:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Unknown pin code"
+            )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide an ngo_id or pin_code"
+        )
+    
+    try:
+        # Vendors are located by their city; nearby cities come off the lat/lon index,
+        # then vendors join on the normalised city/state index
+        distance = distance_km(CityLocation.latitude, CityLocation.longitude, origin)
+        nearby_cities = (
+            select(CityLocation.city, CityLocation.state, distance.label('distance_km'))
+            .where(*within_box(CityLocation.latitude, CityLocation.longitude, origin, radius_km))
+            .where(distance <= radius_km)
+            .subquery()
+        )
+        stmt = (
+            select(Vendor, nearby_cities.c.distance_km)
+            .join(nearby_cities, and_(
+                place_key(Vendor.city) == nearby_cities.c.city,
+                place_key(Vendor.state) == nearby_cities.c.state
+            ))
+            .order_by(nearby_cities.c.distance_km, Vendor.id)
+            .limit(limit)
+        )
+        if verified_only:
+            stmt = stmt.where(Vendor.verified.is_(True))
+        
+        result = await db.execute(stmt)
+        
+        return [
+            VendorNearbyResult(
+                id=vendor.id,
+                user_id=vendor.user_id,
+                shop_name=vendor.company_name,  # Map company_name to shop_name
+                owner_name=vendor.company_name,  # Use company_name as owner_name for now
+                description=vendor.description,
+                website=vendor.website,
+                logo_url=vendor.logo_url,
+                shop_location=vendor.address,  # Map address to shop_location
+                full_address=vendor.address,  # Map address to full_address
+                pin_code="000000",  # Default pin_code since it doesn't exist in DB
+                city=vendor.city,
+                state=vendor.state,
+                country=vendor.country,
+                phone=vendor.phone,
+                email=vendor.email,
+                gst_number="000000000000000",  # Default GST since it doesn't exist in DB
+                business_type=vendor.business_type,
+                business_license=None,  # Default since it doesn't exist in DB
+                verified=vendor.verified,
+                created_at=vendor.created_at,
+                updated_at=vendor.updated_at,
+                distance_km=vendor_distance
+            )
+            for vendor, vendor_distance in result.all()
+        ]
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch nearby vendors"
+        )
+
 @router.get("/{vendor_id}", response_model=VendorResponse)
 async def get_vendor_by_id(
     vendor_id: uuid.UUID,
@@ -192,7 +288,7 @@ async def create_vendor(
 async def update_vendor(
     vendor_id: uuid.UUID,
     vendor_data: VendorUpdate,
-    current_user: Profile = Depends(require_admin_or_vendor),
+    current_user: TokenData = Depends(require_admin_or_vendor),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Update a vendor (vendor owner or admin only)."""
@@ -269,7 +365,7 @@ async def update_vendor(
 @router.delete("/{vendor_id}", response_model=SuccessResponse)
 async def delete_vendor(
     vendor_id: uuid.UUID,
-    current_user: Profile = Depends(require_admin_or_vendor),
+    current_user: TokenData = Depends(require_admin_or_vendor),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Delete a vendor (vendor owner or admin only)."""
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
@@ -153,6 +153,17 @@ class NGOResponse(NGOBase):
     last_name: Optional[str] = None
     user_email: Optional[str] = None
 
+class NGOSearchResult(NGOResponse):
+    rank: float
+
+class NGOSearchResponse(BaseSchema):
+    items: List[NGOSearchResult]
+    # Pass back as `cursor` for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class NGONearbyResult(NGOResponse):
+    distance_km: float
+
 # Vendor schemas
 class VendorBase(BaseSchema):
     shop_name: str
@@ -200,6 +211,9 @@ class VendorResponse(VendorBase):
     created_at: datetime
     updated_at: datetime
 
+class VendorNearbyResult(VendorResponse):
+    distance_km: float
+
 # Package schemas
 class PackageBase(BaseSchema):
     title: str
@@ -230,6 +244,25 @@ class PackageResponse(PackageBase):
     created_at: datetime
     updated_at: datetime
 
+class PackageLeaderboardEntry(PackageResponse):
+    rank: int
+    # Share of target_quantity already donated, in percent
+    funded_percent: Optional[float] = None
+    # Completed donations this week (most_funded_week view)
+    week_amount: Optional[Decimal] = None
+    week_donations: Optional[int] = None
+
+class FacetCount(BaseSchema):
+    value: str
+    count: int
+
+class PackageCatalogResponse(BaseSchema):
+    items: List[PackageResponse]
+    # Packages matching every selected filter
+    total: int
+    # Per facet, counts under all filters except that facet's own selection
+    facets: Dict[str, List[FacetCount]]
+
 # Donation schemas
 class DonationBase(BaseSchema):
     ngo_id: str
@@ -256,6 +289,79 @@ class DonationResponse(DonationBase):
     created_at: datetime
     updated_at: datetime
 
+class AdminOverviewResponse(BaseSchema):
+    pending_ngo_approvals: int
+    pending_vendor_approvals: int
+    unassigned_transactions: int
+    oldest_unassigned_at: Optional[datetime] = None
+    # Open and in-progress tickets by priority
+    open_tickets: Dict[str, int]
+    pending_invoices: int
+    pending_invoice_amount: Decimal
+    donations_today: int
+    donation_amount_today: Decimal
+    donations_7d: int
+    donation_amount_7d: Decimal
+    donations_30d: int
+    donation_amount_30d: Decimal
+    # When the figures were computed; they are at most one refresh interval old
+    refreshed_at: datetime
+
+class DonationSeriesPoint(BaseSchema):
+    bucket_start: datetime
+    donations: int
+    amount: Decimal
+    # Distinct donors within this bucket; not additive across buckets
+    unique_donors: int
+
+class DonationSeriesResponse(BaseSchema):
+    grain: str
+    dimension: str
+    key: str
+    start: datetime
+    end: datetime
+    # Non-empty buckets only, oldest first
+    points: List[DonationSeriesPoint]
+    total_donations: int
+    total_amount: Decimal
+
+class NGOImpact(BaseSchema):
+    ngo_id: str
+    ngo_name: Optional[str] = None
+    donations: int
+    amount: Decimal
+
+class CategoryImpact(BaseSchema):
+    category: str
+    donations: int
+    quantity: int
+    amount: Decimal
+
+class ImpactActivity(BaseSchema):
+    donation_id: uuid.UUID
+    ngo_id: str
+    package_id: str
+    package_title: str
+    quantity: int
+    total_amount: Decimal
+    payment_status: str
+    # Status of the donation's delivery, once a transaction exists
+    delivery_status: Optional[str] = None
+    created_at: datetime
+
+class DonorImpactResponse(BaseSchema):
+    # Totals cover completed donations
+    total_donations: int
+    total_amount: Decimal
+    total_quantity: int
+    ngos_supported: int
+    first_donation_at: Optional[datetime] = None
+    by_ngo: List[NGOImpact]
+    by_category: List[CategoryImpact]
+    # Delivery transactions by status
+    delivery_status: Dict[str, int]
+    recent: List[ImpactActivity]
+
 # Transaction schemas
 class TransactionBase(BaseSchema):
     package_id: uuid.UUID
@@ -292,6 +398,43 @@ class TransactionResponse(TransactionBase):
     created_at: datetime
     updated_at: datetime
 
+class VendorOrderResponse(TransactionResponse):
+    # Fields from the donation, NGO, package and donor joins
+    quantity: Optional[int] = None
+    total_amount: Optional[Decimal] = None
+    invoice_number: Optional[str] = None
+    ngo_name: Optional[str] = None
+    ngo_full_address: Optional[str] = None
+    ngo_city: Optional[str] = None
+    ngo_state: Optional[str] = None
+    ngo_pin_code: Optional[str] = None
+    ngo_phone: Optional[str] = None
+    package_title: Optional[str] = None
+    package_category: Optional[str] = None
+    package_amount: Optional[Decimal] = None
+    donor_first_name: Optional[str] = None
+    donor_last_name: Optional[str] = None
+
+class BulkOrderStatusItem(BaseSchema):
+    transaction_id: uuid.UUID
+    status: TransactionStatus
+    tracking_number: Optional[str] = None
+
+class BulkOrderStatusUpdate(BaseSchema):
+    items: List[BulkOrderStatusItem] = Field(..., min_length=1, max_length=1000)
+
+class BulkOrderStatusResult(BaseSchema):
+    transaction_id: uuid.UUID
+    success: bool
+    message: str
+
+class BulkOrderStatusResponse(BaseSchema):
+    success: bool = True
+    message: str
+    updated: int
+    failed: int
+    results: List[BulkOrderStatusResult]
+
 # Ticket schemas
 class TicketBase(BaseSchema):
     title: str
@@ -331,6 +474,13 @@ class TokenData(BaseSchema):
     user_id: Optional[uuid.UUID] = None
     email: Optional[str] = None
     role: Optional[UserRole] = None
+    jti: Optional[str] = None
+
+class RefreshTokenRequest(BaseSchema):
+    refresh_token: str
+
+class LogoutRequest(BaseSchema):
+    refresh_token: Optional[str] = None
 
 class AuthResponse(BaseSchema):
     success: bool
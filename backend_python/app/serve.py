@@ -0,0 +1,162 @@
+"""
+Production server launcher for the DoGoodHub API.
+
+Runs several worker processes under gunicorn with uvicorn workers when
+gunicorn is installed (SIGHUP then gracefully reloads workers), falling
+back to uvicorn's own process manager otherwise. Each worker's database
+pool is sized so all workers together stay within the Postgres
+connection budget.
+
+Usage:
+    python -m app.serve --workers 4 --port 8000
+    kill -HUP <master pid>   # graceful reload (gunicorn only)
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("app.serve")
+
+APP_URI = "app.main:app"
+
+# Connections this host may open; set to its share of max_connections when several hosts share one database
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "100"))
+# Kept free for migrations, admin sessions and monitoring
+DB_RESERVED_CONNECTIONS = int(os.getenv("DB_RESERVED_CONNECTIONS", "10"))
+# Should exceed JOB_SHUTDOWN_GRACE_SECONDS so running jobs can drain
+GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", "30"))
+KEEPALIVE_SECONDS = int(os.getenv("KEEPALIVE_SECONDS", "5"))
+
+
+def default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+
+def select_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def select_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def size_pool(workers: int, max_connections: int, reserved: int) -> tuple:
+    """Split the connection budget across workers into (pool_size, max_overflow)."""
+    per_worker = max(1, (max_connections - reserved) // workers)
+    # Most connections stay pooled; a quarter is burst headroom that is closed when idle
+    max_overflow = per_worker // 4
+    return per_worker - max_overflow, max_overflow
+
+
+def configure_database(workers: int):
+    """Export per-worker pool settings for the worker processes to pick up."""
+    pool_size, max_overflow = size_pool(workers, DB_MAX_CONNECTIONS, DB_RESERVED_CONNECTIONS)
+    os.environ.setdefault("DB_POOL_SIZE", str(pool_size))
+    os.environ.setdefault("DB_MAX_OVERFLOW", str(max_overflow))
+    # Statement logging is far too slow for production traffic
+    os.environ.setdefault("DB_ECHO", "false")
+
+    total = workers * (int(os.environ["DB_POOL_SIZE"]) + int(os.environ["DB_MAX_OVERFLOW"]))
+    logger.info(
+        f"DB pool per worker: {os.environ['DB_POOL_SIZE']} + {os.environ['DB_MAX_OVERFLOW']} overflow "
+        f"({total} max across {workers} workers, budget {DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS})"
+    )
+    if total > DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS:
+        logger.warning("Configured pools can exceed the Postgres connection budget")
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from gunicorn.util import import_app
+            return import_app(APP_URI)
+
+    Application({
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        # UvicornWorker picks uvloop and httptools when they are installed
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "graceful_timeout": GRACEFUL_TIMEOUT_SECONDS,
+        "timeout": GRACEFUL_TIMEOUT_SECONDS * 2,
+        "keepalive": KEEPALIVE_SECONDS,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10,
+        "forwarded_allow_ips": args.forwarded_allow_ips,
+        "accesslog": "-" if args.access_log else None,
+        "loglevel": args.log_level,
+    }).run()
+
+
+def run_uvicorn(args):
+    import uvicorn
+
+    uvicorn.run(
+        APP_URI,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=select_loop(),
+        http=select_http(),
+        timeout_keep_alive=KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT_SECONDS,
+        limit_max_requests=args.max_requests or None,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        access_log=args.access_log,
+        log_level=args.log_level,
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the DoGoodHub API in production")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "0")),
+                        help="Recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"))
+    parser.add_argument("--access-log", action="store_true")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--no-gunicorn", action="store_true",
+                        help="Use uvicorn's process manager even if gunicorn is installed")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:%(name)s:%(message)s")
+
+    configure_database(args.workers)
+    use_gunicorn = not args.no_gunicorn and importlib.util.find_spec("gunicorn") is not None
+    logger.info(
+        f"Starting {args.workers} worker(s) on {args.host}:{args.port} with "
+        f"{'gunicorn' if use_gunicorn else 'uvicorn'}, loop={select_loop()}, http={select_http()}"
+    )
+
+    if use_gunicorn:
+        run_gunicorn(args)
+    else:
+        logger.info("Graceful reload via SIGHUP needs gunicorn; restart to pick up changes")
+        run_uvicorn(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Admin overview: a one-row materialized view of what needs an admin's attention.
+
+The view is refreshed CONCURRENTLY every ADMIN_OVERVIEW_REFRESH_SECONDS,
+so reads never wait on the counts and a refresh never blocks reads. Every
+API worker runs the loop; a transaction-scoped advisory lock plus the
+view's own refreshed_at mean only one of them refreshes per interval.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.connection import AsyncSessionLocal, USE_MOCK_DATA
+from .health import health_registry
+
+logger = logging.getLogger(__name__)
+
+ADMIN_OVERVIEW_REFRESH_SECONDS = float(os.getenv("ADMIN_OVERVIEW_REFRESH_SECONDS", "60"))
+# Arbitrary key for pg_try_advisory_xact_lock, shared by all workers
+ADMIN_OVERVIEW_LOCK_ID = 7346100046
+
+
+async def load_admin_overview(db: AsyncSession) -> Optional[dict]:
+    result = await db.execute(text("SELECT * FROM admin_overview"))
+    row = result.mappings().first()
+    return dict(row) if row else None
+
+
+async def refresh_admin_overview(db: AsyncSession, max_age_seconds: Optional[float] = None) -> bool:
+    """Refresh the view; False if another worker holds the refresh or it is newer than max_age_seconds.
+
+    The caller commits, which also releases the lock.
+    """
+    locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": ADMIN_OVERVIEW_LOCK_ID})
+    if not locked.scalar():
+        return False
+    if max_age_seconds is not None:
+        age = await db.execute(text("SELECT extract(epoch FROM now() - refreshed_at) FROM admin_overview"))
+        age_seconds = age.scalar()
+        if age_seconds is not None and age_seconds < max_age_seconds:
+            return False
+    await db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY admin_overview"))
+    return True
+
+
+class AdminOverviewRefresher:
+    """Background loop that keeps the admin overview view fresh."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if USE_MOCK_DATA or self._task or ADMIN_OVERVIEW_REFRESH_SECONDS <= 0:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    # Slightly under the interval, so the worker that refreshed last time does it again on schedule
+                    await refresh_admin_overview(db, max_age_seconds=ADMIN_OVERVIEW_REFRESH_SECONDS * 0.9)
+                    await db.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Admin overview refresh failed: {e}")
+            await asyncio.sleep(ADMIN_OVERVIEW_REFRESH_SECONDS)
+
+
+async def check_admin_overview() -> dict:
+    """Report how old the admin overview is."""
+    if USE_MOCK_DATA:
+        return {"mode": "mock"}
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(text("SELECT refreshed_at FROM admin_overview"))
+        refreshed_at = result.scalar()
+
+    return {
+        "refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+        "age_seconds": round((datetime.now(timezone.utc) - refreshed_at).total_seconds(), 1) if refreshed_at else None,
+    }
+
+
+# Global refresher instance
+admin_overview_refresher = AdminOverviewRefresher()
+health_registry.register("admin_overview", check_admin_overview, critical=False)
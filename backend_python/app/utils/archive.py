@@ -0,0 +1,322 @@
+"""
+Archival of settled transactions and donations.
+
+Completed transactions older than ARCHIVE_HORIZON_DAYS move from
+`transactions` to `transactions_archive`, taking their events, tickets and
+invoices along as JSON. Donations follow to `donations_archive` once their
+payment is settled and none of their transactions are left. Both archive
+tables are partitioned by month of created_at, with partitions created as
+rows arrive, so the live tables the dashboards scan only hold the horizon.
+
+The live tables themselves stay unpartitioned: tickets, invoices, events
+and transactions reference them by id, and Postgres requires a partitioned
+table's unique keys to include the partition key.
+
+Each batch is one transaction that locks its rows, creates any missing
+partitions and moves the rows with a single DELETE ... RETURNING feeding an
+INSERT. The first run after deploying drains existing history the same way.
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import os
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select, func, exists, text, bindparam, union_all, null, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.connection import AsyncSessionLocal, USE_MOCK_DATA
+from ..models.models import (
+    Donation, DonationArchive, Transaction, TransactionArchive, Ticket, VendorInvoice
+)
+from ..schemas.schemas import TransactionStatus
+from .health import health_registry
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "false").lower() == "true"
+ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", "365"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+# Longest range one export may cover
+EXPORT_MAX_DAYS = int(os.getenv("EXPORT_MAX_DAYS", "366"))
+# Arbitrary key for pg_try_advisory_xact_lock, shared by all workers
+ARCHIVE_LOCK_ID = 7346100050
+
+# Donations in these states never change again
+SETTLED_PAYMENT_STATUSES = ("completed", "failed", "refunded")
+# A transaction with an open ticket or an unreviewed invoice stays live
+OPEN_TICKET_STATUSES = ("open", "in_progress")
+
+EXPORT_DATASETS = {
+    "transactions": (Transaction, TransactionArchive),
+    "donations": (Donation, DonationArchive),
+}
+EXPORT_CHUNK_ROWS = 1000
+
+
+class ExportRangeError(Exception):
+    """The export range is empty or longer than EXPORT_MAX_DAYS."""
+
+
+def month_start(at: datetime) -> datetime:
+    at = at.astimezone(timezone.utc)
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(start: datetime) -> datetime:
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+async def ensure_partitions(db: AsyncSession, table: str, months: set):
+    """Create the monthly partitions of an archive table the given months fall in."""
+    for start in sorted(months):
+        name = f"{table}_{start:%Y_%m}"
+        result = await db.execute(text("SELECT to_regclass(:name)"), {"name": name})
+        if result.scalar() is None:
+            await db.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{next_month(start).isoformat()}')"
+            ))
+
+
+def move_rows_sql(source: str, archive: str, columns: list, extra: dict) -> text:
+    """DELETE the given ids from source and INSERT them into archive in one statement.
+
+    `extra` maps additional archive columns to SQL over the moved row `m`;
+    every sub-statement sees the rows as they were before the delete.
+    """
+    names = ", ".join(columns + list(extra))
+    values = ", ".join([f"m.{column}" for column in columns] + list(extra.values()))
+    return text(f"""
+        WITH m AS (
+            DELETE FROM {source} WHERE id = ANY(:ids) RETURNING *
+        )
+        INSERT INTO {archive} ({names})
+        SELECT {values} FROM m
+    """).bindparams(bindparam("ids", type_=ARRAY(UUID(as_uuid=True))))
+
+
+def related_json(table: str) -> str:
+    return (
+        f"(SELECT jsonb_agg(to_jsonb(r) ORDER BY r.created_at) "
+        f"FROM {table} r WHERE r.transaction_id = m.id)"
+    )
+
+
+MOVE_TRANSACTIONS = move_rows_sql(
+    "transactions", "transactions_archive",
+    [column.name for column in Transaction.__table__.columns],
+    {
+        "events": related_json("transaction_events"),
+        "tickets": related_json("tickets"),
+        "invoices": related_json("vendor_invoices"),
+    }
+)
+MOVE_DONATIONS = move_rows_sql(
+    "donations", "donations_archive",
+    [column.name for column in Donation.__table__.columns],
+    {}
+)
+
+
+async def archive_batch(
+    db: AsyncSession,
+    model,
+    conditions: list,
+    archive_table: str,
+    move_sql: text,
+    batch_size: int,
+    after: Optional[tuple] = None
+) -> tuple:
+    """Move up to batch_size archivable rows, oldest first, past the (created_at, id) key `after`.
+
+    Returns the number moved and the key to continue from, None once done.
+    """
+    stmt = select(model.id, model.created_at).where(*conditions)
+    if after:
+        # The plain bound lets the created_at index skip rows already walked past
+        stmt = stmt.where(model.created_at >= after[0], tuple_(model.created_at, model.id) > after)
+    stmt = (
+        stmt.order_by(model.created_at, model.id)
+        .limit(batch_size)
+        .with_for_update(of=model, skip_locked=True)
+    )
+    rows = (await db.execute(stmt)).all()
+    if not rows:
+        return 0, None
+
+    await ensure_partitions(db, archive_table, {month_start(row.created_at) for row in rows})
+    await db.execute(move_sql, {"ids": [row.id for row in rows]})
+    last = rows[-1]
+    return len(rows), ((last.created_at, last.id) if len(rows) == batch_size else None)
+
+
+def archivable_transactions(cutoff: datetime) -> list:
+    return [
+        Transaction.status == TransactionStatus.COMPLETED.value,
+        # Completion follows creation, so this bound can use the status index
+        Transaction.created_at < cutoff,
+        # Rows completed before completed_at was stamped fall back to their last update
+        func.coalesce(Transaction.completed_at, Transaction.updated_at) < cutoff,
+        ~exists().where(Ticket.transaction_id == Transaction.id, Ticket.status.in_(OPEN_TICKET_STATUSES)),
+        ~exists().where(VendorInvoice.transaction_id == Transaction.id, VendorInvoice.status == "pending"),
+    ]
+
+
+def archivable_donations(cutoff: datetime) -> list:
+    return [
+        Donation.created_at < cutoff,
+        Donation.updated_at < cutoff,
+        Donation.payment_status.in_(SETTLED_PAYMENT_STATUSES),
+        ~exists().where(Transaction.donation_id == Donation.id),
+    ]
+
+
+async def run_archival(horizon_days: int = ARCHIVE_HORIZON_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE) -> dict:
+    """Archive everything past the horizon, one committed batch at a time.
+
+    Stops early if another worker is archiving at the same moment.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=horizon_days)
+    moved = {"transactions": 0, "donations": 0}
+    # Transactions first, so their donations are archivable in the same run
+    steps = [
+        ("transactions", Transaction, archivable_transactions(cutoff), "transactions_archive", MOVE_TRANSACTIONS),
+        ("donations", Donation, archivable_donations(cutoff), "donations_archive", MOVE_DONATIONS),
+    ]
+    for name, model, conditions, archive_table, move_sql in steps:
+        after = None
+        while True:
+            async with AsyncSessionLocal() as db:
+                locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": ARCHIVE_LOCK_ID})
+                if not locked.scalar():
+                    return {"cutoff": cutoff, "archived": moved, "completed": False}
+                count, after = await archive_batch(db, model, conditions, archive_table, move_sql, batch_size, after)
+                await db.commit()
+            moved[name] += count
+            if after is None:
+                break
+    return {"cutoff": cutoff, "archived": moved, "completed": True}
+
+
+def export_query(dataset: str, start: datetime, end: datetime, include_archived: bool = True):
+    """Live and (optionally) archived rows created in [start, end), oldest first."""
+    live, archive = EXPORT_DATASETS[dataset]
+    columns = [column.name for column in live.__table__.columns]
+    queries = [
+        select(*[live.__table__.c[column] for column in columns], null().label("archived_at"))
+        .where(live.created_at >= start, live.created_at < end)
+    ]
+    if include_archived:
+        # The created_at range prunes the scan to the partitions it covers
+        queries.append(
+            select(*[archive.__table__.c[column] for column in columns], archive.archived_at)
+            .where(archive.created_at >= start, archive.created_at < end)
+        )
+    stmt = union_all(*queries).subquery()
+    return select(stmt).order_by(stmt.c.created_at, stmt.c.id)
+
+
+def check_export_range(start: datetime, end: datetime):
+    if start >= end:
+        raise ExportRangeError("start must be before end")
+    if end - start > timedelta(days=EXPORT_MAX_DAYS):
+        raise ExportRangeError(f"Exports cover at most {EXPORT_MAX_DAYS} days")
+
+
+async def export_csv(
+    dataset: str,
+    start: datetime,
+    end: datetime,
+    include_archived: bool = True,
+    compress: bool = False
+) -> AsyncIterator[bytes]:
+    """Stream an export as CSV (gzip-compressed if asked), a chunk of rows at a time."""
+    stmt = export_query(dataset, start, end, include_archived)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(buffer: io.StringIO) -> bytes:
+        data = buffer.getvalue().encode()
+        return compressor.compress(data) if compressor else data
+
+    # Own session: the response outlives the request's dependencies
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(result.keys())
+        yield encode(buffer)
+        async for rows in result.partitions(EXPORT_CHUNK_ROWS):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows(rows)
+            yield encode(buffer)
+    if compressor:
+        yield compressor.flush()
+
+
+class Archiver:
+    """Background loop that archives settled rows every ARCHIVE_INTERVAL_SECONDS."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[dict] = None
+
+    def start(self):
+        if not ARCHIVE_ENABLED or USE_MOCK_DATA or self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Archival started (horizon {ARCHIVE_HORIZON_DAYS} days, every {ARCHIVE_INTERVAL_SECONDS}s)")
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> dict:
+        result = await run_archival()
+        self.last_run = {**result, "finished_at": datetime.now(timezone.utc)}
+        archived = result["archived"]
+        if archived["transactions"] or archived["donations"]:
+            logger.info(
+                f"Archived {archived['transactions']} transactions and "
+                f"{archived['donations']} donations created before {result['cutoff']:%Y-%m-%d}"
+            )
+        return result
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Archival failed: {e}")
+            await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+
+async def check_archive() -> dict:
+    """Report the archiver's last run."""
+    last_run = archiver.last_run
+    return {
+        "enabled": ARCHIVE_ENABLED,
+        "horizon_days": ARCHIVE_HORIZON_DAYS,
+        "last_run_at": last_run["finished_at"].isoformat() if last_run else None,
+        "last_archived": last_run["archived"] if last_run else None,
+    }
+
+
+# Global archiver instance
+archiver = Archiver()
+health_registry.register("archive", check_archive, critical=False)
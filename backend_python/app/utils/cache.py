@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from .health import health_registry
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_CACHE_TTL_SECONDS = float(os.getenv("SETTINGS_CACHE_TTL_SECONDS", "60"))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "30"))
+# Verified JWT claims are reused for at most this long, and never past the token's exp
+JWT_CLAIMS_CACHE_TTL_SECONDS = float(os.getenv("JWT_CLAIMS_CACHE_TTL_SECONDS", "300"))
+JWT_CLAIMS_CACHE_SIZE = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", "4096"))
+
+_MISSING = object()
+
+
+class TTLCache:
+    """In-process cache with per-entry expiry, LRU eviction and single-flight loading.
+
+    Each API process has its own copy; invalidation is local, so the TTL
+    bounds how stale other workers can be after a write.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 1024):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value; ttl_seconds can only shorten the cache's own TTL."""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """Drop one key, or everything when no key is given."""
+        if key is _MISSING:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        # Concurrent misses for the same key wait for one load instead of stampeding the DB
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            try:
+                value = await loader()
+                self.set(key, value)
+            finally:
+                self._locks.pop(key, None)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+# Global cache instances
+settings_cache = TTLCache("settings", SETTINGS_CACHE_TTL_SECONDS, max_entries=8)
+catalog_cache = TTLCache("catalog", CATALOG_CACHE_TTL_SECONDS)
+claims_cache = TTLCache("jwt_claims", JWT_CLAIMS_CACHE_TTL_SECONDS, max_entries=JWT_CLAIMS_CACHE_SIZE)
+
+
+async def check_caches() -> dict:
+    """Report cache sizes and hit rates."""
+    return {cache.name: cache.stats() for cache in (settings_cache, catalog_cache, claims_cache)}
+
+
+health_registry.register("cache", check_caches, critical=False)
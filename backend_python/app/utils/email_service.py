@@ -1,9 +1,5 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+import asyncio
 import logging
 from datetime import datetime
 
@@ -12,6 +8,11 @@ from sqlalchemy import select
 
 from ..models.models import ApplicationSettings
 from ..schemas.schemas import UserRole
+from .jobs import job_task
+from .cache import settings_cache
+
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
 
 logger = logging.getLogger(__name__)
 
@@ -25,21 +26,38 @@ class EmailService:
         self.app_name = "Do Good Hub"
         self.app_logo = None
     
+    async def _fetch_settings(self, db: AsyncSession) -> Optional[dict]:
+        stmt = select(ApplicationSettings).limit(1)
+        result = await db.execute(stmt)
+        settings = result.scalar_one_or_none()
+        if not settings:
+            return None
+        return {
+            "smtp_server": settings.smtp_host,
+            "smtp_port": settings.smtp_port,
+            "smtp_username": settings.smtp_username,
+            "smtp_password": settings.smtp_password,
+            "admin_email": settings.admin_email,
+            "app_name": settings.app_name,
+            "app_logo": settings.app_logo_url
+        }
+    
     async def load_settings(self, db: AsyncSession):
         """Load email settings from database."""
         try:
-            stmt = select(ApplicationSettings).limit(1)
-            result = await db.execute(stmt)
-            settings = result.scalar_one_or_none()
+            # Cached briefly; admin settings updates invalidate it
+            settings = await settings_cache.get_or_load(
+                "application_settings", lambda: self._fetch_settings(db)
+            )
             
             if settings:
-                self.smtp_server = settings.smtp_server
-                self.smtp_port = settings.smtp_port
-                self.smtp_username = settings.smtp_username
-                self.smtp_password = settings.smtp_password
-                self.admin_email = settings.admin_email
-                self.app_name = settings.app_name or "Do Good Hub"
-                self.app_logo = settings.app_logo
+                self.smtp_server = settings["smtp_server"]
+                self.smtp_port = settings["smtp_port"]
+                self.smtp_username = settings["smtp_username"]
+                self.smtp_password = settings["smtp_password"]
+                self.admin_email = settings["admin_email"]
+                self.app_name = settings["app_name"] or "Do Good Hub"
+                self.app_logo = settings["app_logo"]
             else:
                 # Use default settings if no settings found
                 self.admin_email = "shibinsp43@gmail.com"
@@ -55,6 +73,8 @@ class EmailService:
             return None
         
         try:
+            # The SMTP and MIME modules are only needed once mail is actually sent
+            import smtplib
             server = smtplib.SMTP(self.smtp_server, self.smtp_port)
             server.starttls()
             server.login(self.smtp_username, self.smtp_password)
@@ -63,8 +83,11 @@ class EmailService:
             logger.error(f"Failed to create SMTP connection: {e}")
             return None
     
-    def _create_email_template(self, subject: str, body: str, recipient_email: str) -> MIMEMultipart:
+    def _create_email_template(self, subject: str, body: str, recipient_email: str) -> "MIMEMultipart":
         """Create email template with HTML formatting."""
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        
         msg = MIMEMultipart('alternative')
         msg['From'] = self.smtp_username or self.admin_email
         msg['To'] = recipient_email
@@ -394,18 +417,25 @@ class EmailService:
         
         return await self._send_email(subject, body, vendor_email)
     
+    def _send_message(self, msg: "MIMEMultipart", recipient_email: str) -> bool:
+        """Deliver a message over SMTP (blocking)."""
+        server = self._create_connection()
+        if not server:
+            logger.warning(f"Could not send email to {recipient_email} - SMTP not configured")
+            return False
+        
+        server.send_message(msg)
+        server.quit()
+        return True
+    
     async def _send_email(self, subject: str, body: str, recipient_email: str) -> bool:
         """Send email using SMTP."""
         try:
-            server = self._create_connection()
-            if not server:
-                logger.warning(f"Could not send email to {recipient_email} - SMTP not configured")
-                return False
-            
             msg = self._create_email_template(subject, body, recipient_email)
             
-            server.send_message(msg)
-            server.quit()
+            # smtplib blocks, so run it in a worker thread to keep the event loop free
+            if not await asyncio.to_thread(self._send_message, msg, recipient_email):
+                return False
             
             logger.info(f"Email sent successfully to {recipient_email}")
             return True
@@ -414,6 +444,10 @@ class EmailService:
             logger.error(f"Failed to send email to {recipient_email}: {e}")
             return False
     
+    def is_configured(self) -> bool:
+        """Whether SMTP settings are complete enough to attempt delivery."""
+        return all([self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password])
+    
     async def send_login_welcome_email(
         self, 
         db: AsyncSession,
@@ -481,4 +515,36 @@ class EmailService:
         return await self._send_email(subject, body, test_recipient)
 
 # Global email service instance
-email_service = EmailService()
\ No newline at end of file
+email_service = EmailService()
+
+# Background job handlers
+def _raise_if_undelivered(sent: bool):
+    # Missing SMTP settings won't fix themselves, so only real send failures are retried
+    if not sent and email_service.is_configured():
+        raise RuntimeError("Email delivery failed")
+
+@job_task("email.login_welcome")
+async def login_welcome_email_job(db: AsyncSession, payload: dict):
+    _raise_if_undelivered(await email_service.send_login_welcome_email(db=db, **payload))
+
+@job_task("email.registration_approval_request")
+async def registration_approval_request_job(db: AsyncSession, payload: dict):
+    _raise_if_undelivered(await email_service.send_registration_approval_request(db=db, **payload))
+
+@job_task("email.approval_notification")
+async def approval_notification_job(db: AsyncSession, payload: dict):
+    _raise_if_undelivered(await email_service.send_approval_notification(db=db, **payload))
+
+@job_task("email.invoice_notification")
+async def invoice_notification_job(db: AsyncSession, payload: dict):
+    _raise_if_undelivered(await email_service.send_invoice_notification(db=db, **payload))
+
+@job_task("email.invoice_approved")
+async def invoice_approved_job(db: AsyncSession, payload: dict):
+    await email_service.load_settings(db)
+    _raise_if_undelivered(await email_service.send_invoice_approval_notification(**payload))
+
+@job_task("email.invoice_rejected")
+async def invoice_rejected_job(db: AsyncSession, payload: dict):
+    await email_service.load_settings(db)
+    _raise_if_undelivered(await email_service.send_invoice_rejection_notification(**payload))
@@ -0,0 +1,143 @@
+"""
+Pin code and city geolocation for proximity queries.
+
+Locations come from the bundled datasets in app/data (loaded by the
+migration that creates the tables). Proximity queries first narrow
+candidates with a bounding box on the indexed latitude/longitude columns,
+then compute exact great-circle distances for what is left.
+
+Reload the tables after rebuilding the datasets:
+    python -m app.utils.geo
+"""
+
+import asyncio
+import csv
+import gzip
+import math
+import os
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.connection import AsyncSessionLocal
+from ..models.models import PinCode, CityLocation
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+PIN_CODES_PATH = os.path.join(DATA_DIR, "pin_codes.csv.gz")
+CITY_LOCATIONS_PATH = os.path.join(DATA_DIR, "city_locations.csv.gz")
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+LOAD_CHUNK_SIZE = 2000
+
+Location = Tuple[float, float]
+
+
+def normalize_place(name: Optional[str]) -> str:
+    """Key form of a city or state name, as stored in city_locations."""
+    return (name or "").strip().lower()
+
+
+def place_key(column):
+    """SQL counterpart of normalize_place (matches the vendors city/state index)."""
+    return func.lower(func.trim(column))
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_km(latitude_column, longitude_column, origin: Location):
+    """SQL great-circle distance in km from origin to a latitude/longitude column pair."""
+    lat, lon = origin
+    a = (
+        func.power(func.sin(func.radians(latitude_column - lat) / 2), 2)
+        + math.cos(math.radians(lat)) * func.cos(func.radians(latitude_column))
+        * func.power(func.sin(func.radians(longitude_column - lon) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+def bounding_box(origin: Location, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the circle around origin."""
+    lat, lon = origin
+    lat_delta = radius_km / KM_PER_DEGREE
+    lon_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta
+
+
+def within_box(latitude_column, longitude_column, origin: Location, radius_km: float) -> list:
+    """Index-friendly prefilter for distance_km(...) <= radius_km."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(origin, radius_km)
+    return [
+        latitude_column.between(min_lat, max_lat),
+        longitude_column.between(min_lon, max_lon),
+    ]
+
+
+async def locate_pin_code(db: AsyncSession, pin_code: str) -> Optional[Location]:
+    result = await db.execute(
+        select(PinCode.latitude, PinCode.longitude).where(PinCode.pin_code == pin_code.strip())
+    )
+    row = result.first()
+    return (row.latitude, row.longitude) if row else None
+
+
+async def locate_city(db: AsyncSession, city: Optional[str], state: Optional[str]) -> Optional[Location]:
+    result = await db.execute(
+        select(CityLocation.latitude, CityLocation.longitude).where(
+            CityLocation.city == normalize_place(city),
+            CityLocation.state == normalize_place(state)
+        )
+    )
+    row = result.first()
+    return (row.latitude, row.longitude) if row else None
+
+
+def read_rows(path: str) -> Iterator[dict]:
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+async def load_geo_data(
+    db: AsyncSession,
+    pin_codes_path: str = PIN_CODES_PATH,
+    city_locations_path: str = CITY_LOCATIONS_PATH
+) -> dict:
+    """Upsert both datasets; the caller commits."""
+    counts = {}
+    for model, path, keys in (
+        (PinCode, pin_codes_path, ["pin_code"]),
+        (CityLocation, city_locations_path, ["city", "state"]),
+    ):
+        rows = [
+            {**row, "latitude": float(row["latitude"]), "longitude": float(row["longitude"])}
+            for row in read_rows(path)
+        ]
+        for start in range(0, len(rows), LOAD_CHUNK_SIZE):
+            stmt = insert(model).values(rows[start:start + LOAD_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=keys,
+                set_={
+                    column: stmt.excluded[column]
+                    for column in rows[0] if column not in keys
+                }
+            )
+            await db.execute(stmt)
+        counts[model.__tablename__] = len(rows)
+    return counts
+
+
+async def _reload():
+    async with AsyncSessionLocal() as db:
+        counts = await load_geo_data(db)
+        await db.commit()
+    print(", ".join(f"{table}: {count} rows" for table, count in counts.items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(_reload())
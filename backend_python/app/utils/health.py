@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from ..database.connection import get_engine, USE_MOCK_DATA
+
+logger = logging.getLogger(__name__)
+
+# How long a probe result is reused before the dependency is hit again
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", "5"))
+# Upper bound for a single probe so a hung dependency can't stall the LB
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+
+CheckFunction = Callable[[], Awaitable[Optional[dict]]]
+
+
+class HealthCheck:
+    """A named dependency probe whose result is cached for a short interval."""
+
+    def __init__(self, name: str, check: CheckFunction, critical: bool = True):
+        self.name = name
+        self.check = check
+        self.critical = critical
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def run(self) -> dict:
+        if self._result is not None and time.monotonic() - self._checked_at < HEALTH_CHECK_CACHE_SECONDS:
+            return self._result
+
+        # Concurrent probes wait for the one in flight instead of piling on
+        async with self._lock:
+            if self._result is not None and time.monotonic() - self._checked_at < HEALTH_CHECK_CACHE_SECONDS:
+                return self._result
+
+            started = time.perf_counter()
+            try:
+                details = await asyncio.wait_for(self.check(), HEALTH_CHECK_TIMEOUT_SECONDS)
+                result = {"status": "ok"}
+                if details:
+                    result.update(details)
+            except asyncio.TimeoutError:
+                result = {"status": "fail", "error": f"Timed out after {HEALTH_CHECK_TIMEOUT_SECONDS}s"}
+            except Exception as e:
+                logger.warning(f"Health check '{self.name}' failed: {e}")
+                result = {"status": "fail", "error": str(e)}
+
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            result["critical"] = self.critical
+            self._result = result
+            self._checked_at = time.monotonic()
+            return result
+
+
+class HealthRegistry:
+    """Registry of readiness probes; components register their own checks."""
+
+    def __init__(self):
+        self.checks: Dict[str, HealthCheck] = {}
+
+    def register(self, name: str, check: CheckFunction, critical: bool = True):
+        self.checks[name] = HealthCheck(name, check, critical)
+
+    async def run_all(self) -> dict:
+        results = await asyncio.gather(*(check.run() for check in self.checks.values()))
+        checks = dict(zip(self.checks.keys(), results))
+        ready = all(
+            result["status"] == "ok"
+            for result in checks.values()
+            if result["critical"]
+        )
+        return {"ready": ready, "checks": checks}
+
+
+async def check_database() -> dict:
+    """Run SELECT 1 through the connection pool."""
+    if USE_MOCK_DATA:
+        return {"mode": "mock"}
+
+    engine = get_engine()
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+    }
+
+
+# Global health registry instance
+health_registry = HealthRegistry()
+health_registry.register("database", check_database)
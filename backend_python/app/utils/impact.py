@@ -0,0 +1,176 @@
+"""
+Donor "my impact" summary.
+
+Everything the donor history page shows comes from one statement: the
+donor's donations are read once through ix_donations_user_id_created_at
+into a CTE, their delivery transactions once through
+ix_transactions_donor_user_id, and each section is aggregated from those
+into a JSON column of the single result row. Archived donations and
+transactions are read alongside the live ones, so the summary keeps
+covering the donor's whole history.
+"""
+
+import uuid
+from typing import Optional
+
+from sqlalchemy import select, func, case, cast, literal_column, union_all, Text
+from sqlalchemy.dialects.postgresql import UUID, JSON, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.models import Donation, DonationArchive, Package, NGO, Transaction, TransactionArchive
+from ..schemas.schemas import DonorImpactResponse
+
+# NGOs listed in by_ngo, largest amount first
+IMPACT_TOP_NGOS = 20
+UNCATEGORIZED = "uncategorized"
+UUID_TEXT_PATTERN = "^[0-9a-fA-F]{8}-([0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}$"
+
+
+def text_uuid(column):
+    """Cast a text id to uuid so joins use the primary key; NULL when it is not a uuid."""
+    return case((column.op("~")(UUID_TEXT_PATTERN), cast(column, UUID(as_uuid=True))))
+
+
+def json_list(*pairs, order_by):
+    """json_agg of objects built from (name, column) pairs, '[]' when there are no rows."""
+    item = func.json_build_object(*[part for pair in pairs for part in pair])
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(item, *order_by), type_=JSON),
+        literal_column("'[]'::json")
+    )
+
+
+async def load_donor_impact(db: AsyncSession, user_id: uuid.UUID, recent_limit: int = 10) -> DonorImpactResponse:
+    mine = union_all(*[
+        select(
+            model.id, model.ngo_id, model.package_id, model.package_title,
+            model.quantity, model.total_amount, model.payment_status, model.created_at
+        )
+        .where(model.user_id == user_id)
+        for model in (Donation, DonationArchive)
+    ]).cte("mine")
+    completed = (
+        select(
+            mine.c.ngo_id, mine.c.quantity, mine.c.total_amount, mine.c.created_at,
+            func.coalesce(Package.category, UNCATEGORIZED).label("category")
+        )
+        .select_from(mine.outerjoin(Package, Package.id == text_uuid(mine.c.package_id)))
+        .where(mine.c.payment_status == "completed")
+        .cte("completed")
+    )
+    deliveries = union_all(*[
+        select(model.donation_id, model.status, model.updated_at)
+        .where(model.donor_user_id == user_id)
+        for model in (Transaction, TransactionArchive)
+    ]).cte("deliveries")
+
+    totals = select(
+        func.count().label("donations"),
+        func.coalesce(func.sum(completed.c.total_amount), 0).label("amount"),
+        func.coalesce(func.sum(completed.c.quantity), 0).label("quantity"),
+        func.count(func.distinct(completed.c.ngo_id)).label("ngos"),
+        func.min(completed.c.created_at).label("first_at")
+    ).cte("totals")
+
+    ngo_totals = (
+        select(
+            completed.c.ngo_id,
+            func.count().label("donations"),
+            func.sum(completed.c.total_amount).label("amount")
+        )
+        .group_by(completed.c.ngo_id)
+        .order_by(func.sum(completed.c.total_amount).desc(), completed.c.ngo_id)
+        .limit(IMPACT_TOP_NGOS)
+        .cte("ngo_totals")
+    )
+    by_ngo = (
+        select(json_list(
+            ("ngo_id", ngo_totals.c.ngo_id),
+            ("ngo_name", NGO.name),
+            ("donations", ngo_totals.c.donations),
+            # Amounts travel as text so they come back as exact decimals
+            ("amount", cast(ngo_totals.c.amount, Text)),
+            order_by=(ngo_totals.c.amount.desc(), ngo_totals.c.ngo_id)
+        ))
+        .select_from(ngo_totals.outerjoin(NGO, NGO.id == text_uuid(ngo_totals.c.ngo_id)))
+        .scalar_subquery()
+    )
+
+    category_totals = (
+        select(
+            completed.c.category,
+            func.count().label("donations"),
+            func.sum(completed.c.quantity).label("quantity"),
+            func.sum(completed.c.total_amount).label("amount")
+        )
+        .group_by(completed.c.category)
+        .subquery("category_totals")
+    )
+    by_category = select(json_list(
+        ("category", category_totals.c.category),
+        ("donations", category_totals.c.donations),
+        ("quantity", category_totals.c.quantity),
+        ("amount", cast(category_totals.c.amount, Text)),
+        order_by=(category_totals.c.amount.desc(), category_totals.c.category)
+    )).scalar_subquery()
+
+    status_counts = (
+        select(deliveries.c.status, func.count().label("transactions"))
+        .group_by(deliveries.c.status)
+        .subquery("status_counts")
+    )
+    delivery_status = select(func.coalesce(
+        func.json_object_agg(status_counts.c.status, status_counts.c.transactions, type_=JSON),
+        literal_column("'{}'::json")
+    )).scalar_subquery()
+
+    # Latest delivery per donation; a donation normally has one transaction
+    latest_delivery = (
+        select(deliveries.c.donation_id, deliveries.c.status)
+        .distinct(deliveries.c.donation_id)
+        .order_by(deliveries.c.donation_id, deliveries.c.updated_at.desc())
+        .subquery("latest_delivery")
+    )
+    recent_rows = (
+        select(mine)
+        .order_by(mine.c.created_at.desc(), mine.c.id)
+        .limit(recent_limit)
+        .subquery("recent_rows")
+    )
+    recent = (
+        select(json_list(
+            ("donation_id", recent_rows.c.id),
+            ("ngo_id", recent_rows.c.ngo_id),
+            ("package_id", recent_rows.c.package_id),
+            ("package_title", recent_rows.c.package_title),
+            ("quantity", recent_rows.c.quantity),
+            ("total_amount", cast(recent_rows.c.total_amount, Text)),
+            ("payment_status", recent_rows.c.payment_status),
+            ("delivery_status", latest_delivery.c.status),
+            ("created_at", recent_rows.c.created_at),
+            order_by=(recent_rows.c.created_at.desc(), recent_rows.c.id)
+        ))
+        .select_from(recent_rows.outerjoin(latest_delivery, latest_delivery.c.donation_id == recent_rows.c.id))
+        .scalar_subquery()
+    )
+
+    stmt = select(
+        totals.c.donations, totals.c.amount, totals.c.quantity, totals.c.ngos, totals.c.first_at,
+        by_ngo.label("by_ngo"),
+        by_category.label("by_category"),
+        delivery_status.label("delivery_status"),
+        recent.label("recent")
+    )
+    row = (await db.execute(stmt)).one()
+
+    return DonorImpactResponse(
+        total_donations=row.donations,
+        total_amount=row.amount,
+        total_quantity=row.quantity,
+        ngos_supported=row.ngos,
+        first_donation_at=row.first_at,
+        by_ngo=row.by_ngo,
+        by_category=row.by_category,
+        delivery_status=row.delivery_status,
+        recent=row.recent
+    )
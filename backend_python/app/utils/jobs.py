@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import os
+import random
+import uuid
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select, update, delete, event, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.connection import AsyncSessionLocal, USE_MOCK_DATA
+from ..models.models import BackgroundJob
+from .health import health_registry
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+# Retry n waits roughly base * 2^(n-1) seconds
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+# Jobs left 'running' this long (e.g. the process died) are picked up again
+JOB_STALE_AFTER_SECONDS = float(os.getenv("JOB_STALE_AFTER_SECONDS", "300"))
+JOB_SHUTDOWN_GRACE_SECONDS = float(os.getenv("JOB_SHUTDOWN_GRACE_SECONDS", "10"))
+
+JobHandler = Callable[[AsyncSession, dict], Awaitable[None]]
+
+# Registered job handlers by task name
+job_handlers: Dict[str, JobHandler] = {}
+
+
+def job_task(name: str):
+    """Register an async handler(db, payload) for a task name."""
+    def decorator(handler: JobHandler) -> JobHandler:
+        job_handlers[name] = handler
+        return handler
+    return decorator
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    task: str,
+    payload: dict,
+    delay_seconds: float = 0,
+    max_attempts: Optional[int] = None
+) -> BackgroundJob:
+    """Add a job to the caller's session; it becomes visible when the caller commits.
+
+    Enqueueing in the same transaction as the work that triggered it means a
+    rolled-back request never leaves an orphaned job behind.
+    """
+    job = BackgroundJob(
+        id=uuid.uuid4(),
+        task=task,
+        payload=payload,
+        status='queued',
+        attempts=0,
+        max_attempts=max_attempts or JOB_MAX_ATTEMPTS,
+        run_after=func.now() + timedelta(seconds=delay_seconds)
+    )
+    db.add(job)
+
+    # Wake the runner once the job is committed and claimable
+    session = db.sync_session
+    if not session.info.get("wake_job_runner"):
+        session.info["wake_job_runner"] = True
+        event.listen(session, "after_commit", _wake_after_commit, once=True)
+    return job
+
+
+def _wake_after_commit(session):
+    session.info.pop("wake_job_runner", None)
+    job_runner.wake()
+
+
+class JobRunner:
+    """Polls the background_jobs table and runs claimed jobs with bounded concurrency."""
+
+    def __init__(self, concurrency: int = JOB_WORKER_CONCURRENCY):
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        self._active = set()
+        self._wake = asyncio.Event()
+
+    def wake(self):
+        # Lets a freshly enqueued job start without waiting for the next poll
+        self._wake.set()
+
+    def start(self):
+        if USE_MOCK_DATA or self._task:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Job runner started with concurrency {self.concurrency}")
+
+    async def stop(self, timeout: float = JOB_SHUTDOWN_GRACE_SECONDS):
+        """Stop claiming new jobs and give running ones a grace period to finish."""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._active:
+            logger.info(f"Waiting up to {timeout}s for {len(self._active)} running job(s)")
+            done, pending = await asyncio.wait(self._active, timeout=timeout)
+            # Interrupted jobs stay 'running' and are retried once they go stale
+            for job_task in pending:
+                job_task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            free = self.concurrency - len(self._active)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await self._claim(free)
+                except Exception as e:
+                    logger.error(f"Failed to claim background jobs: {e}")
+
+            for job in claimed:
+                job_task = asyncio.create_task(self._execute(job))
+                self._active.add(job_task)
+                job_task.add_done_callback(self._active.discard)
+
+            # Go straight back for more while the queue keeps filling free slots
+            if claimed and len(claimed) == free:
+                continue
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, limit: int) -> list:
+        """Atomically mark up to `limit` due jobs as running and return them."""
+        stale_before = func.now() - timedelta(seconds=JOB_STALE_AFTER_SECONDS)
+        due = (
+            select(BackgroundJob.id)
+            .where(or_(
+                (BackgroundJob.status == 'queued') & (BackgroundJob.run_after <= func.now()),
+                (BackgroundJob.status == 'running') & (BackgroundJob.locked_at < stale_before)
+            ))
+            .order_by(BackgroundJob.run_after)
+            .limit(limit)
+            # Other API processes skip jobs this one is claiming
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(BackgroundJob)
+            .where(BackgroundJob.id.in_(due))
+            .values(
+                status='running',
+                attempts=BackgroundJob.attempts + 1,
+                locked_at=func.now()
+            )
+            .returning(
+                BackgroundJob.id,
+                BackgroundJob.task,
+                BackgroundJob.payload,
+                BackgroundJob.attempts,
+                BackgroundJob.max_attempts
+            )
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(stmt)
+            jobs = result.all()
+            await db.commit()
+        return jobs
+
+    async def _execute(self, job):
+        handler = job_handlers.get(job.task)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for task '{job.task}'")
+            async with AsyncSessionLocal() as db:
+                await handler(db, job.payload)
+                await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._fail(job, e, retry=handler is not None)
+            return
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(BackgroundJob).where(BackgroundJob.id == job.id))
+            await db.commit()
+
+    async def _fail(self, job, error: Exception, retry: bool = True):
+        if retry and job.attempts < job.max_attempts:
+            delay = JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+            # Jitter keeps a burst of failures from retrying in lockstep
+            delay *= random.uniform(0.8, 1.2)
+            values = {
+                'status': 'queued',
+                'run_after': func.now() + timedelta(seconds=delay),
+                'locked_at': None,
+                'last_error': str(error)
+            }
+            logger.warning(
+                f"Job {job.task} ({job.id}) failed on attempt {job.attempts}, retrying in {delay:.0f}s: {error}"
+            )
+        else:
+            values = {
+                'status': 'dead',
+                'locked_at': None,
+                'last_error': str(error)
+            }
+            logger.error(f"Job {job.task} ({job.id}) moved to dead letter after {job.attempts} attempt(s): {error}")
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(BackgroundJob).where(BackgroundJob.id == job.id).values(**values))
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to record failure for job {job.id}: {e}")
+
+
+async def check_job_queue() -> dict:
+    """Report queue backlog and dead-lettered jobs."""
+    if USE_MOCK_DATA:
+        return {"mode": "mock"}
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(BackgroundJob.status, func.count()).group_by(BackgroundJob.status)
+        )
+        counts = dict(result.all())
+
+    return {
+        "queued": counts.get('queued', 0),
+        "running": counts.get('running', 0),
+        "dead": counts.get('dead', 0),
+        "workers_active": len(job_runner._active),
+    }
+
+
+# Global job runner instance
+job_runner = JobRunner()
+health_registry.register("jobs", check_job_queue, critical=False)
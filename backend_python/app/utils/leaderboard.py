@@ -0,0 +1,96 @@
+"""
+Package funding leaderboards.
+
+Both views read only the head of an index, so top-N costs the same
+however many packages and donations there are:
+
+- closest to goal: a partial expression index on packages by the share
+  of the target already donated (current_quantity is kept current as
+  donations complete);
+- most funded this week: package_weekly_funding, a rollup that the
+  donation routes update in the same transaction as the donation.
+"""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, func, literal_column, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.models import (
+    Package, PackageWeeklyFunding, PACKAGE_FUNDED_SHARE_SQL, PACKAGE_OPEN_GOAL_SQL
+)
+
+
+def week_start(at: Optional[datetime] = None) -> date:
+    """Monday (UTC) of the week containing `at`, or of the current week."""
+    day = (at or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+    return day - timedelta(days=day.weekday())
+
+
+async def record_funding(
+    db: AsyncSession,
+    package_id: uuid.UUID,
+    amount: Decimal,
+    quantity: int,
+    donations: int = 1,
+    at: Optional[datetime] = None
+):
+    """Add a completed donation to its package's weekly total; negative values reverse one.
+
+    The caller commits, together with the donation itself.
+    """
+    stmt = insert(PackageWeeklyFunding).values(
+        week_start=week_start(at),
+        package_id=package_id,
+        amount=amount,
+        quantity=quantity,
+        donations=donations
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PackageWeeklyFunding.week_start, PackageWeeklyFunding.package_id],
+        set_={
+            "amount": PackageWeeklyFunding.amount + stmt.excluded.amount,
+            "quantity": PackageWeeklyFunding.quantity + stmt.excluded.quantity,
+            "donations": PackageWeeklyFunding.donations + stmt.excluded.donations,
+            "updated_at": func.now(),
+        }
+    )
+    await db.execute(stmt)
+
+
+async def closest_to_goal(db: AsyncSession, limit: int) -> List[Tuple[Package, float]]:
+    """Active packages nearest their target, with the share already donated."""
+    # Same expression and predicate as ix_packages_closest_to_goal, so Postgres reads the index in order
+    funded_share = literal_column(PACKAGE_FUNDED_SHARE_SQL)
+    stmt = (
+        select(Package, funded_share.label("funded_share"))
+        .where(text(PACKAGE_OPEN_GOAL_SQL))
+        .order_by(funded_share.desc(), Package.id)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [(package, float(share)) for package, share in result.all()]
+
+
+async def most_funded_this_week(
+    db: AsyncSession,
+    limit: int,
+    at: Optional[datetime] = None
+) -> List[Tuple[Package, PackageWeeklyFunding]]:
+    """Packages with the most completed donation value this week."""
+    stmt = (
+        select(Package, PackageWeeklyFunding)
+        .join(Package, Package.id == PackageWeeklyFunding.package_id)
+        .where(
+            PackageWeeklyFunding.week_start == week_start(at),
+            PackageWeeklyFunding.amount > 0
+        )
+        .order_by(PackageWeeklyFunding.amount.desc(), PackageWeeklyFunding.package_id)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return result.all()
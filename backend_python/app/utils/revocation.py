@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.connection import AsyncSessionLocal, USE_MOCK_DATA
+from ..models.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# How quickly a logout on one worker reaches the others
+REVOCATION_SYNC_INTERVAL_SECONDS = float(os.getenv("REVOCATION_SYNC_INTERVAL_SECONDS", "5"))
+REVOCATION_PURGE_INTERVAL_SECONDS = float(os.getenv("REVOCATION_PURGE_INTERVAL_SECONDS", "3600"))
+# Re-read this far behind the newest revocation seen, for transactions that commit out of order
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class RevocationList:
+    """Revoked access-token ids mirrored in memory, each kept until the token expires.
+
+    Checked on every authenticated request, so it is a plain dict lookup.
+    Refresh tokens are not mirrored: they are only ever accepted by
+    consuming them in the database.
+    """
+
+    def __init__(self):
+        self._expires_at: Dict[str, float] = {}
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+    def add(self, jti: str, expires_at: float):
+        if expires_at > time.time():
+            self._expires_at[jti] = expires_at
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._expires_at
+
+    async def sync(self, db: AsyncSession):
+        """Load access-token revocations recorded since the last sync."""
+        stmt = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+            RevokedToken.token_type == 'access',
+            RevokedToken.expires_at > func.now()
+        )
+        if self._watermark is not None:
+            stmt = stmt.where(RevokedToken.revoked_at > self._watermark - REVOCATION_SYNC_OVERLAP)
+        result = await db.execute(stmt)
+
+        for jti, expires_at, revoked_at in result.all():
+            self.add(str(jti), expires_at.timestamp())
+            if self._watermark is None or revoked_at > self._watermark:
+                self._watermark = revoked_at
+
+        # Expired tokens fail verification anyway, so their entries can go
+        now = time.time()
+        self._expires_at = {jti: expires_at for jti, expires_at in self._expires_at.items() if expires_at > now}
+
+    def start(self):
+        if USE_MOCK_DATA or self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        last_purge = time.monotonic()
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.sync(db)
+                    if time.monotonic() - last_purge >= REVOCATION_PURGE_INTERVAL_SECONDS:
+                        await purge_expired_revocations(db)
+                        await db.commit()
+                        last_purge = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token revocation sync failed: {e}")
+            await asyncio.sleep(REVOCATION_SYNC_INTERVAL_SECONDS)
+
+
+async def revoke_token(
+    db: AsyncSession,
+    jti: str,
+    token_type: str,
+    expires_at: float,
+    user_id: Optional[str] = None
+) -> bool:
+    """Record a revocation in the caller's transaction; False if it was already revoked."""
+    stmt = (
+        insert(RevokedToken)
+        .values(
+            jti=uuid.UUID(jti),
+            user_id=uuid.UUID(user_id) if user_id else None,
+            token_type=token_type,
+            expires_at=datetime.fromtimestamp(expires_at, tz=timezone.utc)
+        )
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        .returning(RevokedToken.jti)
+    )
+    result = await db.execute(stmt)
+    if token_type == 'access':
+        # This worker stops accepting the token right away; others catch up on their next sync
+        revocation_list.add(jti, expires_at)
+    return result.scalar_one_or_none() is not None
+
+
+async def purge_expired_revocations(db: AsyncSession) -> int:
+    """Delete revocations of tokens that have expired on their own."""
+    result = await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= func.now()))
+    return result.rowcount
+
+
+# Global revocation list instance
+revocation_list = RevocationList()
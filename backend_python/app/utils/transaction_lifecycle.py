@@ -0,0 +1,185 @@
+import logging
+import uuid
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select, update, insert, case, literal, func, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.models import Transaction, TransactionEvent
+from ..schemas.schemas import TransactionStatus
+
+logger = logging.getLogger(__name__)
+
+# Statuses a transaction may move to from each status
+ALLOWED_TRANSITIONS = {
+    TransactionStatus.PENDING_ADMIN_ASSIGNMENT: {
+        TransactionStatus.ASSIGNED_TO_VENDOR,
+        TransactionStatus.CANCELLED,
+    },
+    TransactionStatus.ASSIGNED_TO_VENDOR: {
+        TransactionStatus.PENDING_ADMIN_ASSIGNMENT,
+        TransactionStatus.VENDOR_PROCESSING,
+        TransactionStatus.SHIPPED,
+        TransactionStatus.CANCELLED,
+        TransactionStatus.ISSUE_REPORTED,
+    },
+    TransactionStatus.VENDOR_PROCESSING: {
+        TransactionStatus.SHIPPED,
+        TransactionStatus.CANCELLED,
+        TransactionStatus.ISSUE_REPORTED,
+    },
+    TransactionStatus.SHIPPED: {
+        TransactionStatus.DELIVERED,
+        TransactionStatus.ISSUE_REPORTED,
+    },
+    TransactionStatus.DELIVERED: {
+        TransactionStatus.COMPLETED,
+        TransactionStatus.ISSUE_REPORTED,
+    },
+    TransactionStatus.ISSUE_REPORTED: {
+        TransactionStatus.PENDING_ADMIN_ASSIGNMENT,
+        TransactionStatus.ASSIGNED_TO_VENDOR,
+        TransactionStatus.VENDOR_PROCESSING,
+        TransactionStatus.SHIPPED,
+        TransactionStatus.DELIVERED,
+        TransactionStatus.CANCELLED,
+    },
+    TransactionStatus.COMPLETED: set(),
+    TransactionStatus.CANCELLED: set(),
+}
+
+# Timestamp column stamped when a transaction enters a status
+STATUS_TIMESTAMPS = {
+    TransactionStatus.ASSIGNED_TO_VENDOR: "assigned_at",
+    TransactionStatus.SHIPPED: "shipped_at",
+    TransactionStatus.DELIVERED: "delivered_at",
+    TransactionStatus.COMPLETED: "completed_at",
+}
+
+
+class InvalidTransitionError(Exception):
+    """Raised when a transaction cannot move from its current status to the requested one."""
+
+    def __init__(self, from_status: str, to_status: str):
+        self.from_status = TransactionStatus(from_status).value
+        self.to_status = TransactionStatus(to_status).value
+        super().__init__(f"Cannot change order status from '{self.from_status}' to '{self.to_status}'")
+
+
+def can_transition(from_status: str, to_status: str) -> bool:
+    """Check whether a move is allowed; staying in the same status always is."""
+    from_status = TransactionStatus(from_status)
+    to_status = TransactionStatus(to_status)
+    return from_status == to_status or to_status in ALLOWED_TRANSITIONS[from_status]
+
+
+def validate_transition(from_status: str, to_status: str):
+    if not can_transition(from_status, to_status):
+        raise InvalidTransitionError(from_status, to_status)
+
+
+async def bulk_transition(
+    db: AsyncSession,
+    transaction_ids: Iterable[uuid.UUID],
+    to_status: str,
+    actor_user_id: Optional[uuid.UUID] = None,
+    vendor_id: Optional[uuid.UUID] = None,
+    notes: Optional[str] = None,
+    values: Optional[dict] = None,
+) -> Dict[uuid.UUID, str]:
+    """Move many transactions to one status in a single statement.
+
+    Rows whose current status does not allow the move (or that don't belong
+    to vendor_id, when given) are left untouched. `values` holds extra column
+    values or SQL expressions, e.g. a CASE of per-row tracking numbers.
+    Returns {transaction_id: previous_status} for the rows that were updated.
+    The caller owns the surrounding transaction and commits.
+    """
+    # Rejects unknown statuses before any SQL is built
+    target = TransactionStatus(to_status)
+    to_status = target.value
+    allowed_from = [to_status] + [
+        from_status.value
+        for from_status, allowed in ALLOWED_TRANSITIONS.items()
+        if target in allowed
+    ]
+
+    targets = select(Transaction.id, Transaction.status.label("old_status")).where(
+        Transaction.id.in_(list(transaction_ids)),
+        Transaction.status.in_(allowed_from)
+    )
+    if vendor_id:
+        targets = targets.where(Transaction.vendor_id == vendor_id)
+    # Row locks make the old status we record the one we actually replaced
+    targets = targets.with_for_update().cte("targets")
+
+    update_values = dict(values or {})
+    update_values["status"] = to_status
+    update_values["updated_at"] = func.now()
+    if target in STATUS_TIMESTAMPS:
+        # Only stamp on entry; SET expressions see the row's old status
+        column = getattr(Transaction, STATUS_TIMESTAMPS[target])
+        update_values[STATUS_TIMESTAMPS[target]] = case(
+            (Transaction.status != to_status, func.now()),
+            else_=column
+        )
+
+    updated = (
+        update(Transaction)
+        .where(Transaction.id == targets.c.id)
+        .values(**update_values)
+        .returning(Transaction.id, targets.c.old_status)
+        .cte("updated")
+    )
+
+    # Same-status updates (e.g. a new tracking number) don't add history
+    events = (
+        insert(TransactionEvent)
+        .from_select(
+            ["id", "transaction_id", "from_status", "to_status", "actor_user_id", "notes"],
+            select(
+                func.gen_random_uuid(),
+                updated.c.id,
+                updated.c.old_status,
+                literal(to_status, Text),
+                literal(actor_user_id, UUID(as_uuid=True)),
+                literal(notes, Text),
+            ).where(updated.c.old_status != to_status)
+        )
+        .cte("events")
+    )
+
+    stmt = select(updated.c.id, updated.c.old_status).add_cte(events)
+    result = await db.execute(stmt)
+    transitioned = {row.id: row.old_status for row in result}
+
+    logger.info(f"Moved {len(transitioned)} transaction(s) to '{to_status}'")
+    return transitioned
+
+
+async def transition(
+    db: AsyncSession,
+    transaction: Transaction,
+    to_status: str,
+    actor_user_id: Optional[uuid.UUID] = None,
+    notes: Optional[str] = None,
+    values: Optional[dict] = None,
+) -> str:
+    """Move a single loaded transaction to a new status and return its previous status."""
+    validate_transition(transaction.status, to_status)
+
+    transitioned = await bulk_transition(
+        db,
+        [transaction.id],
+        to_status,
+        actor_user_id=actor_user_id,
+        notes=notes,
+        values=values,
+    )
+    # The status changed underneath us since the row was loaded
+    if transaction.id not in transitioned:
+        await db.refresh(transaction, ["status"])
+        raise InvalidTransitionError(transaction.status, to_status)
+
+    return transitioned[transaction.id]
@@ -0,0 +1,302 @@
+import asyncio
+import heapq
+import logging
+import math
+import os
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, case, literal, exists, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.connection import AsyncSessionLocal, USE_MOCK_DATA
+from ..models.models import Transaction, Vendor, NGO, DonationPackage, PinCode, CityLocation
+from ..schemas.schemas import TransactionStatus
+from .geo import haversine_km, place_key, KM_PER_DEGREE
+from .transaction_lifecycle import bulk_transition
+
+logger = logging.getLogger(__name__)
+
+VENDOR_AUTO_ASSIGN_ENABLED = os.getenv("VENDOR_AUTO_ASSIGN_ENABLED", "false").lower() == "true"
+VENDOR_AUTO_ASSIGN_INTERVAL_SECONDS = float(os.getenv("VENDOR_AUTO_ASSIGN_INTERVAL_SECONDS", "30"))
+VENDOR_AUTO_ASSIGN_BATCH_SIZE = int(os.getenv("VENDOR_AUTO_ASSIGN_BATCH_SIZE", "1000"))
+# Vendors at or above this many open orders are skipped; 0 means no cap
+VENDOR_AUTO_ASSIGN_MAX_OPEN_ORDERS = int(os.getenv("VENDOR_AUTO_ASSIGN_MAX_OPEN_ORDERS", "0"))
+# With no vendor in the NGO's city, look this far for one before falling back to the state; 0 disables
+VENDOR_AUTO_ASSIGN_RADIUS_KM = float(os.getenv("VENDOR_AUTO_ASSIGN_RADIUS_KM", "50"))
+
+# Orders a vendor is still working on
+OPEN_STATUSES = [
+    TransactionStatus.ASSIGNED_TO_VENDOR.value,
+    TransactionStatus.VENDOR_PROCESSING.value,
+    TransactionStatus.SHIPPED.value,
+]
+
+
+def _region(*parts: Optional[str]) -> Tuple[str, ...]:
+    return tuple((part or "").strip().lower() for part in parts)
+
+
+class VendorPool:
+    """Verified vendors indexed by city, location and state, handing out the least-loaded one.
+
+    Each region keeps a min-heap of (open_orders, vendor_id). Loads only grow
+    while a batch is planned, so stale heap entries are refreshed lazily when
+    they reach the top; ties go to the lowest vendor id, which spreads a batch
+    round-robin across equally loaded vendors. Located vendors are also
+    bucketed into a grid of radius-sized cells, so a radius lookup only
+    measures distances to vendors in the neighbouring cells.
+    """
+
+    def __init__(self, vendors: List[tuple], max_open_orders: int = 0, radius_km: float = 0):
+        self.max_open_orders = max_open_orders
+        self.radius_km = radius_km
+        self.load: Dict[uuid.UUID, int] = {}
+        self.by_city: Dict[tuple, list] = {}
+        self.by_state: Dict[tuple, list] = {}
+        self.by_cell: Dict[Tuple[int, int], list] = {}
+        self._cell_degrees = radius_km / KM_PER_DEGREE if radius_km else 0
+
+        for vendor_id, city, state, open_orders, latitude, longitude in vendors:
+            self.load[vendor_id] = open_orders
+            self.by_city.setdefault(_region(city, state), []).append((open_orders, vendor_id))
+            self.by_state.setdefault(_region(state), []).append((open_orders, vendor_id))
+            if self._cell_degrees and latitude is not None:
+                self.by_cell.setdefault(self._cell(latitude, longitude), []).append(
+                    (vendor_id, latitude, longitude)
+                )
+
+        for heap in list(self.by_city.values()) + list(self.by_state.values()):
+            heapq.heapify(heap)
+
+    def has_capacity(self, vendor_id: uuid.UUID) -> bool:
+        return not self.max_open_orders or self.load[vendor_id] < self.max_open_orders
+
+    def _least_loaded(self, heap: Optional[list]) -> Optional[uuid.UUID]:
+        while heap:
+            load, vendor_id = heap[0]
+            if load != self.load[vendor_id]:
+                heapq.heapreplace(heap, (self.load[vendor_id], vendor_id))
+                continue
+            # The least-loaded vendor is full, so the whole region is
+            return vendor_id if self.has_capacity(vendor_id) else None
+        return None
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self._cell_degrees), math.floor(longitude / self._cell_degrees)
+
+    def _least_loaded_nearby(self, latitude: float, longitude: float) -> Optional[uuid.UUID]:
+        """Least-loaded vendor with capacity within radius_km, nearest on ties."""
+        row, col = self._cell(latitude, longitude)
+        # A degree of longitude shrinks with latitude, so the radius can span more columns
+        col_span = math.ceil(1 / max(math.cos(math.radians(latitude)), 0.01))
+        best = None
+        for cell_row in range(row - 1, row + 2):
+            for cell_col in range(col - col_span, col + col_span + 1):
+                for vendor_id, vendor_latitude, vendor_longitude in self.by_cell.get((cell_row, cell_col), ()):
+                    if not self.has_capacity(vendor_id):
+                        continue
+                    distance = haversine_km(latitude, longitude, vendor_latitude, vendor_longitude)
+                    if distance <= self.radius_km:
+                        candidate = (self.load[vendor_id], distance, vendor_id)
+                        if best is None or candidate < best:
+                            best = candidate
+        return best[2] if best else None
+
+    def pick(self, city: Optional[str], state: Optional[str],
+             preferred_vendor_id: Optional[uuid.UUID] = None,
+             position: Optional[Tuple[float, float]] = None) -> Tuple[Optional[uuid.UUID], Optional[str]]:
+        """Choose a vendor for one order and count it against their load."""
+        if preferred_vendor_id in self.load and self.has_capacity(preferred_vendor_id):
+            vendor_id, reason = preferred_vendor_id, "package_vendor"
+        else:
+            vendor_id, reason = self._least_loaded(self.by_city.get(_region(city, state))), "city"
+            if vendor_id is None and position and self.by_cell:
+                vendor_id, reason = self._least_loaded_nearby(*position), "nearby"
+            if vendor_id is None:
+                vendor_id, reason = self._least_loaded(self.by_state.get(_region(state))), "state"
+
+        if vendor_id is None:
+            return None, None
+        self.load[vendor_id] += 1
+        return vendor_id, reason
+
+
+async def load_vendor_pool(db: AsyncSession) -> VendorPool:
+    """Load verified vendors with their open-order counts and city locations in one query."""
+    open_orders = (
+        select(Transaction.vendor_id, func.count().label("open_orders"))
+        .where(Transaction.status.in_(OPEN_STATUSES))
+        .group_by(Transaction.vendor_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Vendor.id,
+            Vendor.city,
+            Vendor.state,
+            func.coalesce(open_orders.c.open_orders, 0),
+            CityLocation.latitude,
+            CityLocation.longitude
+        )
+        .outerjoin(open_orders, open_orders.c.vendor_id == Vendor.id)
+        .outerjoin(CityLocation, and_(
+            CityLocation.city == place_key(Vendor.city),
+            CityLocation.state == place_key(Vendor.state)
+        ))
+        .where(Vendor.verified.is_(True))
+    )
+    result = await db.execute(stmt)
+    return VendorPool(result.all(), VENDOR_AUTO_ASSIGN_MAX_OPEN_ORDERS, VENDOR_AUTO_ASSIGN_RADIUS_KM)
+
+
+async def assign_pending_transactions(
+    db: AsyncSession,
+    limit: int = VENDOR_AUTO_ASSIGN_BATCH_SIZE,
+    dry_run: bool = False
+) -> dict:
+    """Match one batch of pending transactions to vendors.
+
+    Prefers the vendor pinned on the donation package, then the least-loaded
+    verified vendor in the NGO's city, then within VENDOR_AUTO_ASSIGN_RADIUS_KM
+    of the NGO's pin code (or city), then in its state. Orders with no
+    eligible vendor stay pending for an admin. Unless dry_run is set, the
+    whole batch is assigned with a single bulk transition; the caller commits.
+    """
+    stmt = (
+        select(
+            Transaction.id,
+            NGO.city,
+            NGO.state,
+            DonationPackage.assigned_vendor_id,
+            func.coalesce(PinCode.latitude, CityLocation.latitude),
+            func.coalesce(PinCode.longitude, CityLocation.longitude)
+        )
+        .join(NGO, NGO.id == Transaction.ngo_id)
+        .outerjoin(DonationPackage, DonationPackage.id == Transaction.package_id)
+        .outerjoin(PinCode, PinCode.pin_code == NGO.pin_code)
+        .outerjoin(CityLocation, and_(
+            CityLocation.city == place_key(NGO.city),
+            CityLocation.state == place_key(NGO.state)
+        ))
+        .where(
+            Transaction.status == TransactionStatus.PENDING_ADMIN_ASSIGNMENT.value,
+            # Orders no vendor could take would otherwise fill every batch
+            or_(
+                DonationPackage.assigned_vendor_id.isnot(None),
+                exists().where(
+                    Vendor.verified.is_(True),
+                    place_key(Vendor.state) == place_key(NGO.state)
+                )
+            )
+        )
+        .order_by(Transaction.created_at)
+        .limit(limit)
+    )
+    if not dry_run:
+        # Concurrent schedulers take disjoint batches instead of blocking
+        stmt = stmt.with_for_update(of=Transaction, skip_locked=True)
+    result = await db.execute(stmt)
+    pending = result.all()
+
+    pool = await load_vendor_pool(db)
+
+    assignments = []
+    for transaction_id, city, state, preferred_vendor_id, latitude, longitude in pending:
+        position = (latitude, longitude) if latitude is not None else None
+        vendor_id, reason = pool.pick(city, state, preferred_vendor_id, position)
+        if vendor_id:
+            assignments.append({
+                "transaction_id": transaction_id,
+                "vendor_id": vendor_id,
+                "reason": reason
+            })
+
+    if assignments and not dry_run:
+        vendor_by_transaction = {
+            assignment["transaction_id"]: assignment["vendor_id"]
+            for assignment in assignments
+        }
+        transitioned = await bulk_transition(
+            db,
+            list(vendor_by_transaction),
+            TransactionStatus.ASSIGNED_TO_VENDOR,
+            notes="Auto-assigned",
+            values={
+                "vendor_id": case(
+                    {
+                        transaction_id: literal(vendor_id, Transaction.vendor_id.type)
+                        for transaction_id, vendor_id in vendor_by_transaction.items()
+                    },
+                    value=Transaction.id
+                )
+            }
+        )
+        assignments = [
+            assignment for assignment in assignments
+            if assignment["transaction_id"] in transitioned
+        ]
+
+    return {
+        "dry_run": dry_run,
+        "pending": len(pending),
+        "assigned": len(assignments),
+        "unassigned": len(pending) - len(assignments),
+        "assignments": [
+            {
+                "transaction_id": str(assignment["transaction_id"]),
+                "vendor_id": str(assignment["vendor_id"]),
+                "reason": assignment["reason"]
+            }
+            for assignment in assignments
+        ]
+    }
+
+
+class VendorAssignmentScheduler:
+    """Background loop that assigns pending transactions batch by batch."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if not VENDOR_AUTO_ASSIGN_ENABLED or USE_MOCK_DATA or self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Vendor auto-assignment started (batch {VENDOR_AUTO_ASSIGN_BATCH_SIZE}, "
+            f"every {VENDOR_AUTO_ASSIGN_INTERVAL_SECONDS}s)"
+        )
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await assign_pending_transactions(db)
+                    await db.commit()
+                if result["assigned"]:
+                    logger.info(
+                        f"Auto-assigned {result['assigned']} of {result['pending']} pending transactions"
+                    )
+                # A full batch means there is more backlog, so go again right away
+                if result["pending"] >= VENDOR_AUTO_ASSIGN_BATCH_SIZE and result["assigned"]:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Vendor auto-assignment failed: {e}")
+            await asyncio.sleep(VENDOR_AUTO_ASSIGN_INTERVAL_SECONDS)
+
+
+# Global scheduler instance
+vendor_assignment_scheduler = VendorAssignmentScheduler()
@@ -0,0 +1,44 @@
+"""Microbenchmarks for JWT issue/verify on every authenticated request."""
+
+import uuid
+from datetime import timedelta
+
+from app.middleware.auth import create_access_token, verify_token
+from app.utils.cache import claims_cache
+
+CLAIMS = {
+    "sub": str(uuid.uuid4()),
+    "email": "bench-user@example.org",
+    "role": "user",
+}
+
+
+def bench_create_access_token(benchmark):
+    token = benchmark(create_access_token, CLAIMS, timedelta(minutes=30))
+    assert token.count(".") == 2
+
+
+def bench_verify_token(benchmark):
+    # Repeat verifications of one token are served from the claims cache
+    token = create_access_token(CLAIMS, timedelta(minutes=30))
+    token_data = benchmark(verify_token, token)
+    assert str(token_data.user_id) == CLAIMS["sub"]
+
+
+def bench_verify_token_uncached(benchmark):
+    token = create_access_token(CLAIMS, timedelta(minutes=30))
+
+    def verify_cold():
+        claims_cache.invalidate()
+        return verify_token(token)
+
+    token_data = benchmark(verify_cold)
+    assert str(token_data.user_id) == CLAIMS["sub"]
+
+
+def bench_token_round_trip(benchmark):
+    def round_trip():
+        return verify_token(create_access_token(CLAIMS, timedelta(minutes=30)))
+
+    token_data = benchmark(round_trip)
+    assert token_data.email == CLAIMS["email"]
@@ -0,0 +1,38 @@
+"""Microbenchmarks for email template rendering."""
+
+from app.utils.email_service import EmailService
+
+BODY = """
+<h2>New Invoice Submission</h2>
+<p>A vendor has submitted an invoice for review and approval.</p>
+<ul>
+    <li><strong>Vendor:</strong> Bench Supplies</li>
+    <li><strong>Invoice Number:</strong> INV-000001</li>
+    <li><strong>Amount:</strong> ₹12,500.00</li>
+</ul>
+<p>Please log in to the admin dashboard to review and process this invoice.</p>
+"""
+
+
+def _service():
+    service = EmailService()
+    service.admin_email = "admin@example.org"
+    service.smtp_username = "noreply@example.org"
+    return service
+
+
+def bench_create_email_template(benchmark):
+    service = _service()
+    msg = benchmark(service._create_email_template, "Invoice submitted", BODY, "admin@example.org")
+    assert msg["To"] == "admin@example.org"
+
+
+def bench_render_email_message(benchmark):
+    # Includes MIME encoding, which is what smtplib.send_message pays for
+    service = _service()
+
+    def render():
+        return service._create_email_template("Invoice submitted", BODY, "admin@example.org").as_string()
+
+    rendered = benchmark(render)
+    assert "Invoice submitted" in rendered
@@ -0,0 +1,102 @@
+"""Password hashing cost against the login latency budget.
+
+Each configuration records wall time and CPU time per verify (what a
+login pays) in extra_info, and whether it fits LOGIN_HASH_BUDGET_MS. Use
+it to pick BCRYPT_ROUNDS / ARGON2_MEMORY_COST for the hardware the API
+runs on; only the configured context fails the run when over budget.
+"""
+
+import importlib.util
+import os
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from app.middleware.auth import get_pwd_context
+
+# Hashing share of a login; the rest goes to the database and token issue
+LOGIN_HASH_BUDGET_MS = float(os.getenv("LOGIN_HASH_BUDGET_MS", "500"))
+PASSWORD = "correct horse battery staple"
+
+BCRYPT_ROUNDS = [10, 11, 12, 13]
+# (memory cost in KiB, time cost)
+ARGON2_COSTS = [(19456, 2), (47104, 1), (65536, 3)]
+
+requires_argon2 = pytest.mark.skipif(
+    importlib.util.find_spec("argon2") is None, reason="argon2-cffi is not installed"
+)
+
+
+def bcrypt_context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+
+
+def argon2_context(memory_cost: int, time_cost: int) -> CryptContext:
+    return CryptContext(
+        schemes=["argon2"],
+        argon2__type="ID",
+        argon2__memory_cost=memory_cost,
+        argon2__rounds=time_cost,
+        argon2__parallelism=1,
+    )
+
+
+def run_verify(benchmark, context: CryptContext) -> float:
+    hashed = context.hash(PASSWORD)
+    cpu_times = []
+
+    def verify():
+        start = time.process_time()
+        valid = context.verify(PASSWORD, hashed)
+        cpu_times.append(time.process_time() - start)
+        return valid
+
+    assert benchmark.pedantic(verify, rounds=5, iterations=1, warmup_rounds=1)
+
+    if benchmark.stats:
+        mean_ms = benchmark.stats.stats.mean * 1000
+    else:
+        # --benchmark-disable runs verify once and keeps no stats
+        mean_ms = sum(cpu_times) / len(cpu_times) * 1000
+    cpu_ms = sum(cpu_times) / len(cpu_times) * 1000
+    benchmark.extra_info.update({
+        "verify_ms": round(mean_ms, 1),
+        "cpu_ms": round(cpu_ms, 1),
+        # Logins per second one core can sustain at this cost
+        "logins_per_core_second": round(1000 / cpu_ms, 1) if cpu_ms else None,
+        "within_budget": mean_ms <= LOGIN_HASH_BUDGET_MS,
+    })
+    return mean_ms
+
+
+@pytest.mark.parametrize("rounds", BCRYPT_ROUNDS)
+def bench_bcrypt_verify(benchmark, rounds):
+    run_verify(benchmark, bcrypt_context(rounds))
+
+
+@requires_argon2
+@pytest.mark.parametrize("memory_cost,time_cost", ARGON2_COSTS)
+def bench_argon2_verify(benchmark, memory_cost, time_cost):
+    run_verify(benchmark, argon2_context(memory_cost, time_cost))
+
+
+def bench_configured_verify(benchmark):
+    # The scheme and cost the app hashes with (PASSWORD_HASH_SCHEME, BCRYPT_ROUNDS, ARGON2_*)
+    context = get_pwd_context()
+    benchmark.extra_info["scheme"] = context.default_scheme()
+    mean_ms = run_verify(benchmark, context)
+    assert mean_ms <= LOGIN_HASH_BUDGET_MS, (
+        f"verify takes {mean_ms:.0f}ms, over the {LOGIN_HASH_BUDGET_MS:.0f}ms login budget"
+    )
+
+
+def bench_rehash_on_login(benchmark):
+    # Worst-case login: verify an old cost-10 hash, then hash again at the target cost
+    old_hash = bcrypt_context(10).hash(PASSWORD)
+    context = bcrypt_context(12)
+
+    valid, new_hash = benchmark.pedantic(
+        context.verify_and_update, args=(PASSWORD, old_hash), rounds=3, iterations=1
+    )
+    assert valid and new_hash.startswith("$2b$12$")
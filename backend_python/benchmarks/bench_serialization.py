@@ -0,0 +1,65 @@
+"""Microbenchmarks for building and serializing 1000-item response lists."""
+
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.schemas import NGOResponse, TransactionResponse
+
+NGO_FIELDS = list(NGOResponse.model_fields)
+TRANSACTION_FIELDS = list(TransactionResponse.model_fields)
+
+ngo_list_adapter = TypeAdapter(List[NGOResponse])
+transaction_list_adapter = TypeAdapter(List[TransactionResponse])
+
+
+def _build_ngos(rows):
+    # Mirrors the explicit keyword construction used in routes/ngos.py
+    return [NGOResponse(**{field: getattr(row, field) for field in NGO_FIELDS}) for row in rows]
+
+
+def _build_transactions(rows):
+    return [
+        TransactionResponse(**{field: getattr(row, field) for field in TRANSACTION_FIELDS})
+        for row in rows
+    ]
+
+
+def bench_ngo_response_construct(benchmark, ngo_rows):
+    result = benchmark(_build_ngos, ngo_rows)
+    assert len(result) == len(ngo_rows)
+
+
+def bench_ngo_response_from_attributes(benchmark, ngo_rows):
+    result = benchmark(lambda: [NGOResponse.model_validate(row) for row in ngo_rows])
+    assert len(result) == len(ngo_rows)
+
+
+def bench_ngo_response_jsonable_encoder(benchmark, ngo_rows):
+    # FastAPI falls back to jsonable_encoder when serializing response models
+    models = _build_ngos(ngo_rows)
+    result = benchmark(jsonable_encoder, models)
+    assert len(result) == len(ngo_rows)
+
+
+def bench_ngo_response_dump_json(benchmark, ngo_rows):
+    models = _build_ngos(ngo_rows)
+    payload = benchmark(ngo_list_adapter.dump_json, models)
+    assert payload.startswith(b"[")
+
+
+def bench_transaction_response_construct(benchmark, transaction_rows):
+    result = benchmark(_build_transactions, transaction_rows)
+    assert len(result) == len(transaction_rows)
+
+
+def bench_transaction_response_from_attributes(benchmark, transaction_rows):
+    result = benchmark(lambda: [TransactionResponse.model_validate(row) for row in transaction_rows])
+    assert len(result) == len(transaction_rows)
+
+
+def bench_transaction_response_dump_json(benchmark, transaction_rows):
+    models = _build_transactions(transaction_rows)
+    payload = benchmark(transaction_list_adapter.dump_json, models)
+    assert payload.startswith(b"[")
@@ -0,0 +1,81 @@
+"""Cold-start benchmarks: importing app.main and running the lifespan in a fresh interpreter."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that must only load on first use, not when a worker boots
+DEFERRED_MODULES = [
+    "asyncpg",
+    "jose.jwt",
+    "passlib.context",
+    "cryptography",
+    "smtplib",
+    "email.mime.multipart",
+]
+
+# Whole-import budget for `import app.main`; override per machine
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "2500"))
+
+BOOT_SCRIPT = """
+import asyncio
+from app.main import app, lifespan
+
+async def boot():
+    async with lifespan(app):
+        pass
+
+asyncio.run(boot())
+"""
+
+
+def _run(*args):
+    env = {**os.environ, "USE_MOCK_DATA": "true", "PYTHONDONTWRITEBYTECODE": "1"}
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _parse_importtime(stderr):
+    """Map module name to cumulative import time in microseconds."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def bench_import_app_main(benchmark):
+    benchmark.pedantic(_run, args=("-c", "import app.main"), rounds=5, iterations=1)
+
+
+def bench_boot_lifespan(benchmark):
+    benchmark.pedantic(_run, args=("-c", BOOT_SCRIPT), rounds=5, iterations=1)
+
+
+def bench_import_budget(benchmark):
+    result = benchmark.pedantic(
+        _run,
+        args=("-X", "importtime", "-c", "import app.main"),
+        rounds=3,
+        iterations=1,
+    )
+    cumulative = _parse_importtime(result.stderr)
+
+    loaded = [name for name in DEFERRED_MODULES if name in cumulative]
+    assert not loaded, f"Imported eagerly by app.main: {loaded}"
+
+    total_ms = cumulative["app.main"] / 1000
+    assert total_ms <= IMPORT_BUDGET_MS, (
+        f"import app.main took {total_ms:.0f}ms, budget is {IMPORT_BUDGET_MS:.0f}ms"
+    )
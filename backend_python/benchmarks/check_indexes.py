@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Check that the hot route queries are served by their indexes.
+
+Each check EXPLAINs a query shaped like the one a route runs and fails
+unless the plan uses the expected index. Sequential scans are disabled
+by default so the check also holds on small or empty databases, where
+the planner would rightly prefer to scan; pass --planner-costs on a
+large seed to see what the planner picks on its own.
+
+Usage:
+    python -m benchmarks.check_indexes
+    python -m benchmarks.check_indexes --planner-costs
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.models import Profile, NGO, Vendor, Package, Donation, Transaction, Ticket, VendorInvoice
+from benchmarks.seed import DEFAULT_DATABASE_URL
+
+# Any id will do: EXPLAIN never runs the query
+SAMPLE_ID = uuid.uuid4()
+PAGE = 100
+
+# (description, expected index, query)
+CHECKS = [
+    ("login by email", "ix_profiles_email_lower",
+     select(Profile).where(func.lower(Profile.email) == func.lower("Bench-User-0@bench.dogoodhub.com"))),
+    ("current user's NGO", "ix_ngos_user_id",
+     select(NGO.id).where(NGO.user_id == SAMPLE_ID)),
+    ("current user's vendor", "ix_vendors_user_id",
+     select(Vendor).where(Vendor.user_id == SAMPLE_ID)),
+    ("NGO packages", "ix_packages_ngo_id",
+     select(Package).where(Package.ngo_id == SAMPLE_ID)),
+    ("donor's donations, newest first", "ix_donations_user_id_created_at",
+     select(Donation).where(Donation.user_id == SAMPLE_ID).order_by(Donation.created_at.desc()).limit(PAGE)),
+    ("donor's deliveries", "ix_transactions_donor_user_id",
+     select(Transaction.status).where(Transaction.donor_user_id == SAMPLE_ID)),
+    ("vendor orders by status, newest first", "ix_transactions_vendor_id_status_created_at",
+     select(Transaction)
+     .where(Transaction.vendor_id == SAMPLE_ID, Transaction.status == "shipped")
+     .order_by(Transaction.created_at.desc()).limit(PAGE)),
+    ("vendor order counts", "ix_transactions_vendor_id_status_created_at",
+     select(func.count(), func.count().filter(Transaction.status == "completed"))
+     .where(Transaction.vendor_id == SAMPLE_ID)),
+    ("NGO transactions, newest first", "ix_transactions_ngo_id_created_at",
+     select(Transaction).where(Transaction.ngo_id == SAMPLE_ID).order_by(Transaction.created_at.desc()).limit(PAGE)),
+    ("assignment queue, oldest first", "ix_transactions_status_created_at",
+     select(Transaction.id)
+     .where(Transaction.status == "pending_admin_assignment")
+     .order_by(Transaction.created_at).limit(PAGE)),
+    ("donation's transactions", "ix_transactions_donation_id",
+     select(Transaction).where(Transaction.donation_id == SAMPLE_ID)),
+    ("tickets by status, newest first", "ix_tickets_status_created_at",
+     select(Ticket).where(Ticket.status == "resolved").order_by(Ticket.created_at.desc()).limit(PAGE)),
+    ("open tickets by priority", "ix_tickets_open_priority_created_at",
+     select(Ticket)
+     .where(Ticket.status.in_(["open", "in_progress"]), Ticket.priority == "urgent")
+     .order_by(Ticket.created_at).limit(PAGE)),
+    ("transaction's tickets", "ix_tickets_transaction_id",
+     select(Ticket).where(Ticket.transaction_id == SAMPLE_ID)),
+    ("vendor invoices, newest first", "ix_vendor_invoices_vendor_id_created_at",
+     select(VendorInvoice)
+     .where(VendorInvoice.vendor_id == SAMPLE_ID)
+     .order_by(VendorInvoice.created_at.desc()).limit(PAGE)),
+    ("invoice review queue", "ix_vendor_invoices_pending_created_at",
+     select(VendorInvoice).where(VendorInvoice.status == "pending").order_by(VendorInvoice.created_at).limit(PAGE)),
+    ("transaction's invoice", "ix_vendor_invoices_transaction_id",
+     select(VendorInvoice.id).where(VendorInvoice.transaction_id == SAMPLE_ID)),
+]
+
+
+def plan_scans(plan: dict) -> list:
+    """Every table scan in a JSON plan, as its index name or node type."""
+    scans = []
+    if "Relation Name" in plan or "Index Name" in plan:
+        scans.append(plan.get("Index Name") or plan["Node Type"])
+    for child in plan.get("Plans", []):
+        scans += plan_scans(child)
+    return scans
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+async def run_checks(args) -> int:
+    engine = create_async_engine(args.database_url.replace("postgresql://", "postgresql+asyncpg://"))
+    failures = 0
+    try:
+        async with engine.connect() as conn:
+            if not args.planner_costs:
+                await conn.execute(text("SET enable_seqscan = off"))
+            for description, index, stmt in CHECKS:
+                result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {compile_sql(stmt)}"))
+                plan = result.scalar()[0]["Plan"]
+                scans = plan_scans(plan)
+                if index in scans:
+                    print(f"✅ {description}: {index}")
+                else:
+                    failures += 1
+                    print(f"❌ {description}: expected {index}, plan used {', '.join(scans)}")
+    finally:
+        await engine.dispose()
+
+    print(f"{len(CHECKS) - failures}/{len(CHECKS)} queries use their index")
+    return 1 if failures else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check that hot queries use their indexes")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument(
+        "--planner-costs", action="store_true",
+        help="Leave sequential scans enabled (meaningful on a large seed)"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run_checks(parse_args())))
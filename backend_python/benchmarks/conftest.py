@@ -0,0 +1,76 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+# Keep the engine quiet and avoid a real database during microbenchmarks
+os.environ.setdefault("USE_MOCK_DATA", "true")
+
+ROW_COUNT = 1000
+
+
+@pytest.fixture(scope="session")
+def ngo_rows():
+    """1000 attribute objects shaped like the NGO/Profile join rows in ngos.py."""
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            name=f"Bench NGO {i}",
+            description="Synthetic NGO used for serialization benchmarks",
+            mission="Benchmark mission statement",
+            website="https://example.org",
+            logo_url=None,
+            gallery_images=None,
+            started_date=now - timedelta(days=3650),
+            license_number=None,
+            total_members=25,
+            full_address=f"{i} Bench Street, Mumbai",
+            pin_code="400001",
+            city="Mumbai",
+            state="Maharashtra",
+            country="India",
+            phone="+91-9000000000",
+            email=f"ngo{i}@example.org",
+            registration_number=f"NGO{i:06d}",
+            verified=True,
+            created_at=now,
+            updated_at=now,
+            first_name="Bench",
+            last_name=f"Owner {i}",
+            user_email=f"owner{i}@example.org",
+        )
+        for i in range(ROW_COUNT)
+    ]
+
+
+@pytest.fixture(scope="session")
+def transaction_rows():
+    """1000 attribute objects shaped like Transaction model instances."""
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            donation_id=uuid.uuid4(),
+            package_id=uuid.uuid4(),
+            ngo_id=uuid.uuid4(),
+            vendor_id=uuid.uuid4(),
+            donor_user_id=uuid.uuid4(),
+            status="shipped",
+            tracking_number=f"TRK{i:010d}",
+            delivery_note_url=None,
+            invoice_url=None,
+            admin_notes=None,
+            vendor_notes="Packed and dispatched",
+            assigned_at=now,
+            shipped_at=now,
+            delivered_at=None,
+            completed_at=None,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(ROW_COUNT)
+    ]
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the DoGoodHub API.
+
+Runs a set of scenarios against a live server seeded with
+`benchmarks.seed`, reports throughput and p50/p95/p99 latency per
+scenario, and optionally saves or compares against a stored baseline.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 50 --duration 30
+    python -m benchmarks.load_test --save-baseline small
+    python -m benchmarks.load_test --compare small --max-regression 15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.seed import BENCH_PASSWORD, CATEGORIES, CITIES, SCALES, bench_email
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def has_data(body) -> bool:
+    """False for an empty listing, or a stats payload whose counts are all zero."""
+    if isinstance(body, dict):
+        body = body.get("data", body)
+    if isinstance(body, dict):
+        return any(
+            value for value in body.values()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        )
+    return bool(body)
+
+
+class ScenarioStats:
+    """Latency samples, error and empty-response counts for one scenario."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.empty = 0
+        self.status_codes = {}
+
+    def record(self, elapsed: float, status_code: int, empty: bool = False):
+        self.latencies.append(elapsed)
+        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        if status_code >= 400:
+            self.errors += 1
+        if empty:
+            self.empty += 1
+
+    def record_failure(self, elapsed: float):
+        self.latencies.append(elapsed)
+        self.errors += 1
+
+    def summary(self, wall_time: float) -> dict:
+        ordered = sorted(self.latencies)
+        return {
+            "requests": len(ordered),
+            "errors": self.errors,
+            "empty": self.empty,
+            "throughput_rps": round(len(ordered) / wall_time, 2) if wall_time else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+        }
+
+
+class LoadClient:
+    """One simulated user running scenarios on a shared HTTP connection pool."""
+
+    def __init__(self, client: httpx.AsyncClient, stats: dict, rng: random.Random, scale: dict):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.scale = scale
+        self.tokens = {}
+        self.packages = []
+
+    async def _timed(self, scenario: str, method: str, url: str, expect_data: bool = False, **kwargs):
+        """Time one request; with expect_data, a 200 carrying no data counts as empty."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.stats[scenario].record_failure(time.perf_counter() - started)
+            return None
+        elapsed = time.perf_counter() - started
+        empty = expect_data and response.status_code == 200 and not has_data(response.json())
+        self.stats[scenario].record(elapsed, response.status_code, empty)
+        return response
+
+    async def _login(self, role: str, index: int, scenario: str = None):
+        payload = {"email": bench_email(role, index), "password": BENCH_PASSWORD}
+        if scenario:
+            response = await self._timed(scenario, "POST", "/api/auth/login", json=payload)
+        else:
+            response = await self.client.post("/api/auth/login", json=payload)
+        if response is None or response.status_code != 200:
+            return None
+        return response.json()["data"]["access_token"]
+
+    def _auth(self, role: str) -> dict:
+        token = self.tokens.get(role)
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    async def prepare(self):
+        """Log in once per role and cache a page of packages to donate to."""
+        self.tokens["user"] = await self._login("user", self.rng.randrange(self.scale["donors"]))
+        self.tokens["vendor"] = await self._login("vendor", self.rng.randrange(self.scale["vendors"]))
+        self.tokens["admin"] = await self._login("admin", 0)
+
+        response = await self.client.get("/api/packages/", params={"limit": 100})
+        if response.status_code == 200:
+            self.packages = response.json()
+
+    async def browse_catalog(self):
+        skip = self.rng.randrange(0, max(1, self.scale["ngos"] - 20))
+        params = {"skip": skip, "limit": 20}
+        await self._timed("browse_catalog", "GET", "/api/ngos/", expect_data=True, params=params)
+        await self._timed("browse_catalog", "GET", "/api/packages/", expect_data=True, params=params)
+
+    async def filter_catalog(self):
+        _, state, _ = self.rng.choice(CITIES)
+        params = self.rng.choice([
+            {"category": self.rng.sample(CATEGORIES, 2)},
+            {"state": state, "amount": "1000-5000"},
+            {"category": self.rng.choice(CATEGORIES), "completion": ["75-100", "100+"]},
+        ])
+        await self._timed("filter_catalog", "GET", "/api/packages/catalog", params={**params, "limit": 20})
+
+    async def search_ngos(self):
+        city = self.rng.choice(CITIES)[0]
+        query = self.rng.choice([
+            f"{self.rng.choice(CATEGORIES)} {city}",
+            f"Bench NGO {self.rng.randrange(self.scale['ngos'])}",
+            # Dropped letter exercises the trigram (typo) path
+            city[:2] + city[3:],
+        ])
+        await self._timed("search_ngos", "GET", "/api/ngos/search", params={"q": query, "limit": 20})
+
+    async def login(self):
+        await self._login("user", self.rng.randrange(self.scale["donors"]), scenario="login")
+
+    async def donate(self):
+        if not self.packages:
+            return
+        package = self.rng.choice(self.packages)
+        payload = {
+            "ngo_id": package["ngo_id"],
+            "package_id": package["id"],
+            "package_title": package["title"],
+            "package_amount": package["amount"],
+            "quantity": 1,
+            "total_amount": package["amount"],
+            "payment_method": "card",
+            "payment_status": "completed",
+        }
+        await self._timed("donate", "POST", "/api/donations/", json=payload, headers=self._auth("user"))
+
+    async def vendor_dashboard(self):
+        headers = self._auth("vendor")
+        # Every seeded vendor has orders, so empty answers mean the routes miss them
+        await self._timed("vendor_dashboard", "GET", "/api/vendor/dashboard/stats", expect_data=True, headers=headers)
+        await self._timed("vendor_dashboard", "GET", "/api/vendor/orders", expect_data=True, headers=headers)
+
+    async def admin_listings(self):
+        headers = self._auth("admin")
+        await self._timed("admin_listings", "GET", "/api/admin/ngos", expect_data=True, headers=headers)
+        await self._timed("admin_listings", "GET", "/api/admin/vendors", expect_data=True, headers=headers)
+        # The seed creates no invoices
+        await self._timed("admin_listings", "GET", "/api/admin/vendor-invoices", headers=headers)
+
+
+SCENARIOS = {
+    "browse_catalog": (LoadClient.browse_catalog, 50),
+    "filter_catalog": (LoadClient.filter_catalog, 10),
+    "search_ngos": (LoadClient.search_ngos, 10),
+    "login": (LoadClient.login, 5),
+    "donate": (LoadClient.donate, 15),
+    "vendor_dashboard": (LoadClient.vendor_dashboard, 15),
+    "admin_listings": (LoadClient.admin_listings, 15),
+}
+
+
+async def run_client(load_client: LoadClient, scenarios: list, weights: list, deadline: float):
+    while time.perf_counter() < deadline:
+        scenario = load_client.rng.choices(scenarios, weights)[0]
+        await SCENARIOS[scenario][0](load_client)
+
+
+async def run_load(args) -> dict:
+    scale = {"ngos": args.ngos, "vendors": args.vendors, "donors": args.donors}
+    scenarios = args.scenarios or list(SCENARIOS)
+    weights = [SCENARIOS[name][1] for name in scenarios]
+    stats = {name: ScenarioStats(name) for name in SCENARIOS}
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        clients = [
+            LoadClient(client, stats, random.Random(args.seed + i), scale)
+            for i in range(args.concurrency)
+        ]
+        print(f"Preparing {len(clients)} clients against {args.base_url}...")
+        await asyncio.gather(*(load_client.prepare() for load_client in clients))
+
+        if args.warmup:
+            print(f"Warming up for {args.warmup}s...")
+            warmup_deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(run_client(c, scenarios, weights, warmup_deadline) for c in clients))
+            # Clients share this dict, so resetting entries discards warmup samples
+            for name in stats:
+                stats[name] = ScenarioStats(name)
+
+        print(f"Running {', '.join(scenarios)} for {args.duration}s at concurrency {args.concurrency}...")
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(run_client(c, scenarios, weights, deadline) for c in clients))
+        wall_time = time.perf_counter() - started
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "scale": args.scale,
+        "concurrency": args.concurrency,
+        "duration_s": round(wall_time, 2),
+        "scenarios": {
+            name: stats[name].summary(wall_time)
+            for name in scenarios
+            if stats[name].latencies
+        },
+    }
+
+
+def print_report(report: dict):
+    print(
+        f"\n{'scenario':<18}{'requests':>10}{'errors':>8}{'empty':>8}"
+        f"{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    print("-" * 84)
+    for name, summary in report["scenarios"].items():
+        print(
+            f"{name:<18}{summary['requests']:>10}{summary['errors']:>8}{summary['empty']:>8}"
+            f"{summary['throughput_rps']:>10}{summary['p50_ms']:>10}"
+            f"{summary['p95_ms']:>10}{summary['p99_ms']:>10}"
+        )
+
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(report: dict, name: str):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nBaseline saved to {baseline_path(name)}")
+
+
+def compare_with_baseline(report: dict, name: str, max_regression: float) -> list:
+    """Return human-readable regressions beyond max_regression percent."""
+    with open(baseline_path(name)) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for scenario, current in report["scenarios"].items():
+        previous = baseline["scenarios"].get(scenario)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if previous[metric] and current[metric] > previous[metric] * (1 + max_regression / 100):
+                regressions.append(
+                    f"{scenario} {metric}: {previous[metric]} -> {current[metric]}"
+                )
+        if previous["throughput_rps"] and \
+                current["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression / 100):
+            regressions.append(
+                f"{scenario} throughput_rps: {previous['throughput_rps']} -> {current['throughput_rps']}"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{scenario} errors: {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the DoGoodHub API")
+    parser.add_argument("--base-url", default=os.getenv("BENCH_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="Scale the database was seeded with")
+    parser.add_argument("--ngos", type=int, help="Override the scale's NGO count, as passed to the seed")
+    parser.add_argument("--vendors", type=int, help="Override the scale's vendor count")
+    parser.add_argument("--donors", type=int, help="Override the scale's donor count")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against a saved baseline")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="Allowed regression in percent before failing")
+    args = parser.parse_args(argv)
+
+    # Explicit counts override the preset, as in benchmarks.seed
+    for key in ("ngos", "vendors", "donors"):
+        if getattr(args, key) is None:
+            setattr(args, key, SCALES[args.scale][key])
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_load(args))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    # A baseline of empty answers measures nothing, so refuse to save or pass one
+    empty = [name for name, summary in report["scenarios"].items() if summary["empty"]]
+    if empty:
+        print(
+            f"\n❌ Empty responses in {', '.join(empty)}: "
+            f"do --scale and the counts match the benchmarks.seed run?"
+        )
+        return 1
+    if args.save_baseline:
+        save_baseline(report, args.save_baseline)
+    if args.compare:
+        regressions = compare_with_baseline(report, args.compare, args.max_regression)
+        if regressions:
+            print(f"\n❌ Regressions against baseline '{args.compare}':")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+        print(f"\n✅ No regressions against baseline '{args.compare}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
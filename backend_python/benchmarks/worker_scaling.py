@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compare catalog throughput across server worker counts.
+
+Starts the production launcher (`python -m app.serve`) once per worker
+count, drives the browse_catalog scenario from `benchmarks.load_test`
+against it, and prints throughput and latency side by side.
+
+Usage:
+    python -m benchmarks.worker_scaling --workers 1 4 --duration 30
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import load_test
+from benchmarks.seed import SCALES
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int, extra_args: list) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port), *extra_args],
+        cwd=BACKEND_DIR,
+        # Every simulated client shares one address, so per-IP limits would throttle the run
+        env={**os.environ, "RATE_LIMIT_ENABLED": os.getenv("RATE_LIMIT_ENABLED", "false")},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server at {base_url} not ready after {timeout}s")
+
+
+def stop_server(process: subprocess.Popen):
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def run_for_workers(workers: int, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    process = start_server(workers, args.port, ["--no-gunicorn"] if args.no_gunicorn else [])
+    try:
+        wait_until_ready(base_url, process, args.startup_timeout)
+        load_args = load_test.parse_args([
+            "--base-url", base_url,
+            "--scale", args.scale,
+            "--scenarios", "browse_catalog",
+            "--concurrency", str(args.concurrency),
+            "--duration", str(args.duration),
+            "--warmup", str(args.warmup),
+        ])
+        print(f"\n=== {workers} worker(s) ===")
+        report = asyncio.run(load_test.run_load(load_args))
+    finally:
+        stop_server(process)
+    return report["scenarios"]["browse_catalog"]
+
+
+def print_comparison(results: dict):
+    baseline_rps = next(iter(results.values()))["throughput_rps"]
+    print(f"\n{'workers':<10}{'rps':>10}{'speedup':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    print("-" * 68)
+    for workers, summary in results.items():
+        speedup = summary["throughput_rps"] / baseline_rps if baseline_rps else 0.0
+        print(
+            f"{workers:<10}{summary['throughput_rps']:>10}{speedup:>9.2f}x"
+            f"{summary['p50_ms']:>10}{summary['p95_ms']:>10}{summary['p99_ms']:>10}{summary['errors']:>8}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare catalog throughput across worker counts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--no-gunicorn", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = {}
+    for workers in dict.fromkeys(args.workers):
+        results[workers] = run_for_workers(workers, args)
+    print_comparison(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())